@@ -0,0 +1,35 @@
+"""add pipeline rollup counters
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'pipeline_rollups',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('picks_total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('closing_lines_total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('events_normalized_total', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.execute("""
+        INSERT INTO pipeline_rollups (id, picks_total, closing_lines_total, events_normalized_total)
+        SELECT 1,
+            (SELECT COUNT(*) FROM picks),
+            (SELECT COUNT(*) FROM closing_lines),
+            (SELECT COUNT(*) FROM events_normalized)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('pipeline_rollups')
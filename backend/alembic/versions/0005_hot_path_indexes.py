@@ -0,0 +1,27 @@
+"""add hot-path secondary indexes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_odds_snapshots_event_book_side_ts', 'odds_snapshots', ['event_normalized_id', 'book', 'side', 'timestamp'])
+    op.create_index('ix_picks_created_at', 'picks', ['created_at'])
+    op.create_index('ix_picks_event_normalized_id', 'picks', ['event_normalized_id'])
+    op.create_index('ix_settlements_settlement_source', 'settlements', ['settlement_source'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_settlements_settlement_source', table_name='settlements')
+    op.drop_index('ix_picks_event_normalized_id', table_name='picks')
+    op.drop_index('ix_picks_created_at', table_name='picks')
+    op.drop_index('ix_odds_snapshots_event_book_side_ts', table_name='odds_snapshots')
@@ -0,0 +1,67 @@
+"""add CLV rollups and checkpoints
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'clv_rollups',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('settlement_source', sa.String(length=20), nullable=False),
+        sa.Column('book', sa.String(length=40), nullable=False),
+        sa.Column('market', sa.String(length=20), nullable=False),
+        sa.Column('tier', sa.String(length=20), nullable=False),
+        sa.Column('model_version', sa.String(length=40), nullable=False),
+        sa.Column('time_to_game', sa.String(length=10), nullable=False),
+        sa.Column('settled', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('market_n', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('market_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('market_sum_sq', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('book_n', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('book_sum', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('book_sum_sq', sa.Float(), nullable=False, server_default='0'),
+        sa.UniqueConstraint('settlement_source', 'book', 'market', 'tier', 'model_version', 'time_to_game', name='uq_clv_rollup_segment'),
+    )
+    op.create_table(
+        'clv_checkpoints',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('settlement_source', sa.String(length=20), nullable=False),
+        sa.Column('settled_total', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('summary_json', sa.JSON(), nullable=False),
+        sa.UniqueConstraint('settlement_source', 'settled_total', name='uq_clv_checkpoint'),
+    )
+
+    # Backfill the running moments from existing settlements (buckets match services/clv.py).
+    if op.get_bind().dialect.name == 'sqlite':
+        hours = "(julianday(e.start_time) - julianday(p.created_at)) * 24.0"
+    else:
+        hours = "EXTRACT(EPOCH FROM e.start_time - p.created_at) / 3600.0"
+    bucket = f"CASE WHEN {hours} < 1 THEN '0-1h' WHEN {hours} < 6 THEN '1-6h' WHEN {hours} < 24 THEN '6-24h' ELSE '24h+' END"
+    op.execute(f"""
+        INSERT INTO clv_rollups (settlement_source, book, market, tier, model_version, time_to_game, settled,
+            market_n, market_sum, market_sum_sq, book_n, book_sum, book_sum_sq)
+        SELECT s.settlement_source, p.book, p.market, p.tier, p.model_version, {bucket}, COUNT(*),
+            COUNT(s.clv_market), COALESCE(SUM(s.clv_market), 0), COALESCE(SUM(s.clv_market * s.clv_market), 0),
+            COUNT(s.clv_book), COALESCE(SUM(s.clv_book), 0), COALESCE(SUM(s.clv_book * s.clv_book), 0)
+        FROM settlements s
+        JOIN picks p ON p.id = s.pick_id
+        JOIN events_normalized e ON e.id = p.event_normalized_id
+        GROUP BY s.settlement_source, p.book, p.market, p.tier, p.model_version, {bucket}
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('clv_checkpoints')
+    op.drop_table('clv_rollups')
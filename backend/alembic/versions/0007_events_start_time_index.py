@@ -0,0 +1,21 @@
+"""index events_normalized.start_time for close capture
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_events_normalized_start_time', 'events_normalized', ['start_time'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_events_normalized_start_time', table_name='events_normalized')
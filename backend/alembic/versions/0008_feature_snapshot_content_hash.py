@@ -0,0 +1,25 @@
+"""content-address feature snapshots
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows keep a NULL hash: they embed event ids and timestamps, so they never match new content.
+    op.add_column('feature_snapshots', sa.Column('content_hash', sa.String(64), nullable=True))
+    op.create_index('ix_feature_snapshots_content_hash', 'feature_snapshots', ['feature_version', 'event_normalized_id', 'content_hash'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_feature_snapshots_content_hash', table_name='feature_snapshots')
+    op.drop_column('feature_snapshots', 'content_hash')
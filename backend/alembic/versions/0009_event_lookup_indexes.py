@@ -0,0 +1,23 @@
+"""index provider-key lookups of normalized events
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_events_raw_source_external_id', 'events_raw', ['source', 'external_event_id', 'id'])
+    op.create_index('ix_events_normalized_event_raw_id', 'events_normalized', ['event_raw_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_events_normalized_event_raw_id', table_name='events_normalized')
+    op.drop_index('ix_events_raw_source_external_id', table_name='events_raw')
@@ -0,0 +1,23 @@
+"""record when each raw event row was polled
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Earlier rows keep NULL; replay falls back to their latest quote time.
+    op.add_column('events_raw', sa.Column('ingested_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('events_raw', 'ingested_at')
@@ -1,35 +1,129 @@
 from __future__ import annotations
 
-from datetime import date
-
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
-
-from backend.app.db.session import get_db
-from datetime import datetime
-
-from backend.app.models.all_models import ModelArtifact, Pick, PipelineRun, Settlement
-from backend.app.schemas.pick import PickOut
+import base64
+import json
+from datetime import date, datetime, time, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.app.db.session import get_db, get_session_factory, pool_statistics
+from backend.app.models.all_models import ModelArtifact, Pick, PipelineRun
+from backend.app.schemas.pick import PickOut, PickPage
+from backend.app.services.clv import clv_segments_query, summarize_segments
+from backend.app.services.lineage import lineage_export_query, stream_lineage
+from backend.app.services.model_registry import model_registry
 from backend.app.services.modeling import train_baseline_model
 from backend.app.services.pipeline import run_once
 from backend.app.services.provider import MockOddsProvider
+from backend.app.services.rollups import read_clv_gates
 
 router = APIRouter()
 
 
+# Statement builders for the hot read paths; tests/test_query_plans.py EXPLAINs each one.
+def latest_pipeline_run_query() -> Select:
+    return select(PipelineRun).where(PipelineRun.id == select(func.max(PipelineRun.id)).scalar_subquery())
+
+
+def picks_today_query(
+    day_start: datetime,
+    day_end: datetime,
+    *,
+    limit: int | None = 50,
+    after: tuple[float, int] | None = None,
+    tier: str | None = None,
+    book: str | None = None,
+    min_ev: float | None = None,
+) -> Select:
+    """Picks by EV in the half-open [day_start, day_end) range, optionally one keyset page at a time.
+
+    The range keeps `ix_picks_created_at` usable; `after` is the (ev_percent, id) of the
+    last row of the previous page.
+    """
+    stmt = select(Pick).where(Pick.created_at >= day_start, Pick.created_at < day_end)
+    if tier is not None:
+        stmt = stmt.where(Pick.tier == tier)
+    if book is not None:
+        stmt = stmt.where(Pick.book == book)
+    if min_ev is not None:
+        stmt = stmt.where(Pick.ev_percent >= min_ev)
+    if after is not None:
+        last_ev, last_id = after
+        stmt = stmt.where(or_(Pick.ev_percent < last_ev, and_(Pick.ev_percent == last_ev, Pick.id < last_id)))
+    stmt = stmt.order_by(Pick.ev_percent.desc(), Pick.id.desc())
+    return stmt if limit is None else stmt.limit(limit)
+
+
+def encode_cursor(pick: Pick, filters: list) -> str:
+    """Opaque cursor carrying the page position and the filters it was issued for."""
+    return base64.urlsafe_b64encode(json.dumps([pick.ev_percent, pick.id, filters]).encode()).decode()
+
+
+def decode_cursor(cursor: str, filters: list) -> tuple[float, int]:
+    try:
+        ev, pick_id, cursor_filters = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        position = float(ev), int(pick_id)
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="invalid cursor") from exc
+    if cursor_filters != filters:
+        raise HTTPException(status_code=400, detail="cursor does not match the request filters")
+    return position
+
+
 @router.get('/health')
 async def health(db: AsyncSession = Depends(get_db)) -> dict:
-    latest = await db.scalar(select(PipelineRun).order_by(PipelineRun.id.desc()))
-    return {"status": "ok", "latest_pipeline_run": latest.id if latest else None}
+    latest = await db.scalar(latest_pipeline_run_query())
+    return {"status": "ok", "latest_pipeline_run": latest.id if latest else None, "db_pool": pool_statistics()}
 
 
 @router.get('/picks/today', response_model=list[PickOut])
-async def picks_today(db: AsyncSession = Depends(get_db)) -> list[PickOut]:
-    rows = (await db.scalars(select(Pick).where(func.date(Pick.created_at) == date.today()))).all()
+async def picks_today(
+    tier: str | None = Query(None),
+    book: str | None = Query(None),
+    min_ev: float | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+) -> list[PickOut]:
+    """All of today's picks, best EV first; `/picks/today/page` serves the same rows in pages."""
+    day_start = datetime.combine(date.today(), time.min)
+    stmt = picks_today_query(day_start, day_start + timedelta(days=1), limit=None, tier=tier, book=book, min_ev=min_ev)
+    rows = (await db.scalars(stmt)).all()
     return [PickOut.model_validate(r, from_attributes=True) for r in rows]
 
 
+@router.get('/picks/today/page', response_model=PickPage)
+async def picks_today_page(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = Query(None),
+    tier: str | None = Query(None),
+    book: str | None = Query(None),
+    min_ev: float | None = Query(None),
+    day: date | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+) -> PickPage:
+    """One keyset page of a day's picks; a cursor is only valid with the filters it was issued for."""
+    day = day or date.today()
+    filters = [day.isoformat(), tier, book, min_ev]
+    day_start = datetime.combine(day, time.min)
+    stmt = picks_today_query(
+        day_start,
+        day_start + timedelta(days=1),
+        limit=limit + 1,
+        after=decode_cursor(cursor, filters) if cursor else None,
+        tier=tier,
+        book=book,
+        min_ev=min_ev,
+    )
+    rows = (await db.scalars(stmt)).all()
+    page = rows[:limit]
+    return PickPage(
+        items=[PickOut.model_validate(r, from_attributes=True) for r in page],
+        next_cursor=encode_cursor(page[-1], filters) if len(rows) > limit else None,
+    )
+
+
 @router.get('/picks/{pick_id}', response_model=PickOut)
 async def pick_by_id(pick_id: int, db: AsyncSession = Depends(get_db)) -> PickOut:
     row = await db.get(Pick, pick_id)
@@ -38,19 +132,36 @@ async def pick_by_id(pick_id: int, db: AsyncSession = Depends(get_db)) -> PickOu
 
 @router.get('/metrics/clv')
 async def clv_metrics(include_simulated: bool = Query(False), db: AsyncSession = Depends(get_db)) -> dict:
-    stmt = select(Settlement)
-    if not include_simulated:
-        stmt = stmt.where(Settlement.settlement_source == 'official')
-    settlements = (await db.scalars(stmt)).all()
-    if not settlements:
-        return {"aggregate_clv_market": 0.0, "aggregate_clv_book": 0.0, "count": 0}
+    rows = (await db.execute(clv_segments_query(db.bind.dialect.name, include_simulated))).all()
+    summary = summarize_segments(rows)
     return {
-        "aggregate_clv_market": sum(s.clv_market for s in settlements) / len(settlements),
-        "aggregate_clv_book": sum(s.clv_book for s in settlements) / len(settlements),
-        "count": len(settlements),
+        "aggregate_clv_market": summary["clv_market"]["mean"] or 0.0,
+        "aggregate_clv_book": summary["clv_book"]["mean"] or 0.0,
+        "count": summary["settled"],
+        "clv_market": summary["clv_market"],
+        "clv_book": summary["clv_book"],
+        "segments": summary["segments"],
     }
 
 
+@router.get('/metrics/clv/gates')
+async def clv_gates(include_simulated: bool = Query(False), db: AsyncSession = Depends(get_db)) -> dict:
+    return await read_clv_gates(db, include_simulated)
+
+
+@router.get('/exports/lineage')
+async def export_lineage(
+    format: str = Query('ndjson', pattern='^(ndjson|csv)$'),
+    start: datetime | None = Query(None),
+    end: datetime | None = Query(None),
+    model_version: str | None = Query(None),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_session_factory),
+) -> StreamingResponse:
+    media_type = 'text/csv' if format == 'csv' else 'application/x-ndjson'
+    stmt = lineage_export_query(start, end, model_version)
+    return StreamingResponse(stream_lineage(session_factory, stmt, format), media_type=media_type)
+
+
 @router.post('/admin/retrain')
 async def retrain(db: AsyncSession = Depends(get_db)) -> dict:
     samples = [
@@ -60,9 +171,11 @@ async def retrain(db: AsyncSession = Depends(get_db)) -> dict:
     labels = [1, 0]
     model_version = f"model-{int(datetime.utcnow().timestamp())}"
     artifact_path, metrics = train_baseline_model(samples, labels, model_version)
+    # Load the new estimator before it becomes active so the next run doesn't pay for it.
+    model_registry.get(model_version, artifact_path)
     db.add(ModelArtifact(model_version=model_version, trained_at=datetime.utcnow(), training_window="seed", metrics_json=metrics, artifact_path=artifact_path))
     await db.commit()
-    return {"artifact_path": artifact_path, "metrics": metrics, "model_version": model_version}
+    return {"artifact_path": artifact_path, "metrics": metrics, "model_version": model_version, "model_registry": model_registry.stats()}
 
 
 @router.post('/admin/run-once')
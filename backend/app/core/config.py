@@ -4,14 +4,48 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     app_env: str = "dev"
     database_url: str = "sqlite+aiosqlite:///./boom.db"
+    # Engine profile: pooled backends (Postgres, file SQLite) use the pool settings; asyncpg
+    # gets the statement caches; SQLite connections get the pragmas below.
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+    db_prepared_statement_cache_size: int = 500
+    db_asyncpg_statement_cache_size: int = 100
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
     edge_threshold: float = 0.03
     stale_snapshot_seconds: int = 180
     consensus_min_books: int = 3
     consensus_trim_outliers: bool = True
     close_capture_window_minutes: int = 10
+    close_capture_lookback_hours: int = 48
     stale_snapshot_max_age_seconds: int = 180
+    odds_delta_mode: bool = False
+    odds_heartbeat_seconds: int = 300
+    tick_ring_capacity: int = 32
+    tick_store_grace_seconds: int = 1800
     mapping_time_tolerance_minutes: int = 15
     mapping_confidence_threshold: float = 0.9
+    team_index_ttl_seconds: int = 300
+    estimator_cache_size: int = 4
+    pipeline_concurrency: int = 1
+    provider_deadline_seconds: float = 10.0
+    provider_max_retries: int = 2
+    provider_backoff_seconds: float = 0.5
+    provider_merge_start_tolerance_minutes: int = 5
+    clv_checkpoint_every: int = 25
+    clv_gate_a_min_settled: int = 100
+    scheduler_enabled: bool = False
+    scheduler_discovery_seconds: int = 900
+    scheduler_far_poll_seconds: int = 900
+    scheduler_near_poll_seconds: int = 120
+    scheduler_close_poll_seconds: int = 15
+    scheduler_near_window_minutes: int = 120
+    scheduler_poll_batch_seconds: int = 5
+    scheduler_retry_seconds: int = 30
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -1,11 +1,106 @@
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from __future__ import annotations
+
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 
 from backend.app.core.config import settings
 
-engine = create_async_engine(settings.database_url, future=True, echo=False)
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts block waiting for a free connection."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+        queue_get = self._pool.get
+
+        def timed_get(block: bool = True, timeout: float | None = None):
+            if not block:
+                return queue_get(block, timeout)
+            started = time.perf_counter()
+            try:
+                return queue_get(block, timeout)
+            except Exception:
+                self.timeouts += 1
+                raise
+            finally:
+                waited = time.perf_counter() - started
+                self.waits += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+        self._pool.get = timed_get
+
+
+def engine_options(database_url: str) -> dict:
+    """`create_async_engine` keyword arguments for the configured engine profile."""
+    url = make_url(database_url)
+    options: dict = {"future": True, "echo": False, "pool_pre_ping": settings.db_pool_pre_ping}
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite is a single shared connection (StaticPool); pool sizing does not apply.
+        return options
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+    )
+    if url.get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+            "statement_cache_size": settings.db_asyncpg_statement_cache_size,
+        }
+    return options
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.close()
+
+
+def create_engine_from_settings(database_url: str | None = None) -> AsyncEngine:
+    database_url = database_url or settings.database_url
+    created = create_async_engine(database_url, **engine_options(database_url))
+    if created.dialect.name == "sqlite":
+        event.listen(created.sync_engine, "connect", _apply_sqlite_pragmas)
+    return created
+
+
+def pool_statistics(target: AsyncEngine | None = None) -> dict:
+    pool = (target or engine).pool
+    stats: dict = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update(size=pool.size(), checked_out=pool.checkedout(), checked_in=pool.checkedin(), overflow=pool.overflow())
+    if isinstance(pool, InstrumentedQueuePool):
+        stats.update(
+            waits=pool.waits,
+            wait_seconds_total=pool.wait_seconds_total,
+            wait_seconds_max=pool.wait_seconds_max,
+            timeouts=pool.timeouts,
+        )
+    return stats
+
+
+engine = create_engine_from_settings()
 AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
 async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         yield session
+
+
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """For handlers that must open sessions outside the request scope, e.g. streaming bodies."""
+    return AsyncSessionLocal
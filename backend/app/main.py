@@ -1,6 +1,30 @@
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from backend.app.api.routes import router
+from backend.app.core.config import settings
+from backend.app.db.session import AsyncSessionLocal
+from backend.app.services.model_registry import model_registry
+from backend.app.services.provider import MockOddsProvider
+from backend.app.services.scheduler import pipeline_scheduler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with AsyncSessionLocal() as session:
+        await model_registry.warm_up(session)
+    scheduler_task = None
+    if settings.scheduler_enabled:
+        scheduler_task = asyncio.create_task(pipeline_scheduler(MockOddsProvider(), AsyncSessionLocal).run())
+    yield
+    if scheduler_task is not None:
+        scheduler_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await scheduler_task
+
 
-app = FastAPI(title="Boom Picks Paper Trading Platform")
+app = FastAPI(title="Boom Picks Paper Trading Platform", lifespan=lifespan)
 app.include_router(router)
@@ -4,7 +4,7 @@ import enum
 import uuid
 from datetime import datetime
 
-from sqlalchemy import JSON, Boolean, DateTime, Enum, Float, ForeignKey, Integer, String, UniqueConstraint
+from sqlalchemy import JSON, Boolean, DateTime, Enum, Float, ForeignKey, Index, Integer, String, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from backend.app.db.base import Base
@@ -57,14 +57,16 @@ class EventRaw(Base):
     start_time: Mapped[datetime] = mapped_column(DateTime)
     home_team: Mapped[str] = mapped_column(String(100))
     away_team: Mapped[str] = mapped_column(String(100))
+    ingested_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    __table_args__ = (Index("ix_events_raw_source_external_id", "source", "external_event_id", "id"),)
 
 
 class EventNormalized(Base):
     __tablename__ = "events_normalized"
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    event_raw_id: Mapped[int] = mapped_column(ForeignKey("events_raw.id"))
+    event_raw_id: Mapped[int] = mapped_column(ForeignKey("events_raw.id"), index=True)
     league_id: Mapped[int] = mapped_column(ForeignKey("leagues.id"))
-    start_time: Mapped[datetime] = mapped_column(DateTime)
+    start_time: Mapped[datetime] = mapped_column(DateTime, index=True)
     home_team_id: Mapped[int | None] = mapped_column(ForeignKey("teams.id"), nullable=True)
     away_team_id: Mapped[int | None] = mapped_column(ForeignKey("teams.id"), nullable=True)
     mapping_confidence: Mapped[float] = mapped_column(Float, default=0.0)
@@ -84,6 +86,7 @@ class OddsSnapshot(Base):
     price: Mapped[int] = mapped_column(Integer)
     timestamp: Mapped[datetime] = mapped_column(DateTime)
     is_stale: Mapped[bool] = mapped_column(Boolean, default=False)
+    __table_args__ = (Index("ix_odds_snapshots_event_book_side_ts", "event_normalized_id", "book", "side", "timestamp"),)
 
 
 class MarketConsensus(Base):
@@ -102,8 +105,11 @@ class FeatureSnapshot(Base):
     event_normalized_id: Mapped[int] = mapped_column(ForeignKey("events_normalized.id"))
     feature_version: Mapped[str] = mapped_column(String(20))
     features_json: Mapped[dict] = mapped_column(JSON)
+    content_hash: Mapped[str | None] = mapped_column(String(64), nullable=True)
     computed_at: Mapped[datetime] = mapped_column(DateTime)
 
+    __table_args__ = (Index("ix_feature_snapshots_content_hash", "feature_version", "event_normalized_id", "content_hash"),)
+
 
 class ModelArtifact(Base):
     __tablename__ = "model_artifacts"
@@ -120,7 +126,7 @@ class Pick(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     pick_lifecycle_id: Mapped[str] = mapped_column(String(36), default=lambda: str(uuid.uuid4()), index=True)
     odds_snapshot_id: Mapped[int] = mapped_column(ForeignKey("odds_snapshots.id"))
-    event_normalized_id: Mapped[int] = mapped_column(ForeignKey("events_normalized.id"))
+    event_normalized_id: Mapped[int] = mapped_column(ForeignKey("events_normalized.id"), index=True)
     feature_snapshot_id: Mapped[int] = mapped_column(ForeignKey("feature_snapshots.id"))
     model_version: Mapped[str] = mapped_column(String(40))
     feature_version: Mapped[str] = mapped_column(String(20))
@@ -136,7 +142,7 @@ class Pick(Base):
     ev_percent: Mapped[float] = mapped_column(Float)
     kelly_fraction: Mapped[float] = mapped_column(Float)
     tier: Mapped[str] = mapped_column(String(20))
-    created_at: Mapped[datetime] = mapped_column(DateTime)
+    created_at: Mapped[datetime] = mapped_column(DateTime, index=True)
     status: Mapped[PickStatus] = mapped_column(Enum(PickStatus), default=PickStatus.open)
 
 
@@ -164,7 +170,7 @@ class Settlement(Base):
     roi: Mapped[float] = mapped_column(Float)
     clv_market: Mapped[float | None] = mapped_column(Float, nullable=True)
     clv_book: Mapped[float | None] = mapped_column(Float, nullable=True)
-    settlement_source: Mapped[str] = mapped_column(String(20), default="simulated")
+    settlement_source: Mapped[str] = mapped_column(String(20), default="simulated", index=True)
 
 
 class PipelineRun(Base):
@@ -178,3 +184,48 @@ class PipelineRun(Base):
     mapping_anomaly_rate: Mapped[float] = mapped_column(Float)
     quarantine_count: Mapped[int] = mapped_column(Integer)
     metadata_json: Mapped[dict] = mapped_column(JSON)
+
+
+class PipelineRollup(Base):
+    """Running totals maintained alongside the rows they count, so run metrics avoid COUNT(*)."""
+
+    __tablename__ = "pipeline_rollups"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    picks_total: Mapped[int] = mapped_column(Integer, default=0)
+    closing_lines_total: Mapped[int] = mapped_column(Integer, default=0)
+    events_normalized_total: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class ClvRollup(Base):
+    """Running CLV moments per settlement source and segment, updated as settlements are written."""
+
+    __tablename__ = "clv_rollups"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    settlement_source: Mapped[str] = mapped_column(String(20))
+    book: Mapped[str] = mapped_column(String(40))
+    market: Mapped[str] = mapped_column(String(20))
+    tier: Mapped[str] = mapped_column(String(20))
+    model_version: Mapped[str] = mapped_column(String(40))
+    time_to_game: Mapped[str] = mapped_column(String(10))
+    settled: Mapped[int] = mapped_column(Integer, default=0)
+    market_n: Mapped[int] = mapped_column(Integer, default=0)
+    market_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    market_sum_sq: Mapped[float] = mapped_column(Float, default=0.0)
+    book_n: Mapped[int] = mapped_column(Integer, default=0)
+    book_sum: Mapped[float] = mapped_column(Float, default=0.0)
+    book_sum_sq: Mapped[float] = mapped_column(Float, default=0.0)
+    __table_args__ = (
+        UniqueConstraint("settlement_source", "book", "market", "tier", "model_version", "time_to_game", name="uq_clv_rollup_segment"),
+    )
+
+
+class ClvCheckpoint(Base):
+    """CLV summary frozen each time a settlement source crosses a multiple of `clv_checkpoint_every`."""
+
+    __tablename__ = "clv_checkpoints"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    settlement_source: Mapped[str] = mapped_column(String(20))
+    settled_total: Mapped[int] = mapped_column(Integer)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+    summary_json: Mapped[dict] = mapped_column(JSON)
+    __table_args__ = (UniqueConstraint("settlement_source", "settled_total", name="uq_clv_checkpoint"),)
@@ -16,3 +16,8 @@ class PickOut(BaseModel):
     kelly_fraction: float
     tier: str
     created_at: datetime
+
+
+class PickPage(BaseModel):
+    items: list[PickOut]
+    next_cursor: str | None = None
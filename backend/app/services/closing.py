@@ -0,0 +1,174 @@
+"""Closing-line capture: indexed close lookup and bulk close writes at event start."""
+
+from __future__ import annotations
+
+import bisect
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.core.config import settings
+from backend.app.models.all_models import ClosingLine, EventNormalized, EventRaw, OddsSnapshot, Pick, PickStatus, Settlement
+from backend.app.services.consensus import build_market_consensus_batch, pack_event_lines
+from backend.app.services.odds_math import american_to_implied_prob
+from backend.app.services.rollups import increment_pipeline_rollup, record_clv_settlement
+from backend.app.services.tick_store import tick_store
+
+logger = logging.getLogger(__name__)
+
+
+def close_window(event_start_time: datetime, window_minutes: int | None = None) -> tuple[datetime, datetime]:
+    return event_start_time - timedelta(minutes=window_minutes or settings.close_capture_window_minutes), event_start_time
+
+
+def close_lookup_window(event_start_time: datetime, window_minutes: int | None = None) -> tuple[datetime, datetime]:
+    """Range a close lookup searches: the close window widened back by one odds heartbeat.
+
+    Delta ingestion only rewrites an unchanged price every `odds_heartbeat_seconds`, so the
+    quote in force at the start may predate the window by up to one heartbeat.
+    """
+    start, end = close_window(event_start_time, window_minutes)
+    return start - timedelta(seconds=settings.odds_heartbeat_seconds), end
+
+
+class CloseIndex:
+    """One event's ticks indexed by (book, side), each sorted by timestamp for bisect lookups."""
+
+    def __init__(self, lines: list[dict]) -> None:
+        by_key: dict[tuple[str, str], list[dict]] = {}
+        for line in lines:
+            by_key.setdefault((line["book"], line["side"]), []).append(line)
+        self._lines = {key: sorted(rows, key=lambda row: row["timestamp"]) for key, rows in by_key.items()}
+        self._timestamps = {key: [row["timestamp"] for row in rows] for key, rows in self._lines.items()}
+
+    def latest(self, book: str, side: str, start: datetime, end: datetime) -> dict | None:
+        """Latest quote for a book/side with start <= timestamp <= end."""
+        timestamps = self._timestamps.get((book, side))
+        if not timestamps:
+            return None
+        position = bisect.bisect_right(timestamps, end)
+        if position == 0 or timestamps[position - 1] < start:
+            return None
+        return self._lines[(book, side)][position - 1]
+
+    def latest_lines(self, start: datetime, end: datetime) -> list[dict]:
+        """Each book/side's closing quote in the window: the consensus input."""
+        latest = (self.latest(book, side, start, end) for book, side in self._lines)
+        return [line for line in latest if line is not None]
+
+
+def build_close_records(pick: Pick, close_quote: dict, close_market_prob: float | None) -> tuple[ClosingLine, Settlement]:
+    """ClosingLine and (simulated) Settlement for a pick closed at `close_quote`."""
+    close_implied_prob = american_to_implied_prob(close_quote["price"])
+    closing = ClosingLine(
+        pick_id=pick.id,
+        close_price=close_quote["price"],
+        close_implied_prob=close_implied_prob,
+        captured_at=close_quote["timestamp"],
+        market_close_consensus=close_market_prob,
+        closing_line_snapshot_id=close_quote["snapshot_id"],
+        close_book_price=close_quote["price"],
+        close_book_implied_prob=close_implied_prob,
+        close_market_consensus_prob=close_market_prob,
+    )
+    settlement = Settlement(
+        pick_id=pick.id,
+        result="W",
+        settled_at=datetime.utcnow(),
+        pnl=pick.decimal_odds - 1,
+        roi=pick.ev_percent,
+        clv_market=(close_market_prob - pick.implied_prob) if close_market_prob is not None else None,
+        clv_book=close_implied_prob - pick.implied_prob,
+        settlement_source="simulated",
+    )
+    return closing, settlement
+
+
+def window_lines_query(event_normalized_id: int, start: datetime, end: datetime) -> Select:
+    """Stored non-stale quotes for one event in a close lookup window (served by `ix_odds_snapshots_event_book_side_ts`)."""
+    return select(OddsSnapshot.id, OddsSnapshot.book, OddsSnapshot.market, OddsSnapshot.side, OddsSnapshot.price, OddsSnapshot.timestamp).where(
+        OddsSnapshot.event_normalized_id == event_normalized_id,
+        OddsSnapshot.is_stale.is_(False),
+        OddsSnapshot.timestamp >= start,
+        OddsSnapshot.timestamp <= end,
+    )
+
+
+async def _window_lines_from_db(session: AsyncSession, event_normalized_id: int, start: datetime, end: datetime) -> list[dict]:
+    """Fallback for events the tick store does not hold (e.g. after a restart)."""
+    rows = await session.execute(window_lines_query(event_normalized_id, start, end))
+    return [
+        {"book": row.book, "market": row.market, "side": row.side, "price": row.price, "timestamp": row.timestamp, "snapshot_id": row.id}
+        for row in rows
+    ]
+
+
+def open_picks_without_close_query(now: datetime) -> Select:
+    """Open picks made within `close_capture_lookback_hours` on events that have started and have no close yet.
+
+    Bounding by pick age rather than start time keeps picks whose close capture was delayed
+    (e.g. by downtime) eligible until they are captured or age out.
+    """
+    return (
+        select(Pick, EventNormalized.start_time, EventRaw.source, EventRaw.external_event_id)
+        .join(EventNormalized, EventNormalized.id == Pick.event_normalized_id)
+        .join(EventRaw, EventRaw.id == EventNormalized.event_raw_id)
+        .outerjoin(ClosingLine, ClosingLine.pick_id == Pick.id)
+        .where(
+            Pick.status == PickStatus.open,
+            Pick.created_at >= now - timedelta(hours=settings.close_capture_lookback_hours),
+            ClosingLine.id.is_(None),
+            EventNormalized.start_time <= now,
+        )
+    )
+
+
+async def capture_started_event_closes(session: AsyncSession, now: datetime | None = None) -> int:
+    """Write closing lines and settlements for every open pick on events that have started.
+
+    Ticks come from the tick store (or `odds_snapshots` when it has none for an event), so a
+    pick gets its close even if the run that emitted it never saw the closing quotes.
+    """
+    now = now or datetime.utcnow()
+    rows = (await session.execute(open_picks_without_close_query(now))).all()
+    if not rows:
+        return 0
+
+    by_event: dict[tuple, tuple[datetime, int, list[Pick]]] = {}
+    for pick, start_time, source, external_event_id in rows:
+        by_event.setdefault((source, external_event_id), (start_time, pick.event_normalized_id, []))[2].append(pick)
+
+    indexes: list[CloseIndex] = []
+    windows: list[tuple[datetime, datetime]] = []
+    for event_key, (start_time, event_normalized_id, _) in by_event.items():
+        window = close_lookup_window(start_time)
+        lines = tick_store.window_lines(event_key, *window) or await _window_lines_from_db(session, event_normalized_id, *window)
+        indexes.append(CloseIndex(lines))
+        windows.append(window)
+    decisions = build_market_consensus_batch(
+        pack_event_lines([index.latest_lines(*window) for index, window in zip(indexes, windows, strict=True)]),
+        min_books=settings.consensus_min_books,
+    )
+
+    closes: list[ClosingLine] = []
+    for (event_key, (start_time, _, picks)), index, window, decision in zip(by_event.items(), indexes, windows, decisions, strict=True):
+        close_market_prob = decision.result.home_prob if decision.result else None
+        for pick in picks:
+            close_quote = index.latest(pick.book, pick.side, *window)
+            if close_quote is None:
+                continue
+            closing, settlement = build_close_records(pick, close_quote, close_market_prob)
+            closes.append(closing)
+            session.add(settlement)
+            pick.status = PickStatus.settled
+            await record_clv_settlement(session, settlement, pick, start_time)
+
+    if closes:
+        # One flush batches the rows into multi-row INSERTs.
+        session.add_all(closes)
+        await session.flush()
+        await increment_pipeline_rollup(session, closing_lines=len(closes))
+    logger.info("closes_captured", extra={"events": len(by_event), "picks": len(rows), "closes": len(closes)})
+    return len(closes)
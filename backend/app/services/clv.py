@@ -0,0 +1,119 @@
+"""Segmented closing-line-value statistics computed from running moments."""
+
+from __future__ import annotations
+
+import math
+
+from sqlalchemy import Select, case, func, select
+from sqlalchemy.sql.elements import ColumnElement
+
+from backend.app.models.all_models import ClvRollup, EventNormalized, Pick, Settlement
+
+SEGMENT_FIELDS = ("book", "market", "tier", "model_version", "time_to_game")
+# Upper bound in hours (exclusive) and label; anything later falls into the last bucket.
+TIME_TO_GAME_BUCKETS = ((1, "0-1h"), (6, "1-6h"), (24, "6-24h"))
+TIME_TO_GAME_OVERFLOW = "24h+"
+Z_95 = 1.96
+
+
+def time_to_game_bucket(hours: float) -> str:
+    for upper, label in TIME_TO_GAME_BUCKETS:
+        if hours < upper:
+            return label
+    return TIME_TO_GAME_OVERFLOW
+
+
+def _hours_between(start: ColumnElement, end: ColumnElement, dialect_name: str) -> ColumnElement:
+    if dialect_name == "sqlite":
+        return (func.julianday(end) - func.julianday(start)) * 24.0
+    return func.extract("epoch", end - start) / 3600.0
+
+
+def time_to_game_bucket_expr(dialect_name: str) -> ColumnElement:
+    """SQL twin of `time_to_game_bucket` for hours between pick creation and game start."""
+    hours = _hours_between(Pick.created_at, EventNormalized.start_time, dialect_name)
+    return case(*[(hours < upper, label) for upper, label in TIME_TO_GAME_BUCKETS], else_=TIME_TO_GAME_OVERFLOW)
+
+
+def clv_segments_query(dialect_name: str, include_simulated: bool) -> Select:
+    """Per-segment count, sum and sum of squares of market and book CLV.
+
+    NULL CLV values are skipped by the aggregates, so each measure carries its own count.
+    """
+    bucket = time_to_game_bucket_expr(dialect_name).label("time_to_game")
+    stmt = (
+        select(
+            Pick.book,
+            Pick.market,
+            Pick.tier,
+            Pick.model_version,
+            bucket,
+            func.count(Settlement.clv_market).label("market_n"),
+            func.sum(Settlement.clv_market).label("market_sum"),
+            func.sum(Settlement.clv_market * Settlement.clv_market).label("market_sum_sq"),
+            func.count(Settlement.clv_book).label("book_n"),
+            func.sum(Settlement.clv_book).label("book_sum"),
+            func.sum(Settlement.clv_book * Settlement.clv_book).label("book_sum_sq"),
+            func.count().label("settled"),
+        )
+        .join(Pick, Pick.id == Settlement.pick_id)
+        .join(EventNormalized, EventNormalized.id == Pick.event_normalized_id)
+        .group_by(Pick.book, Pick.market, Pick.tier, Pick.model_version, bucket)
+        .order_by(Pick.book, Pick.market, Pick.tier, Pick.model_version, bucket)
+    )
+    if not include_simulated:
+        stmt = stmt.where(Settlement.settlement_source == "official")
+    return stmt
+
+
+def summarize_moments(n: int, total: float | None, total_sq: float | None) -> dict:
+    """Mean, sample variance and a normal 95% interval from count/sum/sum-of-squares."""
+    if n == 0:
+        return {"count": 0, "mean": None, "variance": None, "ci_low": None, "ci_high": None}
+    mean = (total or 0.0) / n
+    if n < 2:
+        return {"count": n, "mean": mean, "variance": None, "ci_low": None, "ci_high": None}
+    variance = max(((total_sq or 0.0) - n * mean * mean) / (n - 1), 0.0)
+    half_width = Z_95 * math.sqrt(variance / n)
+    return {"count": n, "mean": mean, "variance": variance, "ci_low": mean - half_width, "ci_high": mean + half_width}
+
+
+def clv_rollup_segments_query(include_simulated: bool) -> Select:
+    """Same row shape as `clv_segments_query`, read from `clv_rollups` in O(segments)."""
+    segment = [getattr(ClvRollup, field) for field in SEGMENT_FIELDS]
+    stmt = (
+        select(
+            *segment,
+            func.sum(ClvRollup.market_n).label("market_n"),
+            func.sum(ClvRollup.market_sum).label("market_sum"),
+            func.sum(ClvRollup.market_sum_sq).label("market_sum_sq"),
+            func.sum(ClvRollup.book_n).label("book_n"),
+            func.sum(ClvRollup.book_sum).label("book_sum"),
+            func.sum(ClvRollup.book_sum_sq).label("book_sum_sq"),
+            func.sum(ClvRollup.settled).label("settled"),
+        )
+        .group_by(*segment)
+        .order_by(*segment)
+    )
+    if not include_simulated:
+        stmt = stmt.where(ClvRollup.settlement_source == "official")
+    return stmt
+
+
+def summarize_segments(rows) -> dict:
+    """Overall and per-segment CLV statistics from rows carrying per-segment moments."""
+    segments = [
+        {
+            **{field: getattr(row, field) for field in SEGMENT_FIELDS},
+            "settled": row.settled,
+            "clv_market": summarize_moments(row.market_n, row.market_sum, row.market_sum_sq),
+            "clv_book": summarize_moments(row.book_n, row.book_sum, row.book_sum_sq),
+        }
+        for row in rows
+    ]
+    return {
+        "settled": sum(row.settled for row in rows),
+        "clv_market": summarize_moments(sum(r.market_n for r in rows), sum(r.market_sum or 0.0 for r in rows), sum(r.market_sum_sq or 0.0 for r in rows)),
+        "clv_book": summarize_moments(sum(r.book_n for r in rows), sum(r.book_sum or 0.0 for r in rows), sum(r.book_sum_sq or 0.0 for r in rows)),
+        "segments": segments,
+    }
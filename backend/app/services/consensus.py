@@ -3,8 +3,12 @@ from __future__ import annotations
 from collections import defaultdict
 from dataclasses import dataclass
 
+import numpy as np
+
 from backend.app.core.config import settings
-from backend.app.services.odds_math import american_to_implied_prob, remove_vig_two_way
+from backend.app.services.odds_math import american_to_decimal_array, american_to_implied_prob, remove_vig_two_way
+
+SIDES = ("home", "away")
 
 
 @dataclass
@@ -66,3 +70,107 @@ def build_market_consensus(lines: list[dict], *, min_books: int | None = None, b
     home_consensus = sum(p * w for p, w in zip(home_probs, weights, strict=False)) / weight_sum
     away_consensus = sum(p * w for p, w in zip(away_probs, weights, strict=False)) / weight_sum
     return ConsensusDecision(result=ConsensusResult(home_prob=home_consensus, away_prob=away_consensus, books_used=len(home_probs)))
+
+
+@dataclass
+class PackedOdds:
+    """A payload's prices packed as (event, book, side) arrays.
+
+    `prices` holds American odds with NaN for missing or stale quotes. `book_rank` is the
+    order in which each book first quoted the event (inf if it never did), which is the
+    order `build_market_consensus` pairs books with weights in.
+    """
+
+    prices: np.ndarray
+    book_rank: np.ndarray
+    books: list[str]
+
+
+def pack_event_lines(events_lines: list[list[dict]]) -> PackedOdds:
+    """Pack per-event line lists into a `PackedOdds`; later quotes for a book/side win."""
+    side_index = {side: idx for idx, side in enumerate(SIDES)}
+    books: dict[str, int] = {}
+    quotes: list[tuple[int, int, int, float]] = []
+    ranks: list[tuple[int, int, int]] = []
+    for event_idx, lines in enumerate(events_lines):
+        first_quote: dict[int, int] = {}
+        for row in lines:
+            side = side_index.get(row["side"])
+            if row.get("is_stale") or side is None:
+                continue
+            book_idx = books.setdefault(row["book"], len(books))
+            first_quote.setdefault(book_idx, len(first_quote))
+            quotes.append((event_idx, book_idx, side, row["price"]))
+        ranks.extend((event_idx, book_idx, rank) for book_idx, rank in first_quote.items())
+
+    prices = np.full((len(events_lines), len(books), len(SIDES)), np.nan)
+    book_rank = np.full((len(events_lines), len(books)), np.inf)
+    if quotes:
+        event_idx, book_idx, side_idx, price = (np.array(column) for column in zip(*quotes, strict=True))
+        # NumPy leaves the winner of repeated fancy-index assignments unspecified, so keep each
+        # (event, book, side)'s last quote explicitly: first occurrence in the reversed order.
+        flat = np.ravel_multi_index((event_idx, book_idx, side_idx), prices.shape)
+        _, first_reversed = np.unique(flat[::-1], return_index=True)
+        last = len(flat) - 1 - first_reversed
+        prices[event_idx[last], book_idx[last], side_idx[last]] = price[last]
+        event_idx, book_idx, rank = (np.array(column) for column in zip(*ranks, strict=True))
+        book_rank[event_idx, book_idx] = rank
+    return PackedOdds(prices=prices, book_rank=book_rank, books=list(books))
+
+
+def build_market_consensus_batch(packed: PackedOdds, *, min_books: int | None = None, book_weights: dict[str, float] | None = None) -> list[ConsensusDecision]:
+    """Vectorized `build_market_consensus` over every event in `packed`.
+
+    Implied-probability conversion, vig removal, outlier trimming and book weighting run
+    as array operations; the decisions and missing reasons match the scalar path.
+    """
+    threshold = min_books or settings.consensus_min_books
+    n_events, n_books, _ = packed.prices.shape
+    if n_events == 0:
+        return []
+
+    implied = 1 / american_to_decimal_array(packed.prices)
+    quoted = ~np.isnan(implied)
+    books_quoted = quoted.any(axis=2).sum(axis=1)
+    two_way = quoted.all(axis=2)
+    usable = two_way.sum(axis=1)
+
+    with np.errstate(invalid="ignore"):
+        total = implied.sum(axis=2)
+        home = np.where(two_way, implied[:, :, 0] / total, np.nan)
+        away = np.where(two_way, implied[:, :, 1] / total, np.nan)
+
+    # Usable books first, in the order each event quoted them.
+    order = np.argsort(np.where(two_way, packed.book_rank, np.inf), axis=1, kind="stable")
+    weight_row = np.array([float((book_weights or {}).get(book, 1.0)) for book in packed.books])
+    weights = np.take_along_axis(np.broadcast_to(weight_row, (n_events, n_books)), order, axis=1)
+
+    trim = settings.consensus_trim_outliers & (usable >= 6)
+    kept = np.where(trim, usable - 2, usable)
+    mask = np.arange(n_books) < kept[:, None]
+
+    def _side_values(probs: np.ndarray) -> np.ndarray:
+        # Untrimmed: usable books in quote order. Trimmed: sorted values minus the lowest/highest.
+        in_order = np.take_along_axis(probs, order, axis=1)
+        trimmed = np.concatenate([np.sort(probs, axis=1)[:, 1:], np.full((n_events, 1), np.nan)], axis=1)
+        return np.where(mask, np.where(trim[:, None], trimmed, in_order), 0.0)
+
+    weights = np.where(mask, weights, 0.0)
+    weight_sum = weights.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        home_consensus = (_side_values(home) * weights).sum(axis=1) / weight_sum
+        away_consensus = (_side_values(away) * weights).sum(axis=1) / weight_sum
+
+    decisions: list[ConsensusDecision] = []
+    for quoted_count, usable_count, kept_count, weight_total, home_prob, away_prob in zip(
+        books_quoted.tolist(), usable.tolist(), kept.tolist(), weight_sum.tolist(), home_consensus.tolist(), away_consensus.tolist(), strict=True
+    ):
+        if quoted_count < threshold:
+            decisions.append(ConsensusDecision(result=None, missing_reason="INSUFFICIENT_BOOKS"))
+        elif usable_count < threshold:
+            decisions.append(ConsensusDecision(result=None, missing_reason="INCOMPLETE_TWO_WAY_MARKET"))
+        elif weight_total <= 0:
+            decisions.append(ConsensusDecision(result=None, missing_reason="INVALID_BOOK_WEIGHTS"))
+        else:
+            decisions.append(ConsensusDecision(result=ConsensusResult(home_prob=home_prob, away_prob=away_prob, books_used=kept_count)))
+    return decisions
@@ -1,17 +1,210 @@
 from __future__ import annotations
 
+import hashlib
+import json
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.app.models.all_models import FeatureSnapshot
+
+FEATURE_VERSION = "v1"
+
+
+@dataclass(frozen=True)
+class FeatureContext:
+    home_team_id: int | None
+    away_team_id: int | None
+    as_of: datetime
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """One model-facing feature: how to compute it and how long a computed value stays valid."""
+
+    name: str
+    ttl_seconds: int
+    compute: Callable[[FeatureContext], float]
+
+
+# Baseline values until real team data lands; the TTLs reflect how fast each input moves.
+FEATURE_SPECS: tuple[FeatureSpec, ...] = (
+    FeatureSpec("team_win_loss_home_away", 6 * 3600, lambda ctx: 0.52),
+    FeatureSpec("recent_form_last_n", 3600, lambda ctx: 0.5),
+    FeatureSpec("head_to_head", 24 * 3600, lambda ctx: 0.5),
+    FeatureSpec("rest_days_density", 3600, lambda ctx: 0.0),
+    FeatureSpec("off_def_efficiency", 6 * 3600, lambda ctx: 0.0),
+    FeatureSpec("home_court_advantage", 24 * 3600, lambda ctx: 1.0),
+)
 
 
 def build_pregame_features(event_id: int, as_of: datetime) -> dict:
     """Baseline feature structure for NBA pre-game modeling."""
-    return {
-        "event_id": event_id,
-        "team_win_loss_home_away": 0.52,
-        "recent_form_last_n": 0.5,
-        "head_to_head": 0.5,
-        "rest_days_density": 0.0,
-        "off_def_efficiency": 0.0,
-        "home_court_advantage": 1.0,
-        "as_of": as_of.isoformat(),
-    }
+    context = FeatureContext(None, None, as_of)
+    return {"event_id": event_id, **{spec.name: spec.compute(context) for spec in FEATURE_SPECS}, "as_of": as_of.isoformat()}
+
+
+def feature_content_hash(values: dict, feature_version: str = FEATURE_VERSION) -> str:
+    """SHA-256 of the version and model-facing values; identical snapshots hash identically."""
+    payload = json.dumps({"feature_version": feature_version, "values": values}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def snapshot_ids_by_hash_query(feature_version: str, keys: set[tuple[int, str]]):
+    """Stored snapshots for (event_normalized_id, content_hash) keys; callers drop the cross pairs."""
+    return select(FeatureSnapshot.event_normalized_id, FeatureSnapshot.content_hash, FeatureSnapshot.id).where(
+        FeatureSnapshot.feature_version == feature_version,
+        FeatureSnapshot.event_normalized_id.in_({event_id for event_id, _ in keys}),
+        FeatureSnapshot.content_hash.in_({content_hash for _, content_hash in keys}),
+    )
+
+
+@dataclass
+class StoredFeatures:
+    """Feature values for one candidate and the content-addressed snapshot row holding them.
+
+    `snapshot` is set when this run writes the row (its id is assigned on flush), otherwise
+    `snapshot_id` points at an existing row with the same content.
+    """
+
+    values: dict
+    content_hash: str
+    snapshot: FeatureSnapshot | None = None
+    snapshot_id: int | None = None
+
+    @property
+    def id(self) -> int:
+        return self.snapshot.id if self.snapshot is not None else self.snapshot_id
+
+
+class FeatureStore:
+    """Process-local cache of computed features and of content-addressed snapshot ids.
+
+    A value is cached per event under (feature_version, feature, home team, away team) with the
+    as-of it was computed at, and is reused until it is `ttl_seconds` old; a remapped team or
+    an earlier as-of recomputes it. Snapshots are keyed by
+    (event_normalized_id, `feature_content_hash`): a run reuses the event's stored row instead
+    of writing an identical one, and events with equal values still get their own rows.
+    """
+
+    def __init__(self, specs: tuple[FeatureSpec, ...] = FEATURE_SPECS, feature_version: str = FEATURE_VERSION) -> None:
+        self.specs = specs
+        self.feature_version = feature_version
+        self._values: dict[tuple, dict[tuple, tuple[datetime, float]]] = {}
+        self._start_times: dict[tuple, datetime] = {}
+        self._snapshot_ids: dict[tuple[int, str], int] = {}
+        self._snapshot_starts: dict[int, datetime] = {}
+        self.hits = 0
+        self.misses = 0
+        self.snapshots_reused = 0
+        self.snapshots_written = 0
+
+    def features(self, event_key: tuple, start_time: datetime, context: FeatureContext) -> dict:
+        """Model-facing values for one event, computing only features that expired or are missing."""
+        self._start_times[event_key] = start_time
+        cache = self._values.setdefault(event_key, {})
+        values: dict = {}
+        for spec in self.specs:
+            key = (self.feature_version, spec.name, context.home_team_id, context.away_team_id)
+            cached = cache.get(key)
+            if cached is not None and 0 <= (context.as_of - cached[0]).total_seconds() < spec.ttl_seconds:
+                self.hits += 1
+                values[spec.name] = cached[1]
+                continue
+            self.misses += 1
+            value = spec.compute(context)
+            cache[key] = (context.as_of, value)
+            values[spec.name] = value
+        return values
+
+    async def snapshots(
+        self, session: AsyncSession, event_ids: list[int], start_times: list[datetime], feature_values: list[dict], computed_at: datetime
+    ) -> list[StoredFeatures]:
+        """Resolve each event's feature dict to its existing snapshot with the same hash, or a new row.
+
+        Unknown (event, hash) keys are looked up in one query; rows still missing are added to
+        the session (once per key) and their ids are cached when the session commits.
+        """
+        keys = [(event_id, feature_content_hash(values, self.feature_version)) for event_id, values in zip(event_ids, feature_values, strict=True)]
+        self._snapshot_starts.update(zip(event_ids, start_times, strict=True))
+        unknown = {key for key in keys if key not in self._snapshot_ids}
+        if unknown:
+            rows = await session.execute(snapshot_ids_by_hash_query(self.feature_version, unknown))
+            self._snapshot_ids.update({(event_id, content_hash): snapshot_id for event_id, content_hash, snapshot_id in rows if (event_id, content_hash) in unknown})
+
+        new_rows: dict[tuple[int, str], FeatureSnapshot] = {}
+        stored: list[StoredFeatures] = []
+        for (event_id, content_hash), values in zip(keys, feature_values, strict=True):
+            snapshot_id = self._snapshot_ids.get((event_id, content_hash))
+            if snapshot_id is not None:
+                self.snapshots_reused += 1
+                stored.append(StoredFeatures(values, content_hash, snapshot_id=snapshot_id))
+                continue
+            snapshot = new_rows.get((event_id, content_hash))
+            if snapshot is None:
+                snapshot = new_rows[(event_id, content_hash)] = FeatureSnapshot(
+                    event_normalized_id=event_id, feature_version=self.feature_version, features_json=values,
+                    content_hash=content_hash, computed_at=computed_at,
+                )
+                self.snapshots_written += 1
+            else:
+                self.snapshots_reused += 1
+            stored.append(StoredFeatures(values, content_hash, snapshot=snapshot))
+        session.add_all(new_rows.values())
+        session.sync_session.info.setdefault("feature_snapshots_pending", []).extend(new_rows.values())
+        return stored
+
+    def evict_started(self, now: datetime) -> None:
+        for event_key in [key for key, start in self._start_times.items() if start <= now]:
+            del self._start_times[event_key]
+            self._values.pop(event_key, None)
+        started = {event_id for event_id, start in self._snapshot_starts.items() if start <= now}
+        if started:
+            self._snapshot_ids = {key: snapshot_id for key, snapshot_id in self._snapshot_ids.items() if key[0] not in started}
+            for event_id in started:
+                del self._snapshot_starts[event_id]
+
+    def clear(self) -> None:
+        self._values.clear()
+        self._start_times.clear()
+        self._snapshot_ids.clear()
+        self._snapshot_starts.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "snapshots_reused": self.snapshots_reused,
+            "snapshots_written": self.snapshots_written,
+            "cached_values": sum(len(cache) for cache in self._values.values()),
+        }
+
+
+feature_store = FeatureStore()
+
+
+@event.listens_for(Session, "after_flush")
+def _note_flushed_snapshots(session: Session, flush_context) -> None:
+    # Ids are read after flush, before commit can expire the instances.
+    pending = session.info.get("feature_snapshots_pending")
+    if pending:
+        flushed = session.info.setdefault("feature_snapshot_ids", {})
+        for snapshot in pending:
+            if snapshot.id is not None:
+                flushed[(snapshot.event_normalized_id, snapshot.content_hash)] = snapshot.id
+
+
+@event.listens_for(Session, "after_commit")
+def _cache_committed_snapshots(session: Session) -> None:
+    session.info.pop("feature_snapshots_pending", None)
+    feature_store._snapshot_ids.update(session.info.pop("feature_snapshot_ids", {}))
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending_snapshots(session: Session, previous_transaction) -> None:
+    session.info.pop("feature_snapshots_pending", None)
+    session.info.pop("feature_snapshot_ids", None)
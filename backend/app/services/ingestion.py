@@ -0,0 +1,144 @@
+"""Batched write path for provider odds."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import settings
+from backend.app.models.all_models import OddsSnapshot
+
+
+def build_snapshot_rows(event_raw_id: int, event_normalized_id: int | None, lines: list[dict], now: datetime) -> list[dict]:
+    """Map provider lines to `odds_snapshots` insert parameters, flagging stale prices."""
+    return [
+        {
+            "event_raw_id": event_raw_id,
+            "event_normalized_id": event_normalized_id,
+            "book": line["book"],
+            "market": line["market"],
+            "side": line["side"],
+            "price": line["price"],
+            "timestamp": line["timestamp"],
+            "is_stale": (now - line["timestamp"]).total_seconds() > settings.stale_snapshot_max_age_seconds,
+        }
+        for line in lines
+    ]
+
+
+async def write_odds_snapshots(session: AsyncSession, rows: list[dict]) -> list[int]:
+    """Insert snapshot rows as one multi-row INSERT and return their ids in input order.
+
+    Postgres gets an ordered ``INSERT ... RETURNING`` batch. SQLite cannot batch an ordered
+    RETURNING, but it assigns rowids in VALUES order within a single statement, so the
+    unordered batch is sorted instead.
+    """
+    if not rows:
+        return []
+    ordered = session.bind.dialect.name != "sqlite"
+    stmt = insert(OddsSnapshot).returning(OddsSnapshot.id, sort_by_parameter_order=ordered)
+    ids = list((await session.execute(stmt, rows)).scalars())
+    return ids if ordered else sorted(ids)
+
+
+def attach_snapshot_ids(lines: list[dict], rows: list[dict], snapshot_ids: list[int]) -> list[dict]:
+    """Return the fresh lines with their stored snapshot ids, ready for consensus."""
+    return [
+        {**line, "snapshot_id": snapshot_id, "is_stale": row["is_stale"]}
+        for line, row, snapshot_id in zip(lines, rows, snapshot_ids, strict=True)
+        if not row["is_stale"]
+    ]
+
+
+def odds_event_key(event: dict) -> tuple:
+    """Identity of a provider event across polls (each poll creates new event rows)."""
+    return (event["source"], event["external_event_id"])
+
+
+class OddsDeltaTracker:
+    """Remembers the last stored price per (event, book, market, side) for change-only ingestion.
+
+    A line is written only when its price moved or `odds_heartbeat_seconds` passed since the
+    last stored row; otherwise the earlier snapshot is reused. Because an unchanged price is
+    still the price "as of" any later time, latest-as-of-T lookups over `odds_snapshots`
+    keep returning the right quote as long as they reach back one heartbeat (see
+    `closing.close_lookup_window`).
+
+    A snapshot is only reused for the normalized event it was stored against; its
+    `event_raw_id` keeps pointing at the poll that first observed the price.
+    """
+
+    def __init__(self) -> None:
+        self._last: dict[tuple, dict[tuple, tuple[int, datetime, int, int | None]]] = {}
+        self._start_times: dict[tuple, datetime] = {}
+
+    def reusable_ids(self, event_key: tuple, rows: list[dict]) -> list[int | None]:
+        """Snapshot id to reuse for each row, or None where the row has to be written."""
+        known = self._last.get(event_key, {})
+        reusable: list[int | None] = []
+        for row in rows:
+            last = known.get((row["book"], row["market"], row["side"]))
+            unchanged = last is not None and last[0] == row["price"] and last[3] == row["event_normalized_id"]
+            fresh = last is not None and (row["timestamp"] - last[1]).total_seconds() < settings.odds_heartbeat_seconds
+            reusable.append(last[2] if unchanged and fresh else None)
+        return reusable
+
+    def record(self, event_key: tuple, start_time: datetime, rows: list[dict], snapshot_ids: list[int]) -> None:
+        known = self._last.setdefault(event_key, {})
+        self._start_times[event_key] = start_time
+        for row, snapshot_id in zip(rows, snapshot_ids, strict=True):
+            known[(row["book"], row["market"], row["side"])] = (row["price"], row["timestamp"], snapshot_id, row["event_normalized_id"])
+
+    def record_on_commit(self, session: AsyncSession, event_key: tuple, start_time: datetime, rows: list[dict], snapshot_ids: list[int]) -> None:
+        """Defer `record` until the session commits, so rolled-back ids are never reused."""
+        session.sync_session.info.setdefault("odds_delta_pending", []).append((event_key, start_time, rows, snapshot_ids))
+
+    def evict_started(self, now: datetime) -> None:
+        for event_key in [key for key, start in self._start_times.items() if start <= now]:
+            self._last.pop(event_key, None)
+            self._start_times.pop(event_key, None)
+
+    def clear(self) -> None:
+        self._last.clear()
+        self._start_times.clear()
+
+
+odds_delta_tracker = OddsDeltaTracker()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_odds_deltas(session: Session) -> None:
+    for pending in session.info.pop("odds_delta_pending", []):
+        odds_delta_tracker.record(*pending)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending_odds_deltas(session: Session, previous_transaction) -> None:
+    session.info.pop("odds_delta_pending", None)
+
+
+async def store_snapshots(session: AsyncSession, events: list[dict], snapshot_rows: list[list[dict]]) -> list[list[int]]:
+    """Write a chunk's snapshot rows in one batch and return the snapshot ids per event.
+
+    In delta mode unchanged quotes reuse their earlier snapshot instead of adding a row.
+    """
+    if settings.odds_delta_mode:
+        reusable = [odds_delta_tracker.reusable_ids(odds_event_key(event), rows) for event, rows in zip(events, snapshot_rows, strict=True)]
+    else:
+        reusable = [[None] * len(rows) for rows in snapshot_rows]
+
+    to_write = [row for rows, ids in zip(snapshot_rows, reusable, strict=True) for row, reuse in zip(rows, ids, strict=True) if reuse is None]
+    written = iter(await write_odds_snapshots(session, to_write))
+
+    snapshot_ids: list[list[int]] = []
+    for event, rows, ids in zip(events, snapshot_rows, reusable, strict=True):
+        event_ids = [reuse if reuse is not None else next(written) for reuse in ids]
+        snapshot_ids.append(event_ids)
+        if settings.odds_delta_mode:
+            new = [(row, snapshot_id) for row, snapshot_id, reuse in zip(rows, event_ids, ids, strict=True) if reuse is None]
+            if new:
+                odds_delta_tracker.record_on_commit(session, odds_event_key(event), event["start_time"], [row for row, _ in new], [snapshot_id for _, snapshot_id in new])
+    return snapshot_ids
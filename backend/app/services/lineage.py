@@ -0,0 +1,104 @@
+"""Streaming export of pick lineage: snapshot -> pick -> closing line -> settlement."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator
+
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.app.models.all_models import ClosingLine, OddsSnapshot, Pick, Settlement
+
+EXPORT_BATCH_SIZE = 1000
+
+LINEAGE_COLUMNS = (
+    Pick.id.label("pick_id"),
+    Pick.pick_lifecycle_id,
+    Pick.event_normalized_id,
+    Pick.model_version,
+    Pick.feature_version,
+    Pick.market,
+    Pick.side,
+    Pick.book,
+    Pick.tier,
+    Pick.pick_time_price,
+    Pick.implied_prob,
+    Pick.market_consensus_prob,
+    Pick.model_prob,
+    Pick.model_edge,
+    Pick.ev_percent,
+    Pick.kelly_fraction,
+    Pick.created_at,
+    OddsSnapshot.id.label("snapshot_id"),
+    OddsSnapshot.timestamp.label("snapshot_timestamp"),
+    OddsSnapshot.price.label("snapshot_price"),
+    ClosingLine.close_book_price,
+    ClosingLine.close_book_implied_prob,
+    ClosingLine.close_market_consensus_prob,
+    ClosingLine.captured_at.label("close_captured_at"),
+    Settlement.result,
+    Settlement.settled_at,
+    Settlement.pnl,
+    Settlement.roi,
+    Settlement.clv_market,
+    Settlement.clv_book,
+    Settlement.settlement_source,
+)
+LINEAGE_FIELDS = tuple(column.key for column in LINEAGE_COLUMNS)
+
+
+def lineage_export_query(start: datetime | None = None, end: datetime | None = None, model_version: str | None = None) -> Select:
+    """Picks created in [start, end), joined to their snapshot and, when present, close and settlement."""
+    stmt = (
+        select(*LINEAGE_COLUMNS)
+        .join(OddsSnapshot, OddsSnapshot.id == Pick.odds_snapshot_id)
+        .outerjoin(ClosingLine, ClosingLine.pick_id == Pick.id)
+        .outerjoin(Settlement, Settlement.pick_id == Pick.id)
+        .order_by(Pick.created_at, Pick.id)
+    )
+    if start is not None:
+        stmt = stmt.where(Pick.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(Pick.created_at < end)
+    if model_version is not None:
+        stmt = stmt.where(Pick.model_version == model_version)
+    return stmt
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    return value
+
+
+def _ndjson_chunk(rows) -> str:
+    return "".join(json.dumps(dict(zip(LINEAGE_FIELDS, map(_plain, row)))) + "\n" for row in rows)
+
+
+def _csv_chunk(rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(LINEAGE_FIELDS)
+    writer.writerows([[_plain(value) for value in row] for row in rows])
+    return buffer.getvalue()
+
+
+async def stream_lineage(session_factory: async_sessionmaker[AsyncSession], stmt: Select, fmt: str) -> AsyncIterator[str]:
+    """Yield the export one `EXPORT_BATCH_SIZE` partition at a time from a server-side cursor.
+
+    The generator owns its session: the response body is produced after request-scoped
+    dependencies have been torn down.
+    """
+    if fmt == "csv":
+        yield _csv_chunk([], header=True)
+    async with session_factory() as session:
+        result = await session.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        async for rows in result.partitions():
+            yield _csv_chunk(rows) if fmt == "csv" else _ndjson_chunk(rows)
@@ -0,0 +1,107 @@
+"""Active-model resolution and an LRU of loaded estimators."""
+
+from __future__ import annotations
+
+import logging
+import os
+import pickle
+import time
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.core.config import settings
+from backend.app.models.all_models import ModelArtifact
+from backend.app.services.modeling import load_model, model_file
+
+logger = logging.getLogger(__name__)
+
+# What a missing, truncated or corrupt .npz/.joblib artifact raises on load.
+_UNREADABLE_ARTIFACT = (OSError, EOFError, KeyError, ValueError, zipfile.BadZipFile, pickle.UnpicklingError)
+
+
+@dataclass
+class LoadedModel:
+    model_version: str
+    artifact_path: str
+    estimator: object
+
+
+class ModelRegistry:
+    """Keeps loaded estimators keyed by (model_version, artifact_path).
+
+    The exported NumPy scorer is preferred over the pickled sklearn estimator. An entry is
+    reused until the file it was loaded from changes (path or mtime), so a model is read from
+    disk once per version instead of once per prediction.
+    """
+
+    def __init__(self, max_entries: int | None = None) -> None:
+        self.max_entries = max_entries or settings.estimator_cache_size
+        self._cache: OrderedDict[tuple[str, str], tuple[tuple[str, float], LoadedModel]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.last_load_seconds = 0.0
+        self.total_load_seconds = 0.0
+
+    async def resolve_active(self, session: AsyncSession) -> ModelArtifact | None:
+        return await session.scalar(select(ModelArtifact).order_by(ModelArtifact.id.desc()).limit(1))
+
+    def get(self, model_version: str, artifact_path: str) -> LoadedModel:
+        key = (model_version, artifact_path)
+        path = model_file(artifact_path)
+        version = (str(path), os.path.getmtime(path))
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] == version:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        load_started = time.perf_counter()
+        loaded = LoadedModel(model_version=model_version, artifact_path=artifact_path, estimator=load_model(artifact_path))
+        self.last_load_seconds = time.perf_counter() - load_started
+        self.total_load_seconds += self.last_load_seconds
+        self._cache[key] = (version, loaded)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        logger.info("model_loaded", extra={"model_version": model_version, "scorer": type(loaded.estimator).__name__, "load_seconds": self.last_load_seconds})
+        return loaded
+
+    async def load_active(self, session: AsyncSession) -> LoadedModel | None:
+        """The active model, or None (the pipeline's baseline) when there is none or it cannot be read."""
+        artifact = await self.resolve_active(session)
+        if artifact is None:
+            return None
+        try:
+            return self.get(artifact.model_version, artifact.artifact_path)
+        except _UNREADABLE_ARTIFACT:
+            logger.warning("model_load_failed", extra={"model_version": artifact.model_version, "artifact_path": artifact.artifact_path}, exc_info=True)
+            return None
+
+    async def warm_up(self, session: AsyncSession) -> LoadedModel | None:
+        """Load the active model ahead of the first pipeline run."""
+        try:
+            return await self.load_active(session)
+        except (OSError, SQLAlchemyError):
+            logger.warning("model_warm_up_failed", exc_info=True)
+            return None
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "cached": len(self._cache),
+            "last_load_seconds": self.last_load_seconds,
+            "total_load_seconds": self.total_load_seconds,
+        }
+
+
+model_registry = ModelRegistry()
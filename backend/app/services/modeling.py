@@ -1,15 +1,15 @@
 from __future__ import annotations
 
+import math
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
-import joblib
 import numpy as np
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import accuracy_score, brier_score_loss, log_loss
 
+# sklearn and joblib are imported inside the training/loading functions: serving needs
+# neither when models are scored through the exported NumPy scorer.
 ARTIFACT_DIR = Path("artifacts")
-ARTIFACT_DIR.mkdir(exist_ok=True)
 
 
 FEATURE_COLUMNS = [
@@ -40,6 +40,10 @@ def _calibration_bins(y_true: np.ndarray, y_prob: np.ndarray, bins: int = 10) ->
 
 
 def train_baseline_model(rows: list[dict], labels: list[int], model_version: str) -> tuple[str, dict]:
+    import joblib
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.metrics import accuracy_score, brier_score_loss, log_loss
+
     X = np.array([[r[c] for c in FEATURE_COLUMNS] for r in rows])
     y = np.array(labels)
     split_idx = max(1, int(len(y) * 0.8))
@@ -51,8 +55,10 @@ def train_baseline_model(rows: list[dict], labels: list[int], model_version: str
 
     clf = LogisticRegression(max_iter=400)
     clf.fit(X_train, y_train)
+    ARTIFACT_DIR.mkdir(parents=True, exist_ok=True)
     artifact_path = ARTIFACT_DIR / f"{model_version}.joblib"
     joblib.dump(clf, artifact_path)
+    export_scorer(clf, scorer_path(artifact_path))
 
     probs = clf.predict_proba(X_test)[:, 1]
     preds = (probs >= 0.5).astype(int)
@@ -68,7 +74,75 @@ def train_baseline_model(rows: list[dict], labels: list[int], model_version: str
     return str(artifact_path), metrics
 
 
-def predict_home_win_probability(feature_row: dict, artifact_path: str) -> float:
-    clf = joblib.load(artifact_path)
-    X = np.array([[feature_row[c] for c in FEATURE_COLUMNS]])
-    return float(clf.predict_proba(X)[0][1])
+def load_estimator(artifact_path: str):
+    import joblib
+
+    return joblib.load(artifact_path)
+
+
+def scorer_path(artifact_path: str | Path) -> Path:
+    """The compact scorer exported next to a joblib artifact."""
+    return Path(artifact_path).with_suffix(".npz")
+
+
+def export_scorer(estimator, path: str | Path) -> None:
+    """Write a fitted binary logistic model's coefficients, intercept and column order."""
+    np.savez(path, coef=estimator.coef_[0].astype(float), intercept=float(estimator.intercept_[0]), columns=np.array(FEATURE_COLUMNS))
+
+
+@dataclass(frozen=True)
+class LogisticScorer:
+    """Logistic model scored with plain NumPy: sigmoid(x . coef + intercept).
+
+    Exposes `predict_proba` so it can stand in for the sklearn estimator, without
+    sklearn's per-call input validation.
+    """
+
+    coef: np.ndarray
+    intercept: float
+    columns: tuple[str, ...]
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        prob = 1.0 / (1.0 + np.exp(-(X @ self.coef + self.intercept)))
+        return np.column_stack((1.0 - prob, prob))
+
+    def score_row(self, feature_row: dict) -> float:
+        z = self.intercept + sum(float(feature_row[c]) * w for c, w in zip(self.columns, self.coef.tolist()))
+        return 1.0 / (1.0 + math.exp(-z))
+
+
+def load_scorer(path: str | Path) -> LogisticScorer:
+    with np.load(path) as data:
+        return LogisticScorer(coef=data["coef"].astype(float), intercept=float(data["intercept"]), columns=tuple(str(c) for c in data["columns"]))
+
+
+def model_file(artifact_path: str) -> Path:
+    """The file `load_model` reads: the exported scorer when present, else the joblib artifact."""
+    path = scorer_path(artifact_path)
+    return path if path.exists() else Path(artifact_path)
+
+
+def load_model(artifact_path: str):
+    """The NumPy scorer when one was exported for this artifact, else the pickled estimator."""
+    path = model_file(artifact_path)
+    if path.suffix == ".npz":
+        return load_scorer(path)
+    return load_estimator(artifact_path)
+
+
+def build_feature_matrix(feature_rows: list[dict], columns: list[str] | tuple[str, ...] = FEATURE_COLUMNS) -> np.ndarray:
+    """Stack feature rows into an (n_rows, len(columns)) matrix."""
+    return np.array([[r[c] for c in columns] for r in feature_rows], dtype=float).reshape(len(feature_rows), len(columns))
+
+
+def predict_home_win_probabilities(feature_rows: list[dict], estimator) -> np.ndarray:
+    """Score a whole slate with a single `predict_proba` call."""
+    if not feature_rows:
+        return np.empty(0)
+    return estimator.predict_proba(build_feature_matrix(feature_rows, getattr(estimator, "columns", FEATURE_COLUMNS)))[:, 1]
+
+
+def predict_home_win_probability(feature_row: dict, estimator) -> float:
+    if isinstance(estimator, LogisticScorer):
+        return estimator.score_row(feature_row)
+    return float(predict_home_win_probabilities([feature_row], estimator)[0])
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import asyncio
+import time
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import Select, event, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
 from backend.app.core.config import settings
-from backend.app.models.all_models import EventNormalized, EventStatus, Team, TeamAlias
+from backend.app.models.all_models import EventNormalized, EventRaw, EventStatus, Team, TeamAlias
 
 
 @dataclass
@@ -18,19 +22,104 @@ class Resolution:
     multiple_candidates: bool
 
 
-async def resolve_team(session: AsyncSession, raw_name: str) -> Resolution:
-    normalized = raw_name.lower()
-    aliases = (await session.scalars(select(TeamAlias).where(TeamAlias.alias == normalized))).all()
-    if len(aliases) > 1:
-        return Resolution(team_id=None, confidence=0.0, exact_alias_match=False, multiple_candidates=True)
-    if len(aliases) == 1:
-        alias = aliases[0]
-        return Resolution(team_id=alias.team_id, confidence=1.0, exact_alias_match=True, multiple_candidates=False)
+class TeamIndex:
+    """Process-wide alias/team lookup so team resolution costs no queries on the hot path.
+
+    Loaded from `team_aliases` and `teams` on first use, invalidated whenever a session
+    flushes a `Team`/`TeamAlias` change, and reloaded after `team_index_ttl_seconds` to
+    pick up rows written by other processes.
+    """
+
+    def __init__(self) -> None:
+        self._aliases: dict[str, list[int]] = {}
+        self._teams: dict[str, int] = {}
+        self._loaded_at: float | None = None
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+    def _reload_lock(self) -> asyncio.Lock:
+        # Created on first use in the running loop: the index is built at import time, and
+        # a lock bound to another loop cannot be awaited.
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock, self._lock_loop = asyncio.Lock(), loop
+        return self._lock
+
+    def is_fresh(self) -> bool:
+        return self._loaded_at is not None and (time.monotonic() - self._loaded_at) < settings.team_index_ttl_seconds
+
+    async def ensure_loaded(self, session: AsyncSession) -> None:
+        if self.is_fresh():
+            return
+        # Concurrent pipeline tasks share one reload instead of each querying the tables.
+        async with self._reload_lock():
+            if self.is_fresh():
+                return
+            aliases: dict[str, list[int]] = defaultdict(list)
+            for alias, team_id in (await session.execute(select(TeamAlias.alias, TeamAlias.team_id))).all():
+                aliases[alias].append(team_id)
+            teams = {name: team_id for team_id, name in (await session.execute(select(Team.id, Team.normalized_name))).all()}
+            self._aliases, self._teams = dict(aliases), teams
+            self._loaded_at = time.monotonic()
+            self.loads += 1
+
+    def resolve(self, raw_name: str) -> Resolution:
+        normalized = raw_name.lower()
+        alias_team_ids = self._aliases.get(normalized, [])
+        if len(alias_team_ids) > 1:
+            self.hits += 1
+            return Resolution(team_id=None, confidence=0.0, exact_alias_match=False, multiple_candidates=True)
+        team_id = alias_team_ids[0] if alias_team_ids else self._teams.get(normalized)
+        if team_id is None:
+            self.misses += 1
+            return Resolution(team_id=None, confidence=0.0, exact_alias_match=False, multiple_candidates=False)
+        self.hits += 1
+        return Resolution(team_id=team_id, confidence=1.0, exact_alias_match=True, multiple_candidates=False)
+
+    def team_id(self, raw_name: str) -> int | None:
+        """Unambiguous team id for a name, or None; a plain lookup that leaves hit/miss stats alone."""
+        normalized = raw_name.strip().lower()
+        alias_team_ids = self._aliases.get(normalized, [])
+        if len(alias_team_ids) > 1:
+            return None
+        return alias_team_ids[0] if alias_team_ids else self._teams.get(normalized)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "loads": self.loads, "aliases": len(self._aliases), "teams": len(self._teams)}
+
+
+team_index = TeamIndex()
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_team_index_on_flush(session: Session, flush_context) -> None:
+    changed = (*session.new, *session.dirty, *session.deleted)
+    if any(isinstance(obj, (Team, TeamAlias)) for obj in changed):
+        session.info["team_index_dirty"] = True
+        team_index.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _invalidate_team_index_on_rollback(session: Session, previous_transaction) -> None:
+    # The index may have been rebuilt from rows that were never committed.
+    if session.info.pop("team_index_dirty", False):
+        team_index.invalidate()
+
+
+@event.listens_for(Session, "after_commit")
+def _clear_team_index_flag(session: Session) -> None:
+    session.info.pop("team_index_dirty", None)
+
 
-    team = await session.scalar(select(Team).where(Team.normalized_name == normalized))
-    if team:
-        return Resolution(team_id=team.id, confidence=1.0, exact_alias_match=True, multiple_candidates=False)
-    return Resolution(team_id=None, confidence=0.0, exact_alias_match=False, multiple_candidates=False)
+async def resolve_team(session: AsyncSession, raw_name: str) -> Resolution:
+    await team_index.ensure_loaded(session)
+    return team_index.resolve(raw_name)
 
 
 def _time_confidence(event_start_time: datetime) -> tuple[float, str | None]:
@@ -44,8 +133,9 @@ def _time_confidence(event_start_time: datetime) -> tuple[float, str | None]:
 
 
 async def normalize_event(session: AsyncSession, event_normalized: EventNormalized, home_name: str, away_name: str) -> EventNormalized:
-    home = await resolve_team(session, home_name)
-    away = await resolve_team(session, away_name)
+    await team_index.ensure_loaded(session)
+    home = team_index.resolve(home_name)
+    away = team_index.resolve(away_name)
 
     event_normalized.home_team_id = home.team_id
     event_normalized.away_team_id = away.team_id
@@ -73,3 +163,86 @@ async def normalize_event(session: AsyncSession, event_normalized: EventNormaliz
         event_normalized.status = EventStatus.scheduled
         event_normalized.quarantine_reason = None
     return event_normalized
+
+
+def normalized_events_by_key_query(event_keys: list[tuple]) -> Select:
+    """Normalized events linked (through their latest raw row) to provider (source, external_event_id) keys.
+
+    Filters on both key columns with IN so `ix_events_raw_source_external_id` serves the lookup;
+    callers drop the cross pairs.
+    """
+    return (
+        select(EventRaw.source, EventRaw.external_event_id, EventNormalized)
+        .join(EventNormalized, EventNormalized.event_raw_id == EventRaw.id)
+        .where(
+            EventRaw.source.in_({source for source, _ in event_keys}),
+            EventRaw.external_event_id.in_({external_event_id for _, external_event_id in event_keys}),
+        )
+    )
+
+
+def normalized_events_by_recon_query(recon_keys: list[tuple]) -> Select:
+    """Normalized events at the start times of (league_id, start_time, home_team_id, away_team_id) keys.
+
+    Served by the start_time index; callers match the full key.
+    """
+    return select(EventNormalized).where(EventNormalized.start_time.in_({start_time for _, start_time, _, _ in recon_keys}))
+
+
+def _recon_key(norm: EventNormalized) -> tuple:
+    return (norm.league_id, norm.start_time, norm.home_team_id, norm.away_team_id)
+
+
+async def reconcile_events(
+    session: AsyncSession, events: list[dict], raws: list[EventRaw], league_ids: list[int]
+) -> tuple[list[EventNormalized], list[bool]]:
+    """Normalize a chunk of polled events onto one `EventNormalized` row per real game.
+
+    Each poll stores new raw rows, but a provider event seen before reuses its normalized
+    row: the row is re-pointed at the latest raw row, takes the latest start time and is
+    normalized again. A new provider event whose game already has a row (the same league,
+    start and teams from another feed) reuses that row too, so re-polling never trips
+    `uq_event_recon`. New rows are added to the session and flushed; the returned flags
+    mark the events that created one.
+    """
+    event_keys = list({(event["source"], event["external_event_id"]) for event in events})
+    existing: dict[tuple, EventNormalized] = {}
+    wanted = set(event_keys)
+    for source, external_event_id, norm in (await session.execute(normalized_events_by_key_query(event_keys))).all():
+        if (source, external_event_id) not in wanted:
+            continue
+        current = existing.get((source, external_event_id))
+        if current is None or norm.id > current.id:
+            existing[(source, external_event_id)] = norm
+
+    norms: list[EventNormalized] = []
+    for event, raw, league_id in zip(events, raws, league_ids, strict=True):
+        norm = existing.get((event["source"], event["external_event_id"])) or EventNormalized()
+        norm.event_raw_id, norm.league_id, norm.start_time = raw.id, league_id, event["start_time"]
+        await normalize_event(session, norm, event["home_team"], event["away_team"])
+        norms.append(norm)
+
+    new_keys = {_recon_key(norm) for norm in norms if norm.id is None and norm.home_team_id and norm.away_team_id}
+    by_recon: dict[tuple, EventNormalized] = {}
+    if new_keys:
+        rows = (await session.scalars(normalized_events_by_recon_query(list(new_keys)))).all()
+        by_recon = {_recon_key(norm): norm for norm in rows if _recon_key(norm) in new_keys}
+    for idx, norm in enumerate(norms):
+        if norm.id is not None or not (norm.home_team_id and norm.away_team_id):
+            continue
+        match = by_recon.get(_recon_key(norm))
+        if match is None:
+            by_recon[_recon_key(norm)] = norm
+            continue
+        if match is not norm:
+            match.event_raw_id = norm.event_raw_id
+            match.mapping_confidence, match.status, match.quarantine_reason = norm.mapping_confidence, norm.status, norm.quarantine_reason
+            norms[idx] = match
+    created: list[bool] = []
+    added: set[int] = set()
+    for norm in norms:
+        created.append(norm.id is None and id(norm) not in added)
+        added.add(id(norm))
+    session.add_all([norm for norm, new in zip(norms, created) if new])
+    await session.flush()
+    return norms, created
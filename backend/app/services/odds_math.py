@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import numpy as np
+
 
 def american_to_decimal(american: int) -> float:
     if american > 0:
@@ -9,6 +11,12 @@ def american_to_decimal(american: int) -> float:
     return (100 / abs(american)) + 1
 
 
+def american_to_decimal_array(american: np.ndarray) -> np.ndarray:
+    """Vectorized `american_to_decimal`; NaN prices stay NaN."""
+    american = np.asarray(american, dtype=float)
+    return np.where(american > 0, (american / 100) + 1, (100 / np.abs(american)) + 1)
+
+
 def decimal_to_implied_prob(decimal_odds: float) -> float:
     return 1 / decimal_odds
 
@@ -32,3 +40,8 @@ def full_kelly(p: float, decimal_odds: float) -> float:
 
 def quarter_kelly(p: float, decimal_odds: float) -> float:
     return max(0.0, full_kelly(p, decimal_odds) * 0.25)
+
+
+def quarter_kelly_array(p: np.ndarray, decimal_odds: np.ndarray) -> np.ndarray:
+    """Vectorized `quarter_kelly`."""
+    return np.maximum(0.0, full_kelly(p, decimal_odds) * 0.25)
@@ -1,35 +1,45 @@
 from __future__ import annotations
 
-import statistics
+import asyncio
+import time
 import uuid
 import logging
-from datetime import datetime, timedelta
+from dataclasses import dataclass
+from datetime import datetime
 
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+import numpy as np
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from backend.app.core.config import settings
 from backend.app.models.all_models import (
-    ClosingLine,
     EventNormalized,
     EventRaw,
     EventStatus,
-    FeatureSnapshot,
     League,
     MarketConsensus,
-    ModelArtifact,
-    OddsSnapshot,
     Pick,
+    PickStatus,
     PipelineRun,
-    Settlement,
     Team,
     TeamAlias,
 )
-from backend.app.services.consensus import build_market_consensus
-from backend.app.services.features import build_pregame_features
-from backend.app.services.modeling import predict_home_win_probability
-from backend.app.services.normalization import normalize_event
-from backend.app.services.odds_math import american_to_decimal, american_to_implied_prob, ev_percent, quarter_kelly
+from backend.app.services.closing import capture_started_event_closes, close_lookup_window
+from backend.app.services.consensus import ConsensusResult, build_market_consensus_batch, pack_event_lines
+from backend.app.services.features import FeatureContext, StoredFeatures, feature_store
+from backend.app.services.ingestion import attach_snapshot_ids, build_snapshot_rows, odds_delta_tracker, odds_event_key, store_snapshots
+from backend.app.services.model_registry import LoadedModel, model_registry
+from backend.app.services.modeling import predict_home_win_probabilities
+from backend.app.services.normalization import reconcile_events, team_index
+from backend.app.services.odds_math import (
+    american_to_decimal_array,
+    decimal_to_implied_prob,
+    ev_percent,
+    quarter_kelly_array,
+)
+from backend.app.services.rollups import ensure_pipeline_rollup, increment_pipeline_rollup, read_pipeline_rollup
+from backend.app.services.tick_store import tick_store
+from backend.app.services.timing import StageTimer, percentile, stage_span
 
 logger = logging.getLogger(__name__)
 
@@ -55,86 +65,156 @@ async def seed_reference_data(session: AsyncSession) -> None:
         session.add(TeamAlias(alias="la lakers", team_id=lakers.id, source="seed", confidence=0.98))
     if not await session.scalar(select(TeamAlias).where(TeamAlias.alias == "gs warriors")):
         session.add(TeamAlias(alias="gs warriors", team_id=warriors.id, source="seed", confidence=0.98))
+    await ensure_pipeline_rollup(session)
     await session.commit()
 
 
-def _select_closing_snapshot(valid_lines: list[dict], pick: Pick, event_start_time: datetime) -> dict | None:
-    window_start = event_start_time - timedelta(minutes=settings.close_capture_window_minutes)
-    candidates = [
-        line
-        for line in valid_lines
-        if line["book"] == pick.book and line["side"] == pick.side and window_start <= line["timestamp"] <= event_start_time
-    ]
-    if not candidates:
-        return None
-    return max(candidates, key=lambda row: row["timestamp"])
+async def seed_provider_reference(session: AsyncSession, reference: dict) -> None:
+    """Insert the leagues, teams and aliases a provider reports (e.g. `SyntheticOddsProvider.reference_data()`)."""
+    await seed_reference_data(session)
+    existing_leagues = set((await session.scalars(select(League.name))).all())
+    session.add_all([League(name=name) for name in reference["leagues"] if name not in existing_leagues])
+    existing_teams = set((await session.scalars(select(Team.normalized_name))).all())
+    session.add_all([Team(normalized_name=name) for name in reference["teams"] if name not in existing_teams])
+    await session.flush()
+    team_ids = {name: team_id for team_id, name in (await session.execute(select(Team.id, Team.normalized_name))).all()}
+    existing_aliases = set((await session.scalars(select(TeamAlias.alias))).all())
+    session.add_all([
+        TeamAlias(alias=alias, team_id=team_ids[name], source="provider", confidence=1.0)
+        for alias, name in reference["aliases"].items()
+        if alias not in existing_aliases
+    ])
+    await session.commit()
 
 
-async def run_once(session: AsyncSession, provider) -> dict:
-    started = datetime.utcnow()
-    await seed_reference_data(session)
-    payload = await provider.fetch_events_and_odds()
-    latencies = []
-    quarantine_count = 0
-    events_processed = 0
-    picks_emitted = 0
-    block_reasons: dict[str, int] = {}
+def confidence_tiers(edges: np.ndarray) -> np.ndarray:
+    """Vectorized `confidence_tier`."""
+    return np.select([edges >= 0.07, edges >= 0.05], ["A", "B"], default="C")
 
-    for event in payload:
-        events_processed += 1
-        raw = EventRaw(
-            source=event["source"], external_event_id=event["external_event_id"], league=event["league"],
-            start_time=event["start_time"], home_team=event["home_team"], away_team=event["away_team"]
-        )
-        session.add(raw)
-        await session.flush()
 
-        league = await session.scalar(select(League).where(League.name == event["league"]))
-        norm = EventNormalized(event_raw_id=raw.id, league_id=league.id, start_time=event["start_time"])
-        session.add(norm)
+@dataclass
+class _Candidate:
+    event: dict
+    norm: EventNormalized
+    valid_lines: list[dict]
+    consensus: ConsensusResult
+    features: StoredFeatures
+    best_home: dict | None
+
+
+@dataclass
+class _EventOutcome:
+    candidate: _Candidate | None = None
+    block_reason: str | None = None
+    quarantined: int = 0
+    new_event: bool = False
+    decided_at: float | None = None
+
+
+@dataclass
+class SlateScores:
+    """Per-candidate model output and pick economics, aligned with the candidate list."""
+
+    model_prob: np.ndarray
+    model_edge: np.ndarray
+    passes_edge: np.ndarray
+    decimal_odds: np.ndarray
+    implied_prob: np.ndarray
+    ev_percent: np.ndarray
+    kelly_fraction: np.ndarray
+    tier: np.ndarray
+
+
+def score_slate(candidates: list[_Candidate], active_model: LoadedModel | None) -> SlateScores:
+    """Score every candidate with one model call and compute edge/EV/Kelly/tier as arrays."""
+    if active_model and candidates:
+        model_prob = predict_home_win_probabilities([c.features.values for c in candidates], active_model.estimator)
+    else:
+        model_prob = np.full(len(candidates), 0.56)
+    market_prob = np.array([c.consensus.home_prob for c in candidates], dtype=float)
+    home_price = np.array([c.best_home["price"] if c.best_home else np.nan for c in candidates], dtype=float)
+    return score_probabilities(model_prob, market_prob, home_price)
+
+
+def score_probabilities(model_prob: np.ndarray, market_prob: np.ndarray, home_price: np.ndarray, *, edge_threshold: float | None = None) -> SlateScores:
+    """Edge/EV/Kelly/tier for aligned model probabilities, consensus probabilities and home prices."""
+    threshold = settings.edge_threshold if edge_threshold is None else edge_threshold
+    model_edge = model_prob - market_prob
+    decimal_odds = american_to_decimal_array(home_price)
+    return SlateScores(
+        model_prob=model_prob,
+        model_edge=model_edge,
+        passes_edge=model_edge > threshold,
+        decimal_odds=decimal_odds,
+        implied_prob=decimal_to_implied_prob(decimal_odds),
+        ev_percent=ev_percent(model_prob, decimal_odds),
+        kelly_fraction=quarter_kelly_array(model_prob, decimal_odds),
+        tier=confidence_tiers(model_edge),
+    )
+
+
+async def _ingest_and_gate(session: AsyncSession, events: list[dict]) -> list[_EventOutcome]:
+    """Store and normalize a chunk of events, then run the consensus gate and build features.
+
+    Survivors come back as candidates so the whole slate can be scored in one call.
+    """
+    with stage_span("normalization", len(events)):
+        ingested_at = datetime.utcnow()
+        raws = [
+            EventRaw(
+                source=event["source"], external_event_id=event["external_event_id"], league=event["league"],
+                start_time=event["start_time"], home_team=event["home_team"], away_team=event["away_team"], ingested_at=ingested_at,
+            )
+            for event in events
+        ]
+        session.add_all(raws)
         await session.flush()
-        norm = await normalize_event(session, norm, event["home_team"], event["away_team"])
-        if norm.status == EventStatus.quarantined:
-            quarantine_count += 1
-        logger.info(
-            "event_normalized",
-            extra={
-                "event_raw_id": raw.id,
-                "event_normalized_id": norm.id,
-                "mapping_confidence": norm.mapping_confidence,
-                "quarantine_reason": norm.quarantine_reason,
-            },
-        )
 
-        valid_lines = []
-        for line in event["odds"]:
-            age = (datetime.utcnow() - line["timestamp"]).total_seconds()
-            stale = age > settings.stale_snapshot_max_age_seconds
-            snap = OddsSnapshot(
-                event_raw_id=raw.id,
-                event_normalized_id=norm.id,
-                book=line["book"],
-                market=line["market"],
-                side=line["side"],
-                price=line["price"],
-                timestamp=line["timestamp"],
-                is_stale=stale,
+        league_names = {event["league"] for event in events}
+        leagues = {league.name: league for league in (await session.scalars(select(League).where(League.name.in_(league_names)))).all()}
+        norms, created = await reconcile_events(session, events, raws, [leagues[event["league"]].id for event in events])
+
+        # Normalize every event, then write the chunk's odds in one batch.
+        outcomes = [_EventOutcome(new_event=new) for new in created]
+        snapshot_rows: list[list[dict]] = []
+        for event, raw, norm, outcome in zip(events, raws, norms, outcomes, strict=True):
+            if norm.status == EventStatus.quarantined:
+                outcome.quarantined += 1
+            logger.info(
+                "event_normalized",
+                extra={
+                    "event_raw_id": raw.id,
+                    "event_normalized_id": norm.id,
+                    "mapping_confidence": norm.mapping_confidence,
+                    "quarantine_reason": norm.quarantine_reason,
+                },
             )
-            session.add(snap)
-            await session.flush()
-            if not stale:
-                valid_lines.append({**line, "snapshot_id": snap.id, "is_stale": stale})
+            snapshot_rows.append(build_snapshot_rows(raw.id, norm.id, event["odds"], datetime.utcnow()))
+
+    with stage_span("snapshot_write", len(events)):
+        snapshot_ids = await store_snapshots(session, events, snapshot_rows)
+
+    eligible: list[tuple[dict, EventNormalized, list[dict], _EventOutcome]] = []
+    for event, norm, rows, ids, outcome in zip(events, norms, snapshot_rows, snapshot_ids, outcomes, strict=True):
+        valid_lines = attach_snapshot_ids(event["odds"], rows, ids)
+        # Close capture is the tick store's only reader, so only ticks it can look up are kept.
+        lookup_start, _ = close_lookup_window(event["start_time"])
+        close_lines = [line for line in valid_lines if line["timestamp"] >= lookup_start]
+        if close_lines:
+            tick_store.record_on_commit(session, odds_event_key(event), event["start_time"], close_lines)
 
         if norm.mapping_confidence < settings.mapping_confidence_threshold:
-            reason = "LOW_MAPPING_CONFIDENCE"
-            block_reasons[reason] = block_reasons.get(reason, 0) + 1
+            outcome.block_reason = "LOW_MAPPING_CONFIDENCE"
             continue
         if not valid_lines:
-            reason = "NO_FRESH_ODDS"
-            block_reasons[reason] = block_reasons.get(reason, 0) + 1
+            outcome.block_reason = "NO_FRESH_ODDS"
             continue
+        eligible.append((event, norm, valid_lines, outcome))
 
-        consensus_decision = build_market_consensus(valid_lines)
+    with stage_span("consensus", len(eligible)):
+        consensus_decisions = build_market_consensus_batch(pack_event_lines([valid_lines for _, _, valid_lines, _ in eligible]))
+    survivors: list[tuple[dict, EventNormalized, list[dict], _EventOutcome, ConsensusResult]] = []
+    for (event, norm, valid_lines, outcome), consensus_decision in zip(eligible, consensus_decisions, strict=True):
         stale_dropped_count = len(event["odds"]) - len(valid_lines)
         logger.info(
             "consensus_gate",
@@ -148,126 +228,258 @@ async def run_once(session: AsyncSession, provider) -> dict:
         if consensus_decision.result is None:
             norm.status = EventStatus.quarantined
             norm.quarantine_reason = consensus_decision.missing_reason
-            quarantine_count += 1
-            reason = consensus_decision.missing_reason or "CONSENSUS_UNAVAILABLE"
-            block_reasons[reason] = block_reasons.get(reason, 0) + 1
+            outcome.quarantined += 1
+            outcome.block_reason = consensus_decision.missing_reason or "CONSENSUS_UNAVAILABLE"
             continue
 
         consensus = consensus_decision.result
         session.add(MarketConsensus(event_normalized_id=norm.id, market="moneyline", consensus_prob=consensus.home_prob, consensus_price=1 / consensus.home_prob, timestamp=datetime.utcnow()))
+        survivors.append((event, norm, valid_lines, outcome, consensus))
 
-        feature_json = build_pregame_features(norm.id, datetime.utcnow())
-        feat = FeatureSnapshot(event_normalized_id=norm.id, feature_version="v1", features_json=feature_json, computed_at=datetime.utcnow())
-        session.add(feat)
-        await session.flush()
+    with stage_span("feature_build", len(survivors)):
+        as_of = datetime.utcnow()
+        feature_values = [
+            feature_store.features(odds_event_key(event), event["start_time"], FeatureContext(norm.home_team_id, norm.away_team_id, as_of))
+            for event, norm, _, _, _ in survivors
+        ]
+        stored_features = await feature_store.snapshots(
+            session,
+            [norm.id for _, norm, _, _, _ in survivors],
+            [event["start_time"] for event, _, _, _, _ in survivors],
+            feature_values,
+            as_of,
+        )
+    for (event, norm, valid_lines, outcome, consensus), features in zip(survivors, stored_features, strict=True):
+        outcome.candidate = _Candidate(
+            event=event,
+            norm=norm,
+            valid_lines=valid_lines,
+            consensus=consensus,
+            features=features,
+            best_home=next((v for v in valid_lines if v["side"] == "home"), None),
+        )
+    await increment_pipeline_rollup(session, events_normalized=sum(created))
+    await session.flush()
+    decided_at = time.perf_counter()
+    for outcome in outcomes:
+        if outcome.candidate is None:
+            outcome.decided_at = decided_at
+    return outcomes
 
-        artifact = await session.scalar(select(ModelArtifact).order_by(ModelArtifact.id.desc()))
-        if artifact:
-            model_prob = predict_home_win_probability(feature_json, artifact.artifact_path)
-        else:
-            model_prob = 0.56
 
-        model_edge = model_prob - consensus.home_prob
-        logger.info(
-            "edge_gate",
-            extra={
-                "event_normalized_id": norm.id,
-                "model_prob": model_prob,
-                "market_prob": consensus.home_prob,
-                "model_edge": model_edge,
-                "edge_threshold": settings.edge_threshold,
-            },
-        )
-        if model_edge > settings.edge_threshold:
-            best_home = next((v for v in valid_lines if v["side"] == "home"), None)
-            if best_home is None:
-                reason = "NO_HOME_SIDE_LINE"
-                block_reasons[reason] = block_reasons.get(reason, 0) + 1
-                logger.info("pick_blocked", extra={"event_normalized_id": norm.id, "reason": reason})
-                continue
-            dec = american_to_decimal(best_home["price"])
-            pick = Pick(
-                pick_lifecycle_id=str(uuid.uuid4()),
-                odds_snapshot_id=best_home["snapshot_id"],
-                event_normalized_id=norm.id,
-                feature_snapshot_id=feat.id,
-                model_version=artifact.model_version if artifact else "baseline-default",
-                feature_version="v1",
-                market="moneyline",
-                side="home",
-                book=best_home["book"],
-                pick_time_price=best_home["price"],
-                decimal_odds=dec,
-                implied_prob=american_to_implied_prob(best_home["price"]),
-                market_consensus_prob=consensus.home_prob,
-                model_prob=model_prob,
-                model_edge=model_edge,
-                ev_percent=ev_percent(model_prob, dec),
-                kelly_fraction=quarter_kelly(model_prob, dec),
-                tier=confidence_tier(model_edge),
-                created_at=datetime.utcnow(),
-            )
-            session.add(pick)
-            await session.flush()
-            picks_emitted += 1
-            logger.info(
-                "pick_emitted",
-                extra={
-                    "event_normalized_id": norm.id,
-                    "pick_id": pick.id,
-                    "lifecycle_id": pick.pick_lifecycle_id,
-                },
-            )
+def _reconciliation_groups(payload: list[dict]) -> list[list[int]]:
+    """Payload indexes grouped by the game they reconcile onto, in payload order.
 
-            close_pick_book = _select_closing_snapshot(valid_lines, pick, event["start_time"])
-            close_market_consensus_prob = None
-            close_market = build_market_consensus(
-                [line for line in valid_lines if (event["start_time"] - timedelta(minutes=settings.close_capture_window_minutes)) <= line["timestamp"] <= event["start_time"]],
-                min_books=settings.consensus_min_books,
-            )
-            if close_market.result:
-                close_market_consensus_prob = close_market.result.home_prob
-
-            if close_pick_book:
-                close_book_implied_prob = american_to_implied_prob(close_pick_book["price"])
-                closing = ClosingLine(
-                    pick_id=pick.id,
-                    close_price=close_pick_book["price"],
-                    close_implied_prob=close_book_implied_prob,
-                    captured_at=close_pick_book["timestamp"],
-                    market_close_consensus=close_market_consensus_prob,
-                    closing_line_snapshot_id=close_pick_book["snapshot_id"],
-                    close_book_price=close_pick_book["price"],
-                    close_book_implied_prob=close_book_implied_prob,
-                    close_market_consensus_prob=close_market_consensus_prob,
-                )
-                session.add(closing)
-                clv_book = close_book_implied_prob - pick.implied_prob
-                clv_market = None
-                if close_market_consensus_prob is not None:
-                    clv_market = close_market_consensus_prob - pick.implied_prob
-                settlement = Settlement(
-                    pick_id=pick.id,
-                    result="W",
-                    settled_at=datetime.utcnow(),
-                    pnl=dec - 1,
-                    roi=ev_percent(model_prob, dec),
-                    clv_market=clv_market,
-                    clv_book=clv_book,
-                    settlement_source="simulated",
-                )
-                session.add(settlement)
+    Events are keyed like `uq_event_recon` (league, start, resolved teams), or by provider key
+    when a team does not resolve, so two events that would claim one normalized row always
+    share a chunk instead of racing on the constraint from separate sessions.
+    """
+    groups: dict[tuple, list[int]] = {}
+    for idx, event in enumerate(payload):
+        home_id, away_id = team_index.team_id(event["home_team"]), team_index.team_id(event["away_team"])
+        if home_id and away_id:
+            key = ("recon", event["league"], event["start_time"], home_id, away_id)
         else:
-            reason = "EDGE_BELOW_THRESHOLD"
-            block_reasons[reason] = block_reasons.get(reason, 0) + 1
-            logger.info("pick_blocked", extra={"event_normalized_id": norm.id, "reason": reason})
+            key = ("provider", *odds_event_key(event))
+        groups.setdefault(key, []).append(idx)
+    return list(groups.values())
+
+
+async def _ingest_concurrently(session: AsyncSession, payload: list[dict], concurrency: int, session_factory: async_sessionmaker | None) -> list[_EventOutcome]:
+    """Ingest and gate each game's events in their own session and transaction, at most `concurrency` at a time.
+
+    Sessions never expire on commit, since candidates outlive them. Outcomes are returned in
+    payload order so run aggregation does not depend on completion order.
+    """
+    maker = session_factory or async_sessionmaker(session.bind, class_=AsyncSession)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def process(indexes: list[int]) -> list[tuple[int, _EventOutcome]]:
+        async with semaphore, maker(expire_on_commit=False) as event_session:
+            outcomes = await _ingest_and_gate(event_session, [payload[idx] for idx in indexes])
+            await event_session.commit()
+            return list(zip(indexes, outcomes, strict=True))
+
+    chunks = await asyncio.gather(*(process(indexes) for indexes in _reconciliation_groups(payload)))
+    return [outcome for _, outcome in sorted((pair for chunk in chunks for pair in chunk), key=lambda pair: pair[0])]
 
-        latencies.append((datetime.utcnow() - started).total_seconds())
 
-    total_picks = await session.scalar(select(func.count()).select_from(Pick)) or 0
-    close_lines = await session.scalar(select(func.count()).select_from(ClosingLine)) or 0
-    close_cov = (close_lines / total_picks) if total_picks else 0.0
-    total_norm = await session.scalar(select(func.count()).select_from(EventNormalized)) or 1
+def open_pick_keys_query(event_normalized_ids: list[int]) -> Select:
+    """(event, market, side) of the open picks on the given events (served by `ix_picks_event_normalized_id`)."""
+    return select(Pick.event_normalized_id, Pick.market, Pick.side).where(
+        Pick.event_normalized_id.in_(event_normalized_ids),
+        Pick.status == PickStatus.open,
+    )
+
+
+async def _write_candidate(
+    session: AsyncSession,
+    candidate: _Candidate,
+    scores: SlateScores,
+    idx: int,
+    active_model: LoadedModel | None,
+    open_picks: set[tuple],
+) -> tuple[Pick | None, str | None]:
+    """Apply the edge gate to one scored candidate and write its pick.
+
+    An event/market/side with an open pick (in `open_picks`, which this updates) gets no
+    second one, so repeated polls of a game emit a single pick. Returns the pick (if emitted)
+    and the block reason (if any). Closing lines and settlements are written once the event
+    starts, by `capture_started_event_closes`.
+    """
+    norm = candidate.norm
+    best_home = candidate.best_home
+    model_prob = float(scores.model_prob[idx])
+    model_edge = float(scores.model_edge[idx])
+    logger.info(
+        "edge_gate",
+        extra={
+            "event_normalized_id": norm.id,
+            "model_prob": model_prob,
+            "market_prob": candidate.consensus.home_prob,
+            "model_edge": model_edge,
+            "edge_threshold": settings.edge_threshold,
+        },
+    )
+    if not scores.passes_edge[idx]:
+        reason = "EDGE_BELOW_THRESHOLD"
+        logger.info("pick_blocked", extra={"event_normalized_id": norm.id, "reason": reason})
+        return None, reason
+    if best_home is None:
+        reason = "NO_HOME_SIDE_LINE"
+        logger.info("pick_blocked", extra={"event_normalized_id": norm.id, "reason": reason})
+        return None, reason
+    if (norm.id, "moneyline", "home") in open_picks:
+        reason = "OPEN_PICK_EXISTS"
+        logger.info("pick_blocked", extra={"event_normalized_id": norm.id, "reason": reason})
+        return None, reason
+    open_picks.add((norm.id, "moneyline", "home"))
+
+    dec = float(scores.decimal_odds[idx])
+    pick = Pick(
+        pick_lifecycle_id=str(uuid.uuid4()),
+        odds_snapshot_id=best_home["snapshot_id"],
+        event_normalized_id=norm.id,
+        feature_snapshot_id=candidate.features.id,
+        model_version=active_model.model_version if active_model else "baseline-default",
+        feature_version=feature_store.feature_version,
+        market="moneyline",
+        side="home",
+        book=best_home["book"],
+        pick_time_price=best_home["price"],
+        decimal_odds=dec,
+        implied_prob=float(scores.implied_prob[idx]),
+        market_consensus_prob=candidate.consensus.home_prob,
+        model_prob=model_prob,
+        model_edge=model_edge,
+        ev_percent=float(scores.ev_percent[idx]),
+        kelly_fraction=float(scores.kelly_fraction[idx]),
+        tier=str(scores.tier[idx]),
+        created_at=datetime.utcnow(),
+    )
+    session.add(pick)
+    await session.flush()
+    logger.info(
+        "pick_emitted",
+        extra={
+            "event_normalized_id": norm.id,
+            "pick_id": pick.id,
+            "lifecycle_id": pick.pick_lifecycle_id,
+        },
+    )
+    return pick, None
+
+
+def _feature_store_deltas(before: dict, after: dict) -> dict:
+    """This run's feature-store activity, with value and snapshot hit rates."""
+    delta = {key: after[key] - before[key] for key in ("hits", "misses", "snapshots_reused", "snapshots_written")}
+    lookups = delta["hits"] + delta["misses"]
+    snapshots = delta["snapshots_reused"] + delta["snapshots_written"]
+    delta["hit_rate"] = delta["hits"] / lookups if lookups else None
+    delta["snapshot_reuse_rate"] = delta["snapshots_reused"] / snapshots if snapshots else None
+    return delta
+
+
+async def run_once(
+    session: AsyncSession,
+    provider,
+    *,
+    concurrency: int | None = None,
+    session_factory: async_sessionmaker | None = None,
+) -> dict:
+    timer = StageTimer()
+    with timer.activate():
+        return await _run_pipeline(session, provider, timer, concurrency=concurrency, session_factory=session_factory)
+
+
+async def _run_pipeline(
+    session: AsyncSession,
+    provider,
+    timer: StageTimer,
+    *,
+    concurrency: int | None,
+    session_factory: async_sessionmaker | None,
+) -> dict:
+    started = datetime.utcnow()
+    await seed_reference_data(session)
+    # Composite providers merge feeds on resolved team ids.
+    await team_index.ensure_loaded(session)
+    with timer.stage("provider_fetch"):
+        payload = await provider.fetch_events_and_odds()
+    fetched_at = time.perf_counter()
+    odds_delta_tracker.evict_started(started)
+    tick_store.evict_started(started)
+    feature_store.evict_started(started)
+    quarantine_count = 0
+    events_processed = 0
+    events_normalized = 0
+    picks_emitted = 0
+    block_reasons: dict[str, int] = {}
+    index_hits, index_misses = team_index.hits, team_index.misses
+    features_before = feature_store.stats()
+    with timer.stage("model_load"):
+        active_model = await model_registry.load_active(session)
+    concurrency = concurrency or settings.pipeline_concurrency
+    if concurrency > 1 and len(payload) > 1:
+        outcomes = await _ingest_concurrently(session, payload, concurrency, session_factory)
+    else:
+        outcomes = await _ingest_and_gate(session, payload)
+
+    # Per-event poll-to-decision latency: blocked events are decided at the gate, candidates once their pick is written.
+    latencies = [outcome.decided_at - fetched_at for outcome in outcomes if outcome.decided_at is not None]
+    candidates: list[_Candidate] = []
+    for outcome in outcomes:
+        events_processed += 1
+        events_normalized += outcome.new_event
+        quarantine_count += outcome.quarantined
+        if outcome.block_reason:
+            block_reasons[outcome.block_reason] = block_reasons.get(outcome.block_reason, 0) + 1
+        if outcome.candidate:
+            candidates.append(outcome.candidate)
+
+    # Scoring stage: one model call and array math for the whole slate.
+    with timer.stage("inference", len(candidates)):
+        scores = score_slate(candidates, active_model)
+
+    open_picks: set[tuple] = set()
+    if candidates:
+        open_picks = set((await session.execute(open_pick_keys_query([c.norm.id for c in candidates]))).all())
+    for idx, candidate in enumerate(candidates):
+        with timer.stage("pick_write"):
+            pick, reason = await _write_candidate(session, candidate, scores, idx, active_model, open_picks)
+        if reason:
+            block_reasons[reason] = block_reasons.get(reason, 0) + 1
+        picks_emitted += pick is not None
+        latencies.append(time.perf_counter() - fetched_at)
+
+    # Runs after the per-event sessions have committed, so it never holds a write lock across the fan-out.
+    with timer.stage("close_capture"):
+        closes_captured = await capture_started_event_closes(session, started)
+    await increment_pipeline_rollup(session, picks=picks_emitted)
+    rollup = await read_pipeline_rollup(session)
+    total_picks = rollup.picks_total
+    close_cov = (rollup.closing_lines_total / total_picks) if total_picks else 0.0
+    total_norm = rollup.events_normalized_total or 1
 
     run = PipelineRun(
         started_at=started,
@@ -278,11 +490,20 @@ async def run_once(session: AsyncSession, provider) -> dict:
         mapping_anomaly_rate=quarantine_count / total_norm,
         quarantine_count=quarantine_count,
         metadata_json={
-            "p50_latency": statistics.median(latencies) if latencies else 0,
-            "p95_latency": sorted(latencies)[int(len(latencies) * 0.95) - 1] if latencies else 0,
+            "p50_latency": percentile(latencies, 0.5),
+            "p95_latency": percentile(latencies, 0.95),
+            "stages": timer.summary(),
             "events_processed": events_processed,
             "picks_emitted": picks_emitted,
             "block_reasons": block_reasons,
+            "concurrency": concurrency,
+            "rollup_deltas": {"picks": picks_emitted, "closing_lines": closes_captured, "events_normalized": events_normalized},
+            "provider_fetch": getattr(provider, "last_fetch_stats", {}),
+            "model_registry": model_registry.stats(),
+            "closes_captured_at_start": closes_captured,
+            "tick_store": tick_store.stats(),
+            "team_index": {"hits": team_index.hits - index_hits, "misses": team_index.misses - index_misses, "loads": team_index.loads},
+            "feature_store": _feature_store_deltas(features_before, feature_store.stats()),
         },
     )
     session.add(run)
@@ -1,6 +1,19 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass, replace
 from datetime import datetime, timedelta
+from typing import Callable
+
+import numpy as np
+
+from backend.app.core.config import settings
+from backend.app.services.normalization import team_index
+from backend.app.services.timing import stage_span
+
+logger = logging.getLogger(__name__)
 
 
 class MockOddsProvider:
@@ -27,6 +40,9 @@ class MockOddsProvider:
 class DeterministicMockOddsProvider:
     """Test-only provider that guarantees at least one eligible pick."""
 
+    def __init__(self, external_event_id: str = "evt-deterministic-1") -> None:
+        self.external_event_id = external_event_id
+
     async def fetch_events_and_odds(self) -> list[dict]:
         now = datetime.utcnow()
         start = now + timedelta(minutes=5)
@@ -34,7 +50,7 @@ class DeterministicMockOddsProvider:
         return [
             {
                 "source": "deterministic-mock",
-                "external_event_id": "evt-deterministic-1",
+                "external_event_id": self.external_event_id,
                 "league": "NBA",
                 "start_time": start,
                 "home_team": "los angeles lakers",
@@ -49,3 +65,255 @@ class DeterministicMockOddsProvider:
                 ],
             }
         ]
+
+
+@dataclass(frozen=True)
+class SyntheticSlateConfig:
+    events: int = 1000
+    leagues: tuple[str, ...] = ("NBA", "NHL", "MLB", "NFL")
+    teams_per_league: int = 30
+    books: int = 8
+    ticks_per_fetch: int = 3
+    tick_seconds: float = 20.0
+    # Games start within this many minutes of construction, like a day's slate. Only starts
+    # within `mapping_time_tolerance_minutes` pass the mapping time check, so load tests that
+    # need every mapped event to reach scoring narrow this.
+    start_spread_minutes: float = 360.0
+    stale_rate: float = 0.02
+    missing_side_rate: float = 0.02
+    alias_rate: float = 0.2
+    unknown_team_rate: float = 0.01
+    outlier_book_rate: float = 0.05
+    seed: int = 0
+
+
+def _prob_to_american(prob: np.ndarray) -> np.ndarray:
+    prob = np.clip(prob, 0.02, 0.98)
+    return np.round(np.where(prob >= 0.5, -100 * prob / (1 - prob), 100 * (1 - prob) / prob)).astype(int)
+
+
+class SyntheticOddsProvider:
+    """Seeded load generator: many events across leagues with moving, imperfect lines.
+
+    Each fetch advances every game's fair probability by `ticks_per_fetch` random-walk steps
+    and quotes it from every book with vig, so consecutive fetches show line movement. A
+    configurable share of quotes is stale, one-sided or from an outlier book, and team names
+    come through as aliases or unknown names to exercise normalization and quarantine.
+    Prices are generated as arrays; only the final payload is built as dicts.
+    """
+
+    def __init__(self, config: SyntheticSlateConfig | None = None, **overrides) -> None:
+        self.config = replace(config or SyntheticSlateConfig(), **overrides)
+        cfg = self.config
+        self._rng = np.random.default_rng(cfg.seed)
+        created = datetime.utcnow()
+        league_idx = self._rng.integers(0, len(cfg.leagues), cfg.events)
+        home = self._rng.integers(0, cfg.teams_per_league, cfg.events)
+        away = (home + self._rng.integers(1, cfg.teams_per_league, cfg.events)) % cfg.teams_per_league
+        # Sorted offsets plus one microsecond per event keep every start time distinct.
+        offsets = np.sort(self._rng.uniform(0, cfg.start_spread_minutes * 60, cfg.events)) + np.arange(cfg.events) * 1e-6
+        self._events = [
+            {
+                "external_event_id": f"syn-{cfg.seed}-{idx}",
+                "league": cfg.leagues[league_idx[idx]],
+                "start_time": created + timedelta(seconds=float(offsets[idx])),
+                "home_team": self._team_name(cfg.leagues[league_idx[idx]], int(home[idx])),
+                "away_team": self._team_name(cfg.leagues[league_idx[idx]], int(away[idx])),
+            }
+            for idx in range(cfg.events)
+        ]
+        self._logit = self._rng.normal(0.0, 0.6, cfg.events)
+        self._vig = self._rng.uniform(0.02, 0.06, cfg.books)
+        self.fetches = 0
+
+    @staticmethod
+    def _team_name(league: str, number: int) -> str:
+        return f"{league.lower()} team {number}"
+
+    @staticmethod
+    def _team_alias(league: str, number: int) -> str:
+        return f"{league.lower()} t{number}"
+
+    def reference_data(self) -> dict:
+        """Leagues, canonical team names and alias -> team name, for seeding a database."""
+        cfg = self.config
+        return {
+            "leagues": list(cfg.leagues),
+            "teams": [self._team_name(league, k) for league in cfg.leagues for k in range(cfg.teams_per_league)],
+            "aliases": {self._team_alias(league, k): self._team_name(league, k) for league in cfg.leagues for k in range(cfg.teams_per_league)},
+        }
+
+    def _display_names(self, names: list[str]) -> list[str]:
+        cfg = self.config
+        draw = self._rng.random(len(names))
+        shown = []
+        for name, u in zip(names, draw.tolist()):
+            league, _, number = name.split(" ")
+            if u < cfg.unknown_team_rate:
+                shown.append(f"unlisted {league} {number}")
+            elif u < cfg.unknown_team_rate + cfg.alias_rate / 2:
+                shown.append(self._team_alias(league, int(number)))
+            elif u < cfg.unknown_team_rate + cfg.alias_rate:
+                shown.append(name.title())
+            else:
+                shown.append(name)
+        return shown
+
+    async def fetch_events_and_odds(self) -> list[dict]:
+        cfg = self.config
+        events, books, ticks = cfg.events, cfg.books, cfg.ticks_per_fetch
+        rng = self._rng
+        now = datetime.utcnow()
+        self.fetches += 1
+
+        steps = rng.normal(0.0, 0.03, (events, ticks)).cumsum(axis=1)
+        fair = 1 / (1 + np.exp(-(self._logit[:, None] + steps)))
+        self._logit = self._logit + steps[:, -1]
+
+        # (events, books, ticks) home probabilities, with outlier books shifted away from the market.
+        book_prob = fair[:, None, :] + rng.normal(0.0, 0.005, (events, books, ticks))
+        outlier = rng.random((events, books)) < cfg.outlier_book_rate
+        book_prob = book_prob + np.where(outlier, rng.choice([-0.08, 0.08], (events, books)), 0.0)[:, :, None]
+        vig = 1 + self._vig[None, :, None] / 2
+        home_price = _prob_to_american(book_prob * vig).tolist()
+        away_price = _prob_to_american((1 - book_prob) * vig).tolist()
+        missing_away = (rng.random((events, books)) < cfg.missing_side_rate).tolist()
+        stale = (rng.random((events, books)) < cfg.stale_rate).tolist()
+
+        tick_times = [now - timedelta(seconds=cfg.tick_seconds * (ticks - 1 - t)) for t in range(ticks)]
+        stale_time = now - timedelta(seconds=settings.stale_snapshot_max_age_seconds + 60)
+        book_names = [f"book_{b}" for b in range(books)]
+        home_names = self._display_names([event["home_team"] for event in self._events])
+        away_names = self._display_names([event["away_team"] for event in self._events])
+
+        payload = []
+        for e, event in enumerate(self._events):
+            odds = []
+            for b, book in enumerate(book_names):
+                times = [stale_time] * ticks if stale[e][b] else tick_times
+                for t in range(ticks):
+                    odds.append({"book": book, "market": "moneyline", "side": "home", "price": home_price[e][b][t], "timestamp": times[t]})
+                    if not missing_away[e][b]:
+                        odds.append({"book": book, "market": "moneyline", "side": "away", "price": away_price[e][b][t], "timestamp": times[t]})
+            payload.append({**event, "source": "synthetic", "home_team": home_names[e], "away_team": away_names[e], "odds": odds})
+        return payload
+
+
+class LatencyInjectingProvider:
+    """Test adapter that delays (and optionally fails) another provider's fetch."""
+
+    def __init__(self, inner, latency_seconds: float = 0.0, fail_first: int = 0) -> None:
+        self.inner = inner
+        self.latency_seconds = latency_seconds
+        self.fail_first = fail_first
+        self.calls = 0
+
+    async def fetch_events_and_odds(self) -> list[dict]:
+        self.calls += 1
+        await asyncio.sleep(self.latency_seconds)
+        if self.calls <= self.fail_first:
+            raise ConnectionError(f"injected failure {self.calls}/{self.fail_first}")
+        return await self.inner.fetch_events_and_odds()
+
+
+@dataclass
+class ProviderFetchStats:
+    latency_seconds: float = 0.0
+    attempts: int = 0
+    failures: int = 0
+    events: int = 0
+    error: str | None = None
+
+
+def _team_identity(name: str, team_id: Callable[[str], int | None] | None) -> int | str:
+    resolved = team_id(name) if team_id is not None else None
+    return resolved if resolved is not None else name.strip().lower()
+
+
+def merge_events(feeds: list[list[dict]], team_id: Callable[[str], int | None] | None = None) -> list[dict]:
+    """Merge feeds into one payload, deduplicating events by league, teams and start time.
+
+    Teams are compared by the id `team_id` resolves them to (so alias spellings of one team
+    match), falling back to the lowercased name; start times match within
+    `provider_merge_start_tolerance_minutes`. The first feed to report an event supplies its
+    identity; odds are combined and deduplicated per (book, market, side), keeping the most
+    recent quote.
+    """
+    tolerance = timedelta(minutes=settings.provider_merge_start_tolerance_minutes)
+    merged: list[dict] = []
+    quotes: list[dict[tuple, dict]] = []
+    by_matchup: dict[tuple, list[int]] = {}
+    for events in feeds:
+        for event in events:
+            matchup = (event["league"], _team_identity(event["home_team"], team_id), _team_identity(event["away_team"], team_id))
+            candidates = by_matchup.setdefault(matchup, [])
+            idx = next((i for i in candidates if abs(merged[i]["start_time"] - event["start_time"]) <= tolerance), None)
+            if idx is None:
+                idx = len(merged)
+                candidates.append(idx)
+                merged.append({**event})
+                quotes.append({})
+            for line in event["odds"]:
+                line_key = (line["book"], line["market"], line["side"])
+                current = quotes[idx].get(line_key)
+                if current is None or line["timestamp"] > current["timestamp"]:
+                    quotes[idx][line_key] = line
+    for event, event_quotes in zip(merged, quotes, strict=True):
+        event["odds"] = list(event_quotes.values())
+    return merged
+
+
+class CompositeOddsProvider:
+    """Fans out to several adapters concurrently and merges their payloads.
+
+    Each adapter gets its own per-attempt deadline and bounded retries with exponential
+    backoff; a feed that times out or keeps failing is dropped from the run instead of
+    blocking it. Stats from the latest fetch are kept in `last_fetch_stats`. Events are
+    merged on team ids from the process-wide `team_index` (loaded by the pipeline before it
+    fetches).
+    """
+
+    def __init__(
+        self,
+        adapters: dict[str, object],
+        *,
+        deadlines: dict[str, float] | None = None,
+        max_retries: int | None = None,
+        backoff_seconds: float | None = None,
+    ) -> None:
+        self.adapters = adapters
+        self.deadlines = deadlines or {}
+        self.max_retries = settings.provider_max_retries if max_retries is None else max_retries
+        self.backoff_seconds = settings.provider_backoff_seconds if backoff_seconds is None else backoff_seconds
+        self.last_fetch_stats: dict[str, dict] = {}
+
+    async def _fetch(self, name: str, adapter) -> tuple[list[dict], ProviderFetchStats]:
+        with stage_span(f"provider_fetch.{name}"):
+            return await self._fetch_with_retries(name, adapter)
+
+    async def _fetch_with_retries(self, name: str, adapter) -> tuple[list[dict], ProviderFetchStats]:
+        stats = ProviderFetchStats()
+        deadline = self.deadlines.get(name, settings.provider_deadline_seconds)
+        started = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            stats.attempts += 1
+            try:
+                events = await asyncio.wait_for(adapter.fetch_events_and_odds(), timeout=deadline)
+            except Exception as exc:  # noqa: BLE001 - one bad feed must not fail the run
+                stats.failures += 1
+                stats.error = type(exc).__name__
+                logger.warning("provider_fetch_failed", extra={"provider": name, "attempt": attempt + 1, "error": stats.error})
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self.backoff_seconds * (2 ** attempt))
+                continue
+            stats.events = len(events)
+            stats.error = None
+            stats.latency_seconds = time.perf_counter() - started
+            return events, stats
+        stats.latency_seconds = time.perf_counter() - started
+        return [], stats
+
+    async def fetch_events_and_odds(self) -> list[dict]:
+        results = await asyncio.gather(*(self._fetch(name, adapter) for name, adapter in self.adapters.items()))
+        self.last_fetch_stats = {name: asdict(stats) for name, (_, stats) in zip(self.adapters, results, strict=True)}
+        return merge_events([events for events, _ in results], team_id=team_index.team_id)
@@ -0,0 +1,274 @@
+"""Offline replay of stored odds history for tuning pipeline parameters.
+
+History is read once from `odds_snapshots`; each configuration is then replayed entirely in
+memory through the same consensus, scoring and close-capture code the live pipeline uses,
+so sweeps never write to the database and can fan out across processes.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.core.config import settings
+from backend.app.models.all_models import EventNormalized, EventRaw, OddsSnapshot
+from backend.app.services.clv import summarize_moments
+from backend.app.services.consensus import PackedOdds, build_market_consensus_batch, pack_event_lines
+from backend.app.services.closing import CloseIndex, close_lookup_window
+from backend.app.services.features import FeatureContext, FeatureStore
+from backend.app.services.modeling import predict_home_win_probabilities
+from backend.app.services.odds_math import american_to_implied_prob
+from backend.app.services.pipeline import score_probabilities
+
+logger = logging.getLogger(__name__)
+
+HISTORY_BATCH_SIZE = 5000
+
+
+@dataclass
+class ReplayConfig:
+    edge_threshold: float
+    consensus_min_books: int
+    close_capture_window_minutes: int
+    book_weights: dict[str, float] | None = None
+
+    @classmethod
+    def from_settings(cls, **overrides) -> ReplayConfig:
+        defaults = {
+            "edge_threshold": settings.edge_threshold,
+            "consensus_min_books": settings.consensus_min_books,
+            "close_capture_window_minutes": settings.close_capture_window_minutes,
+        }
+        return cls(**(defaults | overrides))
+
+
+def parameter_grid(**axes: list) -> list[ReplayConfig]:
+    """Cartesian product of parameter values, e.g. ``parameter_grid(edge_threshold=[0.02, 0.03])``."""
+    return [ReplayConfig.from_settings(**dict(zip(axes, values))) for values in itertools.product(*axes.values())]
+
+
+@dataclass
+class ReplayPoll:
+    """The book state for one event as the pipeline saw it on one poll."""
+
+    event_key: tuple
+    event_normalized_id: int
+    start_time: datetime
+    polled_at: datetime
+    mapping_confidence: float
+    lines: list[dict]
+    home_team_id: int | None = None
+    away_team_id: int | None = None
+
+
+@dataclass
+class ReplayHistory:
+    """Config-independent inputs, computed once and shared by every replayed configuration.
+
+    `packed`, `model_prob`, `home_price` and `home_book` are aligned with `decision_polls`,
+    the polls that clear the mapping and freshness gates. `close_indexes` holds each event's
+    non-stale stored quotes, the input live close capture reads. `outcomes` (event key ->
+    home win) is optional; without it only expected ROI is reported.
+    """
+
+    decision_polls: list[ReplayPoll]
+    packed: PackedOdds
+    model_prob: np.ndarray
+    home_price: np.ndarray
+    home_book: list[str | None]
+    close_indexes: dict[tuple, CloseIndex]
+    start_times: dict[tuple, datetime]
+    outcomes: dict[tuple, bool] = field(default_factory=dict)
+
+
+@dataclass
+class ReplayReport:
+    config: ReplayConfig
+    events: int
+    picks: int
+    close_coverage: float
+    clv_market: dict
+    clv_book: dict
+    expected_roi: float | None
+    realized_roi: float | None
+
+
+def _build_polls(raws, rows, norms: dict[tuple, tuple]) -> tuple[list[ReplayPoll], dict[tuple, list[dict]]]:
+    """Rebuild every poll from the as-of book state at that poll.
+
+    Each poll stored one `events_raw` row per event, even a change-only (delta mode) poll that
+    wrote no snapshots, so polls are the raw rows. A poll's state is the latest quote per
+    (book, market, side) written by it or an earlier poll of the event. Quotes written on the
+    poll are fresh unless flagged stale; carried quotes count as fresh only while they are
+    within `stale_snapshot_max_age_seconds` of the poll.
+    """
+    polls: list[ReplayPoll] = []
+    event_lines: dict[tuple, list[dict]] = {}
+    books: dict[tuple, dict[tuple, dict]] = {}
+    rows_by_raw = {raw_id: list(raw_rows) for raw_id, raw_rows in itertools.groupby(rows, key=lambda row: row.event_raw_id)}
+    for raw in raws:
+        event_key = (raw.source, raw.external_event_id)
+        norm = norms.get(event_key)
+        if norm is None:
+            continue
+        event_normalized_id, start_time, mapping_confidence, home_team_id, away_team_id = norm
+        poll_rows = rows_by_raw.get(raw.id, [])
+        state = books.setdefault(event_key, {})
+        for row in poll_rows:
+            line = {
+                "book": row.book, "market": row.market, "side": row.side, "price": row.price,
+                "timestamp": row.timestamp, "snapshot_id": row.id, "is_stale": row.is_stale,
+            }
+            state[(row.book, row.market, row.side)] = line
+            event_lines.setdefault(event_key, []).append(line)
+        if not state:
+            continue
+        polled_at = raw.ingested_at or max(line["timestamp"] for line in state.values())
+        written = {row.id for row in poll_rows}
+        lines = [
+            line for line in state.values()
+            if (not line["is_stale"] if line["snapshot_id"] in written
+                else (polled_at - line["timestamp"]).total_seconds() <= settings.stale_snapshot_max_age_seconds)
+        ]
+        polls.append(ReplayPoll(event_key, event_normalized_id, start_time, polled_at, mapping_confidence, lines, home_team_id, away_team_id))
+    return polls, event_lines
+
+
+async def load_replay_history(
+    session: AsyncSession,
+    *,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    estimator=None,
+) -> ReplayHistory:
+    """Read stored polls and odds for events starting in [start, end) and precompute model probabilities."""
+    # A normalized event points at its latest raw row, which carries the provider key of every earlier poll.
+    norm_stmt = select(
+        EventRaw.source, EventRaw.external_event_id, EventNormalized.id, EventNormalized.start_time,
+        EventNormalized.mapping_confidence, EventNormalized.home_team_id, EventNormalized.away_team_id,
+    ).join(EventNormalized, EventNormalized.event_raw_id == EventRaw.id)
+    if start is not None:
+        norm_stmt = norm_stmt.where(EventNormalized.start_time >= start)
+    if end is not None:
+        norm_stmt = norm_stmt.where(EventNormalized.start_time < end)
+    norms = {(row[0], row[1]): tuple(row[2:]) for row in (await session.execute(norm_stmt)).all()}
+    norm_ids = [norm[0] for norm in norms.values()]
+
+    raws = (await session.execute(
+        select(EventRaw.id, EventRaw.source, EventRaw.external_event_id, EventRaw.ingested_at)
+        .where(EventRaw.source.in_({key[0] for key in norms}), EventRaw.external_event_id.in_({key[1] for key in norms}))
+        .order_by(EventRaw.id)
+    )).all()
+    result = await session.stream(
+        select(
+            OddsSnapshot.event_raw_id, OddsSnapshot.id, OddsSnapshot.book, OddsSnapshot.market, OddsSnapshot.side,
+            OddsSnapshot.price, OddsSnapshot.timestamp, OddsSnapshot.is_stale,
+        )
+        .where(OddsSnapshot.event_normalized_id.in_(norm_ids))
+        .order_by(OddsSnapshot.event_raw_id, OddsSnapshot.id)
+        .execution_options(yield_per=HISTORY_BATCH_SIZE)
+    )
+    polls, event_lines = _build_polls(raws, [row async for row in result], norms)
+
+    decision_polls = [poll for poll in polls if poll.mapping_confidence >= settings.mapping_confidence_threshold and poll.lines]
+    if estimator is not None and decision_polls:
+        # A private store computes the same values the live feature store serves at each poll.
+        store = FeatureStore()
+        features = [
+            store.features(poll.event_key, poll.start_time, FeatureContext(poll.home_team_id, poll.away_team_id, poll.polled_at))
+            for poll in decision_polls
+        ]
+        model_prob = predict_home_win_probabilities(features, estimator)
+    else:
+        model_prob = np.full(len(decision_polls), 0.56)
+    best_home = [next((line for line in poll.lines if line["side"] == "home"), None) for poll in decision_polls]
+    history = ReplayHistory(
+        decision_polls=decision_polls,
+        packed=pack_event_lines([poll.lines for poll in decision_polls]),
+        model_prob=model_prob,
+        home_price=np.array([line["price"] if line else np.nan for line in best_home], dtype=float),
+        home_book=[line["book"] if line else None for line in best_home],
+        close_indexes={key: CloseIndex([line for line in lines if not line["is_stale"]]) for key, lines in event_lines.items()},
+        start_times={poll.event_key: poll.start_time for poll in polls},
+    )
+    logger.info("replay_history_loaded", extra={"polls": len(polls), "decision_polls": len(decision_polls), "events": len(event_lines)})
+    return history
+
+
+def replay(history: ReplayHistory, config: ReplayConfig) -> ReplayReport:
+    """Emit at most one pick per event (its first qualifying poll) and score it against the close.
+
+    Like the live pipeline, which keeps one open pick per event side, and its close capture at
+    start, which reads the latest non-stale quote per book/side in `close_lookup_window`.
+    """
+    decisions = build_market_consensus_batch(history.packed, min_books=config.consensus_min_books, book_weights=config.book_weights)
+    market_prob = np.array([d.result.home_prob if d.result else np.nan for d in decisions], dtype=float)
+    scores = score_probabilities(history.model_prob, market_prob, history.home_price, edge_threshold=config.edge_threshold)
+
+    picked: dict[tuple, int] = {}
+    for idx in np.flatnonzero(scores.passes_edge & ~np.isnan(history.home_price)):
+        picked.setdefault(history.decision_polls[idx].event_key, int(idx))
+
+    keys = list(picked)
+    windows = [close_lookup_window(history.start_times[key], config.close_capture_window_minutes) for key in keys]
+    close_decisions = build_market_consensus_batch(
+        pack_event_lines([history.close_indexes[key].latest_lines(*window) for key, window in zip(keys, windows, strict=True)]),
+        min_books=config.consensus_min_books,
+        book_weights=config.book_weights,
+    )
+
+    clv_market: list[float] = []
+    clv_book: list[float] = []
+    pnl: list[float] = []
+    for key, window, close_decision in zip(keys, windows, close_decisions, strict=True):
+        idx = picked[key]
+        implied = float(scores.implied_prob[idx])
+        book_close = history.close_indexes[key].latest(history.home_book[idx], "home", *window)
+        if book_close is not None:
+            clv_book.append(american_to_implied_prob(book_close["price"]) - implied)
+            if close_decision.result is not None:
+                clv_market.append(close_decision.result.home_prob - implied)
+        if key in history.outcomes:
+            pnl.append(float(scores.decimal_odds[idx]) - 1 if history.outcomes[key] else -1.0)
+
+    ev = scores.ev_percent[list(picked.values())]
+    return ReplayReport(
+        config=config,
+        events=len(history.close_indexes),
+        picks=len(picked),
+        close_coverage=(len(clv_book) / len(picked)) if picked else 0.0,
+        clv_market=summarize_moments(len(clv_market), sum(clv_market), sum(v * v for v in clv_market)),
+        clv_book=summarize_moments(len(clv_book), sum(clv_book), sum(v * v for v in clv_book)),
+        expected_roi=float(ev.mean()) if len(ev) else None,
+        realized_roi=(sum(pnl) / len(pnl)) if pnl else None,
+    )
+
+
+_worker_history: ReplayHistory | None = None
+
+
+def _init_worker(history: ReplayHistory) -> None:
+    global _worker_history
+    _worker_history = history
+
+
+def _replay_in_worker(config: ReplayConfig) -> ReplayReport:
+    return replay(_worker_history, config)
+
+
+def run_sweep(history: ReplayHistory, configs: list[ReplayConfig], *, max_workers: int | None = None) -> list[ReplayReport]:
+    """Replay every configuration, in parallel across processes unless `max_workers` is 1.
+
+    The history is shipped to each worker once, at start-up, rather than with every task.
+    """
+    if max_workers == 1 or len(configs) <= 1:
+        return [replay(history, config) for config in configs]
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(history,)) as pool:
+        return list(pool.map(_replay_in_worker, configs))
@@ -0,0 +1,118 @@
+"""Incrementally maintained counters for pipeline and CLV metrics."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.core.config import settings
+from backend.app.models.all_models import ClosingLine, ClvCheckpoint, ClvRollup, EventNormalized, Pick, PipelineRollup, Settlement
+from backend.app.services.clv import SEGMENT_FIELDS, clv_rollup_segments_query, summarize_segments, time_to_game_bucket
+
+ROLLUP_ID = 1
+
+
+async def ensure_pipeline_rollup(session: AsyncSession) -> None:
+    """Create the rollup row, backfilling it from the tables once if it is missing."""
+    if await session.get(PipelineRollup, ROLLUP_ID) is not None:
+        return
+    session.add(PipelineRollup(
+        id=ROLLUP_ID,
+        picks_total=await session.scalar(select(func.count()).select_from(Pick)) or 0,
+        closing_lines_total=await session.scalar(select(func.count()).select_from(ClosingLine)) or 0,
+        events_normalized_total=await session.scalar(select(func.count()).select_from(EventNormalized)) or 0,
+    ))
+    await session.flush()
+
+
+async def increment_pipeline_rollup(session: AsyncSession, *, picks: int = 0, closing_lines: int = 0, events_normalized: int = 0) -> None:
+    """Add deltas in the caller's transaction, next to the rows being counted."""
+    if not (picks or closing_lines or events_normalized):
+        return
+    await session.execute(
+        update(PipelineRollup)
+        .where(PipelineRollup.id == ROLLUP_ID)
+        .values(
+            picks_total=PipelineRollup.picks_total + picks,
+            closing_lines_total=PipelineRollup.closing_lines_total + closing_lines,
+            events_normalized_total=PipelineRollup.events_normalized_total + events_normalized,
+        )
+    )
+
+
+async def read_pipeline_rollup(session: AsyncSession) -> PipelineRollup:
+    rollup = await session.get(PipelineRollup, ROLLUP_ID, populate_existing=True)
+    if rollup is None:
+        await ensure_pipeline_rollup(session)
+        rollup = await session.get(PipelineRollup, ROLLUP_ID)
+    return rollup
+
+
+async def record_clv_settlement(session: AsyncSession, settlement: Settlement, pick: Pick, event_start_time: datetime) -> None:
+    """Fold one settlement into its segment's running moments, checkpointing every `clv_checkpoint_every`."""
+    source = settlement.settlement_source
+    segment = {
+        "settlement_source": source,
+        "book": pick.book,
+        "market": pick.market,
+        "tier": pick.tier,
+        "model_version": pick.model_version,
+        "time_to_game": time_to_game_bucket((event_start_time - pick.created_at).total_seconds() / 3600),
+    }
+    market, book = settlement.clv_market, settlement.clv_book
+    deltas = {
+        "settled": 1,
+        "market_n": int(market is not None),
+        "market_sum": market or 0.0,
+        "market_sum_sq": (market or 0.0) ** 2,
+        "book_n": int(book is not None),
+        "book_sum": book or 0.0,
+        "book_sum_sq": (book or 0.0) ** 2,
+    }
+    result = await session.execute(
+        update(ClvRollup)
+        .where(*[getattr(ClvRollup, key) == value for key, value in segment.items()])
+        .values({key: getattr(ClvRollup, key) + value for key, value in deltas.items()})
+    )
+    if result.rowcount == 0:
+        session.add(ClvRollup(**segment, **deltas))
+        await session.flush()
+
+    settled_total = await session.scalar(select(func.sum(ClvRollup.settled)).where(ClvRollup.settlement_source == source))
+    if settled_total % settings.clv_checkpoint_every == 0:
+        rows = (await session.execute(clv_rollup_segments_query(include_simulated=True).where(ClvRollup.settlement_source == source))).all()
+        session.add(ClvCheckpoint(settlement_source=source, settled_total=settled_total, created_at=datetime.utcnow(), summary_json=summarize_segments(rows)))
+
+
+async def read_clv_gates(session: AsyncSession, include_simulated: bool) -> dict:
+    """Gate A/B inputs from the rollups plus recorded checkpoints, without touching `settlements`."""
+    summary = summarize_segments((await session.execute(clv_rollup_segments_query(include_simulated))).all())
+    checkpoints_stmt = select(ClvCheckpoint).order_by(ClvCheckpoint.settled_total, ClvCheckpoint.id)
+    if not include_simulated:
+        checkpoints_stmt = checkpoints_stmt.where(ClvCheckpoint.settlement_source == "official")
+    checkpoints = (await session.scalars(checkpoints_stmt)).all()
+
+    market = summary["clv_market"]
+    measured = [seg for seg in summary["segments"] if seg["clv_market"]["count"]]
+    return {
+        "settled": summary["settled"],
+        "clv_market": market,
+        "clv_book": summary["clv_book"],
+        "gate_a": {
+            "min_settled": settings.clv_gate_a_min_settled,
+            "reached": summary["settled"] >= settings.clv_gate_a_min_settled,
+            "positive_market_clv": market["mean"] is not None and market["mean"] > 0,
+        },
+        "gate_b": {
+            "segments": len(measured),
+            "positive_segment_share": (sum(1 for seg in measured if seg["clv_market"]["mean"] > 0) / len(measured)) if measured else 0.0,
+        },
+        "segment_fields": list(SEGMENT_FIELDS),
+        "segments": summary["segments"],
+        "checkpoints": [
+            {"settlement_source": c.settlement_source, "settled_total": c.settled_total, "created_at": c.created_at.isoformat(), "summary": c.summary_json}
+            for c in checkpoints
+        ],
+    }
@@ -0,0 +1,256 @@
+"""Start-time-aware scheduling of event polls and close capture."""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Protocol
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.app.core.config import settings
+from backend.app.services.closing import capture_started_event_closes
+from backend.app.services.ingestion import odds_event_key
+from backend.app.services.pipeline import run_once
+
+logger = logging.getLogger(__name__)
+
+# A poll gets the event keys to refresh (None for a full discovery poll) and returns the
+# (event key, start time) of every event the provider reported.
+PollFn = Callable[[set[tuple] | None], Awaitable[list[tuple[tuple, datetime]]]]
+CloseFn = Callable[[list[tuple]], Awaitable[None]]
+
+
+class Clock(Protocol):
+    def now(self) -> datetime: ...
+
+    async def sleep(self, seconds: float) -> None: ...
+
+
+class SystemClock:
+    def now(self) -> datetime:
+        return datetime.utcnow()
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+class FakeClock:
+    """Virtual clock for tests: `sleep` advances time instantly instead of waiting."""
+
+    def __init__(self, start: datetime) -> None:
+        self._now = start
+        self.slept = 0.0
+
+    def now(self) -> datetime:
+        return self._now
+
+    def advance(self, seconds: float) -> None:
+        self._now += timedelta(seconds=seconds)
+
+    async def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+        self.slept += seconds
+        await asyncio.sleep(0)
+
+
+@dataclass(order=True)
+class _Job:
+    due_at: datetime
+    seq: int
+    kind: str = field(compare=False)
+    event_key: tuple | None = field(compare=False, default=None)
+
+
+class StartTimeScheduler:
+    """Priority queue of poll and close jobs keyed on each event's start time.
+
+    Polling cadence tightens as tip-off approaches: `scheduler_far_poll_seconds` beyond
+    `scheduler_near_window_minutes`, `scheduler_near_poll_seconds` inside it, and
+    `scheduler_close_poll_seconds` inside `close_capture_window_minutes`. Polling stops at
+    start, when a close job fires. Jobs that come due together run as one batch, and polls due
+    within `scheduler_poll_batch_seconds` are pulled forward into it. A periodic discovery
+    poll picks up new events and start-time changes.
+
+    A failed poll or close is logged and retried after `scheduler_retry_seconds`; the loop
+    keeps running.
+    """
+
+    def __init__(self, on_poll: PollFn, on_close: CloseFn, *, clock: Clock | None = None) -> None:
+        self.on_poll = on_poll
+        self.on_close = on_close
+        self.clock = clock or SystemClock()
+        self._queue: list[_Job] = []
+        self._seq = itertools.count()
+        self._start_times: dict[tuple, datetime] = {}
+        # Latest scheduled poll/close per event; superseded heap entries are skipped when popped.
+        self._next_poll: dict[tuple, datetime] = {}
+        self._close_at: dict[tuple, datetime] = {}
+        self._discovery_scheduled = False
+        self.polls = 0
+        self.closes = 0
+
+    def _push(self, due_at: datetime, kind: str, event_key: tuple | None = None) -> None:
+        heapq.heappush(self._queue, _Job(due_at, next(self._seq), kind, event_key))
+
+    def poll_interval(self, start_time: datetime, now: datetime) -> float | None:
+        """Seconds until the next poll for an event starting at `start_time`, or None once it started."""
+        seconds_to_start = (start_time - now).total_seconds()
+        if seconds_to_start <= 0:
+            return None
+        close_window = settings.close_capture_window_minutes * 60
+        near_window = settings.scheduler_near_window_minutes * 60
+        # Each interval is capped so the next poll lands no later than the switch to a tighter cadence.
+        if seconds_to_start <= close_window:
+            return min(settings.scheduler_close_poll_seconds, seconds_to_start)
+        if seconds_to_start <= near_window:
+            return min(settings.scheduler_near_poll_seconds, seconds_to_start - close_window)
+        return min(settings.scheduler_far_poll_seconds, seconds_to_start - near_window)
+
+    def track(self, event_key: tuple, start_time: datetime) -> None:
+        """Schedule (or move) an event's close job; its polls are scheduled after each poll."""
+        now = self.clock.now()
+        if start_time <= now and event_key not in self._start_times:
+            return
+        if self._start_times.get(event_key) == start_time:
+            return
+        self._start_times[event_key] = start_time
+        self._close_at[event_key] = start_time
+        self._push(start_time, "close", event_key)
+
+    def _schedule_poll(self, event_key: tuple, due_at: datetime) -> None:
+        self._next_poll[event_key] = due_at
+        self._push(due_at, "poll", event_key)
+
+    def _pop_due(self, now: datetime) -> tuple[set[tuple], list[tuple], bool]:
+        polls: set[tuple] = set()
+        closes: list[tuple] = []
+        discover = False
+        batch_until = now + timedelta(seconds=settings.scheduler_poll_batch_seconds)
+        not_yet: list[_Job] = []
+        while self._queue and self._queue[0].due_at <= batch_until:
+            job = heapq.heappop(self._queue)
+            if job.kind != "poll" and job.due_at > now:
+                # Only polls are pulled forward; closes and discovery keep their due time.
+                not_yet.append(job)
+            elif job.kind == "discover":
+                discover = True
+            elif job.kind == "poll" and self._next_poll.get(job.event_key) == job.due_at:
+                polls.add(job.event_key)
+                del self._next_poll[job.event_key]
+            elif job.kind == "close" and self._close_at.get(job.event_key) == job.due_at:
+                closes.append(job.event_key)
+        for job in not_yet:
+            heapq.heappush(self._queue, job)
+        return polls, closes, discover
+
+    async def _poll(self, polls: set[tuple], discover: bool, now: datetime) -> None:
+        try:
+            seen = await self.on_poll(None if discover else polls)
+        except Exception:
+            logger.exception("scheduler_poll_failed", extra={"events": len(polls), "discover": discover})
+            retry_at = now + timedelta(seconds=settings.scheduler_retry_seconds)
+            for event_key in polls:
+                start_time = self._start_times.get(event_key)
+                if start_time is not None and start_time > now:
+                    self._schedule_poll(event_key, min(retry_at, start_time))
+            return
+        for event_key, start_time in seen:
+            self.track(event_key, start_time)
+        # A discovery poll refreshed every event, so each one's next poll restarts from now.
+        for event_key in polls | ({key for key, _ in seen} if discover else set()):
+            start_time = self._start_times.get(event_key)
+            interval = self.poll_interval(start_time, now) if start_time else None
+            if interval is not None:
+                self._schedule_poll(event_key, now + timedelta(seconds=interval))
+
+    async def _close(self, closes: list[tuple], now: datetime) -> None:
+        try:
+            await self.on_close(closes)
+        except Exception:
+            logger.exception("scheduler_close_failed", extra={"events": len(closes)})
+            retry_at = now + timedelta(seconds=settings.scheduler_retry_seconds)
+            for event_key in closes:
+                self._close_at[event_key] = retry_at
+                self._push(retry_at, "close", event_key)
+            return
+        for event_key in closes:
+            self._start_times.pop(event_key, None)
+            self._close_at.pop(event_key, None)
+            self._next_poll.pop(event_key, None)
+
+    async def run_pending(self) -> None:
+        """Run every job that is due now: one batched poll, then one batched close capture."""
+        now = self.clock.now()
+        polls, closes, discover = self._pop_due(now)
+        if discover:
+            self._push(now + timedelta(seconds=settings.scheduler_discovery_seconds), "discover")
+        if polls or discover:
+            self.polls += 1
+            await self._poll(polls, discover, now)
+        if closes:
+            self.closes += 1
+            await self._close(closes, now)
+        logger.info("scheduler_tick", extra={"polled": len(polls), "discover": discover, "closed": len(closes), "queued": len(self._queue)})
+
+    async def run(self, *, until: datetime | None = None) -> None:
+        """Process jobs in due order, sleeping on the clock in between, until `until` (or forever)."""
+        if not self._discovery_scheduled:
+            self._push(self.clock.now(), "discover")
+            self._discovery_scheduled = True
+        while self._queue:
+            due_at = self._queue[0].due_at
+            if until is not None and due_at > until:
+                return
+            delay = (due_at - self.clock.now()).total_seconds()
+            if delay > 0:
+                await self.clock.sleep(delay)
+            await self.run_pending()
+
+
+class _SelectedEventsProvider:
+    """Fetches from `inner` but hands the pipeline only the requested events.
+
+    Providers that can fetch a subset implement `fetch_selected_events_and_odds(event_keys)`;
+    for the rest a targeted poll still fetches the full slate and filters it, which is why
+    the scheduler batches polls that come due close together.
+    """
+
+    def __init__(self, inner, event_keys: set[tuple] | None) -> None:
+        self.inner = inner
+        self.event_keys = event_keys
+        self.seen: list[tuple[tuple, datetime]] = []
+
+    async def fetch_events_and_odds(self) -> list[dict]:
+        fetch_selected = getattr(self.inner, "fetch_selected_events_and_odds", None)
+        if self.event_keys is not None and fetch_selected is not None:
+            payload = await fetch_selected(self.event_keys)
+            self.seen = [(odds_event_key(event), event["start_time"]) for event in payload]
+            return payload
+        payload = await self.inner.fetch_events_and_odds()
+        self.seen = [(odds_event_key(event), event["start_time"]) for event in payload]
+        if self.event_keys is None:
+            return payload
+        return [event for event in payload if odds_event_key(event) in self.event_keys]
+
+
+def pipeline_scheduler(provider, session_factory: async_sessionmaker[AsyncSession], *, clock: Clock | None = None) -> StartTimeScheduler:
+    """A scheduler that runs `run_once` for due events and close capture at start."""
+    clock = clock or SystemClock()
+
+    async def poll(event_keys: set[tuple] | None) -> list[tuple[tuple, datetime]]:
+        selected = _SelectedEventsProvider(provider, event_keys)
+        async with session_factory() as session:
+            await run_once(session, selected)
+        return selected.seen
+
+    async def close(event_keys: list[tuple]) -> None:
+        async with session_factory() as session:
+            await capture_started_event_closes(session, clock.now())
+            await session.commit()
+
+    return StartTimeScheduler(poll, close, clock=clock)
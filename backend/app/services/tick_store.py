@@ -0,0 +1,181 @@
+"""Process-local ring buffers of close-window odds ticks per event, book, market and side."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import settings
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_micros(timestamp: datetime) -> int:
+    # Integer microseconds round-trip exactly, unlike float seconds.
+    return (timestamp - _EPOCH) // timedelta(microseconds=1)
+
+
+def _from_micros(micros: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=int(micros))
+
+
+class TickRing:
+    """Fixed-capacity ring of (timestamp, price, snapshot id) kept in timestamp order.
+
+    A tick older than the newest one is dropped and a tick with the same timestamp replaces
+    it, so the ring stays sorted and lookups can bisect over its logical positions.
+    """
+
+    __slots__ = ("timestamps", "prices", "snapshot_ids", "head", "size")
+
+    def __init__(self, capacity: int) -> None:
+        self.timestamps = np.empty(capacity, dtype=np.int64)
+        self.prices = np.empty(capacity, dtype=np.int32)
+        self.snapshot_ids = np.empty(capacity, dtype=np.int64)
+        self.head = 0
+        self.size = 0
+
+    def _slot(self, position: int) -> int:
+        return (self.head + position) % len(self.timestamps)
+
+    def append(self, micros: int, price: int, snapshot_id: int) -> bool:
+        capacity = len(self.timestamps)
+        if self.size:
+            last = self._slot(self.size - 1)
+            if micros < self.timestamps[last]:
+                return False
+            if micros == self.timestamps[last]:
+                self.prices[last], self.snapshot_ids[last] = price, snapshot_id
+                return True
+        if self.size < capacity:
+            slot = self._slot(self.size)
+            self.size += 1
+        else:
+            slot = self.head
+            self.head = (self.head + 1) % capacity
+        self.timestamps[slot], self.prices[slot], self.snapshot_ids[slot] = micros, price, snapshot_id
+        return True
+
+    def bisect_right(self, micros: int) -> int:
+        """Number of ticks at or before `micros`."""
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamps[self._slot(mid)] <= micros:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def bisect_left(self, micros: int) -> int:
+        """Number of ticks strictly before `micros`."""
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamps[self._slot(mid)] < micros:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def tick(self, position: int) -> tuple[datetime, int, int]:
+        slot = self._slot(position)
+        return _from_micros(self.timestamps[slot]), int(self.prices[slot]), int(self.snapshot_ids[slot])
+
+
+class TickStore:
+    """Close-window line history per event, so close capture need not read `odds_snapshots`.
+
+    The pipeline records only ticks inside `closing.close_lookup_window`, so events far from
+    their start hold nothing. Each (event, book, market, side) gets a `TickRing` of
+    `tick_ring_capacity` ticks, and an event's rings are dropped `tick_store_grace_seconds`
+    after it starts, which leaves time for close capture.
+    """
+
+    def __init__(self, capacity: int | None = None) -> None:
+        self.capacity = capacity or settings.tick_ring_capacity
+        self._rings: dict[tuple, dict[tuple[str, str, str], TickRing]] = {}
+        self._start_times: dict[tuple, datetime] = {}
+        self.dropped_out_of_order = 0
+
+    def record(self, event_key: tuple, start_time: datetime, lines: list[dict]) -> None:
+        """Add stored lines (with `snapshot_id`) for one event."""
+        rings = self._rings.setdefault(event_key, {})
+        self._start_times[event_key] = start_time
+        for line in sorted(lines, key=lambda row: row["timestamp"]):
+            key = (line["book"], line["market"], line["side"])
+            ring = rings.get(key)
+            if ring is None:
+                ring = rings[key] = TickRing(self.capacity)
+            if not ring.append(_to_micros(line["timestamp"]), line["price"], line["snapshot_id"]):
+                self.dropped_out_of_order += 1
+
+    def record_on_commit(self, session: AsyncSession, event_key: tuple, start_time: datetime, lines: list[dict]) -> None:
+        """Defer `record` until the session commits, so rolled-back snapshot ids never enter the store."""
+        session.sync_session.info.setdefault("tick_store_pending", []).append((event_key, start_time, lines))
+
+    @staticmethod
+    def _line(key: tuple[str, str, str], tick: tuple[datetime, int, int]) -> dict:
+        book, market, side = key
+        timestamp, price, snapshot_id = tick
+        return {"book": book, "market": market, "side": side, "price": price, "timestamp": timestamp, "snapshot_id": snapshot_id}
+
+    def latest_as_of(self, event_key: tuple, book: str, side: str, as_of: datetime, market: str = "moneyline") -> dict | None:
+        ring = self._rings.get(event_key, {}).get((book, market, side))
+        if ring is None:
+            return None
+        position = ring.bisect_right(_to_micros(as_of))
+        return self._line((book, market, side), ring.tick(position - 1)) if position else None
+
+    def window(self, event_key: tuple, book: str, side: str, start: datetime, end: datetime, market: str = "moneyline") -> list[dict]:
+        """Ticks with start <= timestamp <= end, oldest first."""
+        ring = self._rings.get(event_key, {}).get((book, market, side))
+        if ring is None:
+            return []
+        first, last = ring.bisect_left(_to_micros(start)), ring.bisect_right(_to_micros(end))
+        return [self._line((book, market, side), ring.tick(position)) for position in range(first, last)]
+
+    def window_lines(self, event_key: tuple, start: datetime, end: datetime) -> list[dict]:
+        """Every book/side's ticks in [start, end] for one event, oldest first."""
+        lines = [
+            line
+            for book, market, side in self._rings.get(event_key, {})
+            for line in self.window(event_key, book, side, start, end, market)
+        ]
+        return sorted(lines, key=lambda line: line["timestamp"])
+
+    def evict_started(self, now: datetime) -> None:
+        cutoff = now - timedelta(seconds=settings.tick_store_grace_seconds)
+        for event_key in [key for key, start in self._start_times.items() if start <= cutoff]:
+            self._rings.pop(event_key, None)
+            self._start_times.pop(event_key, None)
+
+    def clear(self) -> None:
+        self._rings.clear()
+        self._start_times.clear()
+
+    def stats(self) -> dict:
+        return {
+            "events": len(self._rings),
+            "rings": sum(len(rings) for rings in self._rings.values()),
+            "capacity": self.capacity,
+            "dropped_out_of_order": self.dropped_out_of_order,
+        }
+
+
+tick_store = TickStore()
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_ticks(session: Session) -> None:
+    for pending in session.info.pop("tick_store_pending", []):
+        tick_store.record(*pending)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending_ticks(session: Session, previous_transaction) -> None:
+    session.info.pop("tick_store_pending", None)
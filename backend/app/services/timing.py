@@ -0,0 +1,84 @@
+"""Stage-level latency spans for the pick critical path."""
+
+from __future__ import annotations
+
+import math
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+_current_timer: ContextVar[StageTimer | None] = ContextVar("current_stage_timer", default=None)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile; 0.0 for no samples."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class StageTimer:
+    """Collects wall-clock spans per named stage.
+
+    A timer activated with `activate()` is visible to `stage_span` anywhere in the same
+    context, including asyncio tasks spawned from it, so services can time their own work
+    without the timer being passed through every call.
+
+    Each span is one sample of (seconds, items). Batched stages cannot be timed per event, so
+    the summary reports span percentiles (per batch) next to a per-item mean, and never
+    percentiles over per-item averages.
+    """
+
+    def __init__(self) -> None:
+        self.samples: dict[str, list[tuple[float, int]]] = defaultdict(list)
+
+    def record(self, stage: str, seconds: float, items: int = 1) -> None:
+        self.samples[stage].append((seconds, items))
+
+    @contextmanager
+    def stage(self, stage: str, items: int = 1) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            # An empty batch did no per-item work and records no sample.
+            if items > 0:
+                self.record(stage, time.perf_counter() - started, items)
+
+    @contextmanager
+    def activate(self) -> Iterator[StageTimer]:
+        token = _current_timer.set(self)
+        try:
+            yield self
+        finally:
+            _current_timer.reset(token)
+
+    def summary(self) -> dict[str, dict]:
+        summary = {}
+        for stage, samples in self.samples.items():
+            spans = [seconds for seconds, _ in samples]
+            items = sum(count for _, count in samples)
+            summary[stage] = {
+                "spans": len(spans),
+                "items": items,
+                "total": sum(spans),
+                "per_item_mean": sum(spans) / items,
+                "span_p50": percentile(spans, 0.5),
+                "span_p95": percentile(spans, 0.95),
+                "span_max": max(spans),
+            }
+        return summary
+
+
+@contextmanager
+def stage_span(stage: str, items: int = 1) -> Iterator[None]:
+    """Time a block (covering `items` events or candidates) against the active `StageTimer`, if any."""
+    timer = _current_timer.get()
+    if timer is None:
+        yield
+        return
+    with timer.stage(stage, items):
+        yield
@@ -0,0 +1,47 @@
+"""Cold-start import cost of the API process, from ``python -X importtime``.
+
+The report is taken in a fresh interpreter so modules already imported by the test run do
+not hide their cost. ``BENCH_IMPORT_BUDGET_SECONDS`` (default 1.5) bounds the cumulative
+import time of ``backend.app.main``; run with ``-s`` to see the slowest imports.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+APP_MODULE = "backend.app.main"
+TRAINING_ONLY_MODULES = ("sklearn", "joblib", "scipy")
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Cumulative import time in microseconds per module imported by `import module`."""
+    env = os.environ | {"DATABASE_URL": "sqlite+aiosqlite:///:memory:"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_api_import_does_not_load_training_stack() -> None:
+    loaded = {name.split(".")[0] for name in import_times(APP_MODULE)}
+    assert not loaded & set(TRAINING_ONLY_MODULES)
+
+
+@pytest.mark.benchmark
+def test_api_cold_import_time() -> None:
+    times = import_times(APP_MODULE)
+    slowest = sorted(((us, name) for name, us in times.items() if "." not in name), reverse=True)[:10]
+    print("\n" + "\n".join(f"{us / 1000:8.1f}ms  {name}" for us, name in slowest))
+    budget = float(os.environ.get("BENCH_IMPORT_BUDGET_SECONDS", "1.5"))
+    assert times[APP_MODULE] / 1e6 <= budget, f"{APP_MODULE} imports in {times[APP_MODULE] / 1e6:.2f}s (budget {budget}s)"
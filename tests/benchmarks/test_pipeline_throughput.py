@@ -0,0 +1,129 @@
+"""Throughput benchmark for `run_once` against in-memory SQLite.
+
+Each slate is measured on fresh databases, once timed with no instrumentation and once
+untimed under tracemalloc and a statement counter. Results are compared with
+``baseline.json`` next to this file:
+
+* Statements per event are deterministic and gated everywhere with a tight fixed bound.
+* Throughput is only compared with a baseline recorded on the same host, since events/sec
+  measured elsewhere says nothing about this machine; ``BENCH_TOLERANCE`` (default 0.5) is
+  the allowed relative drop.
+* ``BENCH_UPDATE_BASELINE=1`` rewrites the baseline from this run instead of checking it.
+* ``BENCH_RESULTS_PATH`` additionally writes this run's full results (stages included) as JSON.
+
+Benchmarks are deselected by default; run them with ``pytest -m benchmark -s tests/benchmarks``.
+"""
+
+import json
+import os
+import platform
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from backend.app.db.base import Base
+from backend.app.models.all_models import PipelineRun
+from backend.app.services.pipeline import run_once, seed_provider_reference
+from backend.app.services.provider import SyntheticOddsProvider
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+STATEMENT_TOLERANCE = 0.1
+
+
+@dataclass(frozen=True)
+class Slate:
+    events: int
+    books: int
+    ticks: int
+
+    @property
+    def name(self) -> str:
+        return f"{self.events}x{self.books}x{self.ticks}"
+
+
+SLATES = [Slate(events=20, books=4, ticks=3), Slate(events=200, books=8, ticks=5)]
+
+
+def host_id() -> str:
+    return f"{platform.node()}/{platform.machine()}/{platform.python_version()}"
+
+
+async def _run_slate(slate: Slate, *, instrumented: bool) -> dict:
+    """One pipeline run on a fresh database: timed when bare, counted and traced when instrumented."""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    # Narrow starts keep every mapped event on the scoring path the benchmark measures.
+    provider = SyntheticOddsProvider(events=slate.events, books=slate.books, ticks_per_fetch=slate.ticks, seed=7, start_spread_minutes=10)
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    async with maker() as session:
+        await seed_provider_reference(session, provider.reference_data())
+
+        if instrumented:
+            event.listen(engine.sync_engine, "before_cursor_execute", record)
+            tracemalloc.start()
+        started = time.perf_counter()
+        response = await run_once(session, provider)
+        elapsed = time.perf_counter() - started
+        peak = 0
+        if instrumented:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+        run = await session.scalar(select(PipelineRun).order_by(PipelineRun.id.desc()).limit(1))
+        stages = run.metadata_json["stages"]
+    await engine.dispose()
+    return {"response": response, "elapsed": elapsed, "statements": len(statements), "peak": peak, "stages": stages}
+
+
+async def measure(slate: Slate) -> dict:
+    timed = await _run_slate(slate, instrumented=False)
+    traced = await _run_slate(slate, instrumented=True)
+    return {
+        "events": slate.events,
+        "picks": timed["response"]["picks_emitted_this_run"],
+        "events_per_sec": slate.events / timed["elapsed"],
+        "statements_per_event": traced["statements"] / slate.events,
+        "peak_memory_mb": traced["peak"] / 2**20,
+        "stage_per_item_seconds": {stage: summary["per_item_mean"] for stage, summary in timed["stages"].items()},
+    }
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("slate", SLATES, ids=lambda slate: slate.name)
+async def test_pipeline_throughput(slate: Slate) -> None:
+    result = await measure(slate)
+    print(f"\n{slate.name}: {json.dumps(result, indent=2, sort_keys=True)}")
+    assert result["picks"] > 0
+
+    if os.environ.get("BENCH_RESULTS_PATH"):
+        path = Path(os.environ["BENCH_RESULTS_PATH"])
+        existing = json.loads(path.read_text()) if path.exists() else {}
+        path.write_text(json.dumps(existing | {slate.name: result}, indent=2, sort_keys=True) + "\n")
+
+    baselines = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    if os.environ.get("BENCH_UPDATE_BASELINE") == "1":
+        baselines[slate.name] = {key: round(result[key], 2) for key in ("events_per_sec", "statements_per_event", "peak_memory_mb")} | {"host": host_id()}
+        BASELINE_PATH.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        return
+
+    baseline = baselines.get(slate.name)
+    if baseline is None:
+        pytest.skip(f"no baseline for {slate.name}; run with BENCH_UPDATE_BASELINE=1")
+    assert result["statements_per_event"] <= baseline["statements_per_event"] * (1 + STATEMENT_TOLERANCE), "more DB statements per event than the baseline"
+    if baseline.get("host") != host_id():
+        print(f"throughput baseline was recorded on {baseline.get('host')!r}; not comparing events/sec on {host_id()!r}")
+        return
+    tolerance = float(os.environ.get("BENCH_TOLERANCE", "0.5"))
+    assert result["events_per_sec"] >= baseline["events_per_sec"] * (1 - tolerance), f"throughput regressed: {result['events_per_sec']:.1f} < {baseline['events_per_sec']}"
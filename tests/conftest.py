@@ -6,6 +6,19 @@ from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_asyn
 os.environ['DATABASE_URL'] = 'sqlite+aiosqlite:///:memory:'
 
 from backend.app.db.base import Base  # noqa: E402
+from backend.app.services.features import feature_store  # noqa: E402
+from backend.app.services.ingestion import odds_delta_tracker  # noqa: E402
+from backend.app.services.normalization import team_index  # noqa: E402
+from backend.app.services.tick_store import tick_store  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _reset_process_caches() -> None:
+    # Every test gets a fresh in-memory database, so process-wide caches must not leak across tests.
+    team_index.invalidate()
+    odds_delta_tracker.clear()
+    tick_store.clear()
+    feature_store.clear()
 
 
 @pytest.fixture
@@ -0,0 +1,140 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event as event_api, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.app.db.session import get_db, get_session_factory
+from backend.app.main import app
+from backend.app.models.all_models import EventNormalized, Pick, Settlement
+from backend.app.services.closing import capture_started_event_closes
+from backend.app.services.pipeline import run_once
+from backend.app.services.provider import DeterministicMockOddsProvider
+
+
+@pytest.fixture
+async def client(session):
+    async def override_db():
+        yield session
+
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_session_factory] = lambda: async_sessionmaker(session.bind, class_=AsyncSession, expire_on_commit=False)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        yield c
+    app.dependency_overrides.clear()
+
+
+def _pick(idx: int, ev: float, tier: str, created_at: datetime) -> Pick:
+    return Pick(
+        odds_snapshot_id=1, event_normalized_id=1, feature_snapshot_id=1, model_version="m", feature_version="v1",
+        market="moneyline", side="home", book="book_a" if idx % 2 else "book_b", pick_time_price=-110, decimal_odds=1.91,
+        implied_prob=0.52, market_consensus_prob=0.5, model_prob=0.56, model_edge=0.06, ev_percent=ev, kelly_fraction=0.01,
+        tier=tier, created_at=created_at,
+    )
+
+
+async def test_picks_today_pages_by_ev_with_filters(session, client) -> None:
+    now = datetime.utcnow()
+    evs = [0.02, 0.09, 0.05, 0.05, 0.11, 0.01]
+    session.add_all([_pick(idx, ev, "A" if ev > 0.04 else "C", now) for idx, ev in enumerate(evs)])
+    session.add(_pick(99, 0.5, "A", now - timedelta(days=2)))
+    await session.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2} | ({"cursor": cursor} if cursor else {})
+        body = (await client.get("/picks/today/page", params=params)).json()
+        seen.extend(item["ev_percent"] for item in body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == sorted(evs, reverse=True)
+
+    body = (await client.get("/picks/today/page", params={"tier": "A", "min_ev": 0.06})).json()
+    assert [item["ev_percent"] for item in body["items"]] == [0.11, 0.09]
+    assert body["next_cursor"] is None
+
+    assert (await client.get("/picks/today/page", params={"cursor": "not-a-cursor"})).status_code == 400
+    cursor = (await client.get("/picks/today/page", params={"limit": 1})).json()["next_cursor"]
+    assert (await client.get("/picks/today/page", params={"cursor": cursor, "tier": "A"})).status_code == 400
+
+
+async def test_picks_today_keeps_the_list_shape(session, client) -> None:
+    now = datetime.utcnow()
+    session.add_all([_pick(idx, ev, "A", now) for idx, ev in enumerate([0.02, 0.09, 0.05])])
+    await session.commit()
+
+    body = (await client.get("/picks/today")).json()
+    assert [item["ev_percent"] for item in body] == [0.09, 0.05, 0.02]
+
+
+async def test_clv_metrics_segments_in_sql_and_skips_null_clv(session, client) -> None:
+    now = datetime.utcnow()
+    event = EventNormalized(event_raw_id=1, league_id=1, start_time=now + timedelta(hours=3))
+    session.add(event)
+    await session.flush()
+    picks = [_pick(idx, 0.05, "A" if idx < 3 else "B", now) for idx in range(4)]
+    for pick in picks:
+        pick.event_normalized_id, pick.book = event.id, "book_a"
+    session.add_all(picks)
+    await session.flush()
+    clv = [(0.02, 0.01), (0.04, None), (None, 0.03), (0.01, 0.01)]
+    session.add_all([
+        Settlement(pick_id=pick.id, result="W", settled_at=now, pnl=0.9, roi=0.05, clv_market=m, clv_book=b, settlement_source="official")
+        for pick, (m, b) in zip(picks, clv)
+    ])
+    await session.commit()
+
+    statements: list[str] = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event_api.listen(session.bind.sync_engine, "before_cursor_execute", listener)
+    body = (await client.get("/metrics/clv")).json()
+    event_api.remove(session.bind.sync_engine, "before_cursor_execute", listener)
+
+    assert len(statements) == 1
+    assert body["count"] == 4
+    assert body["aggregate_clv_market"] == pytest.approx(0.07 / 3)
+    assert body["clv_market"]["count"] == 3
+    assert body["clv_market"]["ci_low"] < body["clv_market"]["mean"] < body["clv_market"]["ci_high"]
+
+    by_tier = {seg["tier"]: seg for seg in body["segments"]}
+    assert by_tier["A"]["time_to_game"] == "1-6h"
+    assert by_tier["A"]["clv_market"]["mean"] == pytest.approx(0.03)
+    assert by_tier["A"]["clv_market"]["variance"] == pytest.approx(0.0002)
+    assert by_tier["B"]["clv_market"]["count"] == 1
+    assert by_tier["B"]["clv_market"]["variance"] is None
+
+
+async def test_lineage_export_streams_ndjson_and_csv(session, client) -> None:
+    for idx in range(3):
+        await run_once(session, DeterministicMockOddsProvider(f"evt-{idx}"))
+    start = await session.scalar(select(func.max(EventNormalized.start_time)))
+    await capture_started_event_closes(session, start + timedelta(seconds=1))
+    await session.commit()
+
+    response = await client.get("/exports/lineage")
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 3
+    assert all(row["snapshot_id"] and row["close_book_price"] is not None and row["result"] == "W" for row in rows)
+
+    model_version = rows[0]["model_version"]
+    response = await client.get("/exports/lineage", params={"format": "csv", "model_version": model_version, "end": rows[0]["created_at"]})
+    parsed = list(csv.DictReader(io.StringIO(response.text)))
+    assert parsed == []
+
+    response = await client.get("/exports/lineage", params={"format": "csv", "model_version": model_version})
+    parsed = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(row["pick_id"]) for row in parsed] == [row["pick_id"] for row in rows]
+    assert parsed[0]["result"] == "W"
+
+
+async def test_health_reports_pool_statistics(client) -> None:
+    body = (await client.get("/health")).json()
+    assert body["status"] == "ok"
+    assert "pool" in body["db_pool"]
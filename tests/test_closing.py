@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from backend.app.core.config import settings
+from backend.app.models.all_models import ClosingLine, EventNormalized, Pick, PickStatus, Settlement
+from backend.app.services.closing import CloseIndex, capture_started_event_closes
+from backend.app.services.ingestion import build_snapshot_rows, write_odds_snapshots
+from backend.app.services.pipeline import run_once
+from backend.app.services.provider import DeterministicMockOddsProvider
+from backend.app.services.rollups import read_pipeline_rollup
+from backend.app.services.tick_store import tick_store
+
+KEY = ("deterministic-mock", "evt-deterministic-1")
+
+
+class _EarlyPickProvider:
+    """The deterministic event, starting late enough that the pick run sees no close-window quotes."""
+
+    async def fetch_events_and_odds(self) -> list[dict]:
+        event = (await DeterministicMockOddsProvider().fetch_events_and_odds())[0]
+        return [{**event, "start_time": datetime.utcnow() + timedelta(minutes=14)}]
+
+
+def _close_quotes(start: datetime) -> list[dict]:
+    ts = start - timedelta(minutes=1)
+    return [
+        {"book": book, "market": "moneyline", "side": side, "price": price, "timestamp": ts}
+        for book, home, away in (("book_a", -130, 110), ("book_b", -125, 105), ("book_c", -128, 108))
+        for side, price in (("home", home), ("away", away))
+    ]
+
+
+def test_close_index_bisects_within_window() -> None:
+    t0 = datetime(2026, 3, 1, 19, 0)
+    lines = [{"book": "a", "side": "home", "price": -100 - i, "timestamp": t0 + timedelta(minutes=i)} for i in (4, 0, 2)]
+    index = CloseIndex(lines)
+    assert index.latest("a", "home", t0, t0 + timedelta(minutes=3))["price"] == -102
+    assert index.latest("a", "home", t0 + timedelta(minutes=5), t0 + timedelta(minutes=9)) is None
+    assert index.latest("a", "away", t0, t0 + timedelta(minutes=9)) is None
+    assert [line["price"] for line in index.latest_lines(t0, t0 + timedelta(minutes=9))] == [-104]
+
+
+async def _open_pick(session) -> tuple[Pick, datetime]:
+    await run_once(session, _EarlyPickProvider())
+    pick = await session.scalar(select(Pick))
+    assert pick.status == PickStatus.open
+    assert await session.scalar(select(ClosingLine)) is None
+    start = await session.scalar(select(EventNormalized.start_time).where(EventNormalized.id == pick.event_normalized_id))
+    return pick, start
+
+
+async def test_capture_at_start_closes_open_picks_from_tick_store(session) -> None:
+    pick, start = await _open_pick(session)
+    quotes = _close_quotes(start)
+    tick_store.record(KEY, start, [{**quote, "snapshot_id": pick.odds_snapshot_id} for quote in quotes])
+
+    assert await capture_started_event_closes(session, start + timedelta(minutes=1)) == 1
+    await session.commit()
+
+    closing = await session.scalar(select(ClosingLine).where(ClosingLine.pick_id == pick.id))
+    settlement = await session.scalar(select(Settlement).where(Settlement.pick_id == pick.id))
+    assert closing.close_book_price == -130
+    assert closing.close_market_consensus_prob is not None
+    assert settlement.clv_market == closing.close_market_consensus_prob - pick.implied_prob
+    assert pick.status == PickStatus.settled
+    assert (await read_pipeline_rollup(session)).closing_lines_total == 1
+    assert await capture_started_event_closes(session, start + timedelta(minutes=2)) == 0
+
+
+async def test_capture_falls_back_to_stored_snapshots(session) -> None:
+    pick, start = await _open_pick(session)
+    norm = await session.get(EventNormalized, pick.event_normalized_id)
+    rows = build_snapshot_rows(norm.event_raw_id, norm.id, _close_quotes(start), start)
+    await write_odds_snapshots(session, rows)
+    tick_store.clear()
+
+    assert await capture_started_event_closes(session, start + timedelta(minutes=1)) == 1
+    closing = await session.scalar(select(ClosingLine).where(ClosingLine.pick_id == pick.id))
+    assert closing.close_book_price == -130
+
+
+async def test_db_fallback_reads_unchanged_price_from_before_the_window(session, monkeypatch) -> None:
+    # The pick run's quotes (about 14 minutes before start) are the last ones stored, as in delta
+    # mode when the price never moves inside the window.
+    pick, start = await _open_pick(session)
+    tick_store.clear()
+
+    monkeypatch.setattr(settings, "odds_heartbeat_seconds", 120)
+    assert await capture_started_event_closes(session, start + timedelta(minutes=1)) == 0
+
+    monkeypatch.setattr(settings, "odds_heartbeat_seconds", 1800)
+    assert await capture_started_event_closes(session, start + timedelta(minutes=1)) == 1
+    closing = await session.scalar(select(ClosingLine).where(ClosingLine.pick_id == pick.id))
+    assert closing.closing_line_snapshot_id is not None
+    assert closing.captured_at < start - timedelta(minutes=settings.close_capture_window_minutes)
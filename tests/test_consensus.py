@@ -1,4 +1,9 @@
-from backend.app.services.consensus import build_market_consensus
+import random
+import time
+
+import pytest
+
+from backend.app.services.consensus import build_market_consensus, build_market_consensus_batch, pack_event_lines
 
 
 def test_vig_removal_consensus() -> None:
@@ -15,3 +20,75 @@ def test_vig_removal_consensus() -> None:
     result = decision.result
     assert 0.49 < result.home_prob < 0.53
     assert round(result.home_prob + result.away_prob, 6) == 1.0
+
+
+def _random_slate(n_events: int, seed: int = 7) -> list[list[dict]]:
+    rng = random.Random(seed)
+    books = [f"book_{idx}" for idx in range(12)]
+    slate = []
+    for _ in range(n_events):
+        lines = []
+        for book in rng.sample(books, rng.randint(1, len(books))):
+            home = rng.choice([-1, 1]) * rng.randint(100, 300)
+            for side, price in (("home", home), ("away", -home if rng.random() < 0.8 else rng.randint(100, 200))):
+                if rng.random() < 0.08:
+                    continue
+                lines.append({"book": book, "side": side, "price": price, "is_stale": rng.random() < 0.05})
+        rng.shuffle(lines)
+        slate.append(lines)
+    return slate
+
+
+@pytest.mark.parametrize("book_weights", [None, {"book_0": 2.0, "book_3": 0.5, "book_7": 1.5}])
+def test_batch_consensus_matches_scalar(book_weights) -> None:
+    slate = _random_slate(300)
+    batch = build_market_consensus_batch(pack_event_lines(slate), book_weights=book_weights)
+    for lines, decision in zip(slate, batch, strict=True):
+        expected = build_market_consensus(lines, book_weights=book_weights)
+        assert decision.missing_reason == expected.missing_reason
+        if expected.result is None:
+            assert decision.result is None
+            continue
+        assert decision.result.books_used == expected.result.books_used
+        assert decision.result.home_prob == pytest.approx(expected.result.home_prob, abs=1e-12)
+        assert decision.result.away_prob == pytest.approx(expected.result.away_prob, abs=1e-12)
+
+
+def test_pack_keeps_the_last_repeated_quote() -> None:
+    lines = [{"book": "a", "side": "home", "price": -100 - idx} for idx in range(50)]
+    lines.append({"book": "a", "side": "away", "price": 120})
+    packed = pack_event_lines([lines, list(reversed(lines))])
+    assert packed.prices[0, 0].tolist() == [-149, 120]
+    assert packed.prices[1, 0].tolist() == [-100, 120]
+
+
+def test_batch_consensus_rejects_zero_weights() -> None:
+    slate = _random_slate(1, seed=3)
+    weights = {line["book"]: 0.0 for line in slate[0]}
+    expected = build_market_consensus(slate[0], book_weights=weights)
+    assert build_market_consensus_batch(pack_event_lines(slate), book_weights=weights)[0].missing_reason == expected.missing_reason
+
+
+def _best_of(repeats: int, fn) -> float:
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+@pytest.mark.benchmark
+def test_batch_consensus_benchmark() -> None:
+    slate = _random_slate(2000)
+    packed = pack_event_lines(slate)
+
+    scalar_seconds = _best_of(3, lambda: [build_market_consensus(lines) for lines in slate])
+    pack_seconds = _best_of(3, lambda: pack_event_lines(slate))
+    batch_seconds = _best_of(3, lambda: build_market_consensus_batch(packed))
+
+    print(
+        f"consensus over {len(slate)} events: scalar={scalar_seconds * 1000:.1f}ms "
+        f"pack={pack_seconds * 1000:.1f}ms batch={batch_seconds * 1000:.1f}ms"
+    )
+    assert batch_seconds < scalar_seconds
@@ -0,0 +1,40 @@
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.app.core.config import settings
+from backend.app.db.session import InstrumentedQueuePool, create_engine_from_settings, engine_options, pool_statistics
+
+
+def test_engine_profile_per_backend() -> None:
+    assert "pool_size" not in engine_options("sqlite+aiosqlite:///:memory:")
+
+    pooled = engine_options("postgresql+asyncpg://user:pw@db/boom")
+    assert pooled["poolclass"] is InstrumentedQueuePool
+    assert pooled["pool_size"] == settings.db_pool_size
+    assert pooled["pool_recycle"] == settings.db_pool_recycle_seconds
+    assert pooled["connect_args"]["prepared_statement_cache_size"] == settings.db_prepared_statement_cache_size
+
+
+async def test_file_sqlite_uses_wal_and_reports_pool_waits(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "db_pool_size", 1)
+    monkeypatch.setattr(settings, "db_max_overflow", 0)
+    engine = create_engine_from_settings(f"sqlite+aiosqlite:///{tmp_path}/pool.db")
+    maker = async_sessionmaker(engine, class_=AsyncSession)
+
+    async def hold(seconds: float) -> str:
+        async with maker() as session:
+            mode = await session.scalar(text("PRAGMA journal_mode"))
+            await asyncio.sleep(seconds)
+            return mode
+
+    modes = await asyncio.gather(hold(0.1), hold(0.0))
+    stats = pool_statistics(engine)
+    await engine.dispose()
+
+    assert modes == ["wal", "wal"]
+    assert stats["pool"] == "InstrumentedQueuePool"
+    assert stats["size"] == 1
+    assert stats["checked_out"] == 0
+    assert stats["wait_seconds_max"] >= 0.05
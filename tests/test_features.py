@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from backend.app.models.all_models import FeatureSnapshot, Pick, PipelineRun
+from backend.app.services.features import FeatureContext, FeatureStore, feature_content_hash
+from backend.app.services.pipeline import run_once
+from backend.app.services.provider import DeterministicMockOddsProvider
+
+T0 = datetime(2026, 3, 1, 12, 0)
+KEY = ("feed", "evt-1")
+
+
+def test_values_expire_ttl_after_they_were_computed() -> None:
+    store = FeatureStore()
+    first = store.features(KEY, T0 + timedelta(hours=8), FeatureContext(1, 2, T0))
+    assert (store.hits, store.misses) == (0, 6)
+
+    assert store.features(KEY, T0 + timedelta(hours=8), FeatureContext(1, 2, T0 + timedelta(minutes=30))) == first
+    assert (store.hits, store.misses) == (6, 6)
+
+    # An hour after they were computed only the two hourly features expire.
+    store.features(KEY, T0 + timedelta(hours=8), FeatureContext(1, 2, T0 + timedelta(minutes=61)))
+    assert (store.hits, store.misses) == (10, 8)
+
+    # Crossing a clock hour does not expire the values recomputed at T0+61m.
+    store.features(KEY, T0 + timedelta(hours=8), FeatureContext(1, 2, T0 + timedelta(minutes=119)))
+    assert (store.hits, store.misses) == (16, 8)
+
+    # A remapped team is a different cache entry.
+    store.features(KEY, T0 + timedelta(hours=8), FeatureContext(1, 3, T0 + timedelta(minutes=119)))
+    assert (store.hits, store.misses) == (16, 14)
+
+    store.evict_started(T0 + timedelta(hours=8))
+    assert store.stats()["cached_values"] == 0
+
+
+def test_content_hash_ignores_key_order_and_tracks_version() -> None:
+    assert feature_content_hash({"a": 1.0, "b": 0.5}) == feature_content_hash({"b": 0.5, "a": 1.0})
+    assert feature_content_hash({"a": 1.0}) != feature_content_hash({"a": 1.0}, feature_version="v2")
+
+
+async def test_identical_features_are_stored_once(session) -> None:
+    await run_once(session, DeterministicMockOddsProvider())
+    await run_once(session, DeterministicMockOddsProvider())
+
+    assert await session.scalar(select(func.count(FeatureSnapshot.id))) == 1
+    snapshot_ids = set((await session.scalars(select(Pick.feature_snapshot_id))).all())
+    assert len(snapshot_ids) == 1
+    snapshot = await session.get(FeatureSnapshot, snapshot_ids.pop())
+    assert snapshot.content_hash == feature_content_hash(snapshot.features_json)
+
+    runs = (await session.scalars(select(PipelineRun).order_by(PipelineRun.id))).all()
+    assert runs[0].metadata_json["feature_store"]["snapshots_written"] == 1
+    assert runs[1].metadata_json["feature_store"] == {
+        "hits": 6, "misses": 0, "snapshots_reused": 1, "snapshots_written": 0, "hit_rate": 1.0, "snapshot_reuse_rate": 1.0,
+    }
+
+
+class _TwoEventProvider:
+    async def fetch_events_and_odds(self) -> list[dict]:
+        base = (await DeterministicMockOddsProvider().fetch_events_and_odds())[0]
+        return [{**base, "external_event_id": f"evt-{idx}", "start_time": base["start_time"] + timedelta(minutes=idx)} for idx in range(2)]
+
+
+async def test_events_with_equal_values_get_their_own_snapshots(session) -> None:
+    await run_once(session, _TwoEventProvider())
+    await run_once(session, _TwoEventProvider())
+
+    snapshots = (await session.scalars(select(FeatureSnapshot))).all()
+    assert len(snapshots) == 2
+    assert len({snapshot.content_hash for snapshot in snapshots}) == 1
+    picks = (await session.scalars(select(Pick))).all()
+    assert len(picks) == 2
+    by_id = {snapshot.id: snapshot for snapshot in snapshots}
+    assert all(by_id[pick.feature_snapshot_id].event_normalized_id == pick.event_normalized_id for pick in picks)
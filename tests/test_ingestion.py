@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, func, select
+
+from backend.app.core.config import settings
+from backend.app.models.all_models import EventRaw, OddsSnapshot, Pick
+from backend.app.services.ingestion import OddsDeltaTracker, attach_snapshot_ids, build_snapshot_rows, write_odds_snapshots
+from backend.app.services.pipeline import run_once
+from backend.app.services.provider import DeterministicMockOddsProvider
+
+
+async def test_bulk_snapshot_write_returns_ids_in_order(session) -> None:
+    raw = EventRaw(source='x', external_event_id='1', league='NBA', start_time=datetime.utcnow(), home_team='a', away_team='b')
+    session.add(raw)
+    await session.flush()
+
+    now = datetime.utcnow()
+    lines = [
+        {"book": "a", "market": "moneyline", "side": "home", "price": -110, "timestamp": now},
+        {"book": "a", "market": "moneyline", "side": "away", "price": +100, "timestamp": now - timedelta(hours=1)},
+        {"book": "b", "market": "moneyline", "side": "home", "price": -105, "timestamp": now},
+    ]
+    rows = build_snapshot_rows(raw.id, None, lines, now)
+
+    statements: list[str] = []
+    event.listen(session.bind.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    ids = await write_odds_snapshots(session, rows)
+
+    assert len([s for s in statements if s.startswith("INSERT INTO odds_snapshots")]) == 1
+    stored = {s.id: s for s in (await session.scalars(select(OddsSnapshot))).all()}
+    assert [stored[i].price for i in ids] == [-110, 100, -105]
+    assert stored[ids[1]].is_stale
+
+    valid = attach_snapshot_ids(lines, rows, ids)
+    assert [line["snapshot_id"] for line in valid] == [ids[0], ids[2]]
+
+
+async def test_delta_mode_only_stores_moved_prices(session, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "odds_delta_mode", True)
+    provider = DeterministicMockOddsProvider()
+    await run_once(session, provider)
+    first_count = await session.scalar(select(func.count()).select_from(OddsSnapshot))
+
+    result = await run_once(session, provider)
+    assert await session.scalar(select(func.count()).select_from(OddsSnapshot)) == first_count
+    assert result["block_reasons"] == {"OPEN_PICK_EXISTS": 1}
+    pick = await session.scalar(select(Pick))
+    assert await session.get(OddsSnapshot, pick.odds_snapshot_id) is not None
+
+    monkeypatch.setattr(settings, "odds_heartbeat_seconds", 0)
+    await run_once(session, provider)
+    assert await session.scalar(select(func.count()).select_from(OddsSnapshot)) == 2 * first_count
+
+
+def test_delta_tracker_reuses_snapshots_only_for_the_same_normalized_event() -> None:
+    now = datetime.utcnow()
+    lines = [{"book": "a", "market": "moneyline", "side": "home", "price": -110, "timestamp": now}]
+    tracker = OddsDeltaTracker()
+    tracker.record(("x", "1"), now + timedelta(hours=1), build_snapshot_rows(1, 10, lines, now), [100])
+
+    assert tracker.reusable_ids(("x", "1"), build_snapshot_rows(2, 10, lines, now)) == [100]
+    assert tracker.reusable_ids(("x", "1"), build_snapshot_rows(2, 11, lines, now)) == [None]
@@ -1,12 +1,25 @@
-from sqlalchemy import func, select
+from datetime import datetime, timedelta
 
-from backend.app.models.all_models import ClosingLine, MarketConsensus, Pick, Settlement
-from backend.app.services.pipeline import run_once
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from backend.app.db.base import Base
+from backend.app.models.all_models import ClosingLine, EventNormalized, MarketConsensus, Pick, PickStatus, PipelineRun, Settlement
+from backend.app.services.closing import capture_started_event_closes
+from backend.app.services.pipeline import _reconciliation_groups, run_once
+from backend.app.services.normalization import team_index
 from backend.app.services.provider import DeterministicMockOddsProvider
 
 
 async def test_end_to_end_pipeline(session) -> None:
     await run_once(session, DeterministicMockOddsProvider())
+    # The pick run only writes the pick; its close is captured once the event starts.
+    assert await session.scalar(select(func.count()).select_from(ClosingLine)) == 0
+    assert (await session.scalar(select(Pick).limit(1))).status == PickStatus.open
+    start = await session.scalar(select(EventNormalized.start_time))
+    assert await capture_started_event_closes(session, start + timedelta(seconds=1)) >= 1
+    await session.commit()
+
     picks = await session.scalar(select(func.count()).select_from(Pick))
     consensus = await session.scalar(select(func.count()).select_from(MarketConsensus))
     close = await session.scalar(select(func.count()).select_from(ClosingLine))
@@ -24,6 +37,7 @@ async def test_end_to_end_pipeline(session) -> None:
     assert pick.model_edge is not None
     assert pick.ev_percent is not None
     assert pick.kelly_fraction is not None
+    assert pick.status == PickStatus.settled
 
     close_line = await session.scalar(select(ClosingLine).where(ClosingLine.pick_id == pick.id))
     assert close_line is not None
@@ -45,3 +59,83 @@ async def test_end_to_end_pipeline(session) -> None:
     else:
         # TODO: tighten this assertion if schema/data always guarantee market close consensus.
         assert True
+
+
+class _SlateProvider:
+    """Six copies of the deterministic event; every third one has an unmapped home team."""
+
+    async def fetch_events_and_odds(self) -> list[dict]:
+        base = (await DeterministicMockOddsProvider().fetch_events_and_odds())[0]
+        return [
+            {
+                **base,
+                "external_event_id": f"evt-{idx}",
+                "start_time": base["start_time"] + timedelta(minutes=idx),
+                "home_team": base["home_team"] if idx % 3 else "unknown home",
+            }
+            for idx in range(6)
+        ]
+
+
+async def test_concurrent_run_aggregates_like_sequential(tmp_path) -> None:
+    results = []
+    for concurrency in (1, 4):
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/run-{concurrency}.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with maker() as session:
+            results.append(await run_once(session, _SlateProvider(), concurrency=concurrency, session_factory=maker))
+            run = await session.scalar(select(PipelineRun))
+            assert run.metadata_json["concurrency"] == concurrency
+            assert run.quarantine_count == 2
+        await engine.dispose()
+        team_index.invalidate()
+
+    sequential, concurrent = results
+    assert concurrent == sequential
+    assert sequential["block_reasons"] == {"LOW_MAPPING_CONFIDENCE": 2}
+    assert sequential["picks_emitted_this_run"] == 4
+
+
+async def test_concurrent_run_captures_started_closes_after_fan_out(tmp_path) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/capture.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with maker() as session:
+        await run_once(session, DeterministicMockOddsProvider())
+        # The deterministic event has just started, leaving its pick open for capture.
+        await session.execute(update(EventNormalized).values(start_time=datetime.utcnow() - timedelta(seconds=1)))
+        await session.commit()
+
+        result = await run_once(session, _SlateProvider(), concurrency=2, session_factory=maker)
+        run = await session.scalar(select(PipelineRun).order_by(PipelineRun.id.desc()).limit(1))
+        assert result["events_processed"] == 6
+        assert run.metadata_json["closes_captured_at_start"] == 1
+        assert await session.scalar(select(func.count()).select_from(ClosingLine)) == 1
+    await engine.dispose()
+
+
+class _TwoFeedProvider:
+    """One game reported by two sources: both events reconcile onto one normalized row."""
+
+    async def fetch_events_and_odds(self) -> list[dict]:
+        base = (await DeterministicMockOddsProvider().fetch_events_and_odds())[0]
+        return [base, {**base, "source": "second-feed", "external_event_id": "feed-2-evt", "home_team": "la lakers"}]
+
+
+async def test_concurrent_run_reconciles_one_game_in_one_session(tmp_path) -> None:
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/recon.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    # A default factory expires on commit; candidates must still be readable after the fan-out.
+    maker = async_sessionmaker(engine, class_=AsyncSession)
+    async with maker() as session:
+        result = await run_once(session, _TwoFeedProvider(), concurrency=2, session_factory=maker)
+        assert _reconciliation_groups(await _TwoFeedProvider().fetch_events_and_odds()) == [[0, 1]]
+        assert result["events_processed"] == 2
+        assert await session.scalar(select(func.count()).select_from(EventNormalized)) == 1
+        assert await session.scalar(select(func.count()).select_from(Pick)) == 1
+    await engine.dispose()
+    team_index.invalidate()
@@ -0,0 +1,57 @@
+import os
+from datetime import datetime
+
+from sqlalchemy import select
+
+from backend.app.models.all_models import ModelArtifact, Pick
+from backend.app.services import modeling
+from backend.app.services.model_registry import ModelRegistry
+from backend.app.services.pipeline import run_once
+from backend.app.services.provider import DeterministicMockOddsProvider
+
+SAMPLES = [
+    {"team_win_loss_home_away": 0.6, "recent_form_last_n": 0.6, "head_to_head": 0.5, "rest_days_density": 0.1, "off_def_efficiency": 1.0, "home_court_advantage": 1.0},
+    {"team_win_loss_home_away": 0.4, "recent_form_last_n": 0.4, "head_to_head": 0.4, "rest_days_density": -0.2, "off_def_efficiency": -1.0, "home_court_advantage": 1.0},
+    {"team_win_loss_home_away": 0.7, "recent_form_last_n": 0.68, "head_to_head": 0.6, "rest_days_density": 0.3, "off_def_efficiency": 1.2, "home_court_advantage": 1.0},
+    {"team_win_loss_home_away": 0.3, "recent_form_last_n": 0.35, "head_to_head": 0.4, "rest_days_density": -0.3, "off_def_efficiency": -1.2, "home_court_advantage": 1.0},
+]
+
+
+def test_registry_caches_until_artifact_changes(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(modeling, "ARTIFACT_DIR", tmp_path)
+    path_a, _ = modeling.train_baseline_model(SAMPLES, [1, 0, 1, 0], "registry-a")
+    path_b, _ = modeling.train_baseline_model(SAMPLES, [1, 0, 1, 0], "registry-b")
+    registry = ModelRegistry(max_entries=1)
+
+    first = registry.get("registry-a", path_a)
+    assert isinstance(first.estimator, modeling.LogisticScorer)
+    assert registry.get("registry-a", path_a) is first
+    assert (registry.hits, registry.misses) == (1, 1)
+
+    # Only the file actually loaded (the exported scorer) invalidates the entry.
+    stat = os.stat(path_a)
+    os.utime(path_a, (stat.st_atime, stat.st_mtime + 5))
+    assert registry.get("registry-a", path_a) is first
+    scorer = modeling.scorer_path(path_a)
+    stat = os.stat(scorer)
+    os.utime(scorer, (stat.st_atime, stat.st_mtime + 5))
+    assert registry.get("registry-a", path_a) is not first
+    assert registry.misses == 2
+
+    registry.get("registry-b", path_b)
+    registry.get("registry-a", path_a)
+    assert registry.stats()["cached"] == 1
+    assert registry.misses == 4
+    assert registry.total_load_seconds > 0
+
+
+async def test_unreadable_artifact_falls_back_to_baseline(session, tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(modeling, "ARTIFACT_DIR", tmp_path)
+    path, metrics = modeling.train_baseline_model(SAMPLES, [1, 0, 1, 0], "registry-corrupt")
+    modeling.scorer_path(path).write_bytes(b"not a zip archive")
+    session.add(ModelArtifact(model_version="registry-corrupt", trained_at=datetime.utcnow(), training_window="test", metrics_json=metrics, artifact_path=path))
+    await session.commit()
+
+    assert await ModelRegistry().load_active(session) is None
+    await run_once(session, DeterministicMockOddsProvider())
+    assert (await session.scalar(select(Pick))).model_version == "baseline-default"
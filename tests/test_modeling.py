@@ -1,7 +1,37 @@
-from backend.app.services.modeling import train_baseline_model
+import time
 
+import numpy as np
+import pytest
 
-def test_train_baseline_model_includes_holdout_metrics() -> None:
+from backend.app.services import modeling
+from backend.app.services.modeling import (
+    FEATURE_COLUMNS,
+    LogisticScorer,
+    load_estimator,
+    load_model,
+    load_scorer,
+    predict_home_win_probabilities,
+    predict_home_win_probability,
+    scorer_path,
+    train_baseline_model,
+)
+
+
+def _random_rows(count: int, seed: int = 3) -> list[dict]:
+    values = np.random.default_rng(seed).normal(0.0, 1.5, size=(count, len(FEATURE_COLUMNS)))
+    return [dict(zip(FEATURE_COLUMNS, row.tolist())) for row in values]
+
+
+def _trained(tmp_path, monkeypatch, model_version: str) -> str:
+    monkeypatch.setattr(modeling, "ARTIFACT_DIR", tmp_path)
+    rows = _random_rows(200)
+    labels = [int(row["off_def_efficiency"] + 0.5 * row["recent_form_last_n"] > 0) for row in rows]
+    artifact_path, _ = train_baseline_model(rows, labels, model_version)
+    return artifact_path
+
+
+def test_train_baseline_model_includes_holdout_metrics(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(modeling, "ARTIFACT_DIR", tmp_path)
     samples = [
         {"team_win_loss_home_away": 0.6, "recent_form_last_n": 0.6, "head_to_head": 0.5, "rest_days_density": 0.1, "off_def_efficiency": 1.0, "home_court_advantage": 1.0},
         {"team_win_loss_home_away": 0.4, "recent_form_last_n": 0.4, "head_to_head": 0.4, "rest_days_density": -0.2, "off_def_efficiency": -1.0, "home_court_advantage": 1.0},
@@ -11,9 +41,60 @@ def test_train_baseline_model_includes_holdout_metrics() -> None:
         {"team_win_loss_home_away": 0.3, "recent_form_last_n": 0.35, "head_to_head": 0.4, "rest_days_density": -0.3, "off_def_efficiency": -1.2, "home_court_advantage": 1.0},
     ]
     labels = [1, 0, 1, 0, 1, 0]
-    _, metrics = train_baseline_model(samples, labels, "test-model-metrics")
+    artifact_path, metrics = train_baseline_model(samples, labels, "test-model-metrics")
 
     assert "log_loss" in metrics
     assert "brier_score_loss" in metrics
     assert "calibration_bins" in metrics
     assert "holdout_size" in metrics
+
+    estimator = load_estimator(artifact_path)
+    batch = predict_home_win_probabilities(samples, estimator)
+    assert batch.shape == (len(samples),)
+    assert np.allclose(batch, [predict_home_win_probability(row, estimator) for row in samples])
+
+
+def test_numpy_scorer_matches_sklearn(tmp_path, monkeypatch) -> None:
+    artifact_path = _trained(tmp_path, monkeypatch, "scorer-parity")
+    estimator = load_estimator(artifact_path)
+    scorer = load_model(artifact_path)
+    assert isinstance(scorer, LogisticScorer)
+    assert scorer.columns == tuple(FEATURE_COLUMNS)
+
+    rows = _random_rows(500, seed=11)
+    expected = predict_home_win_probabilities(rows, estimator)
+    assert np.allclose(predict_home_win_probabilities(rows, scorer), expected, rtol=0, atol=1e-12)
+    assert np.allclose([predict_home_win_probability(row, scorer) for row in rows[:20]], expected[:20], rtol=0, atol=1e-12)
+    assert predict_home_win_probabilities([], scorer).shape == (0,)
+
+    scorer_path(artifact_path).unlink()
+    assert not isinstance(load_model(artifact_path), LogisticScorer)
+
+
+def _per_call_seconds(calls: int, fn) -> float:
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(calls):
+            fn()
+        best = min(best, (time.perf_counter() - started) / calls)
+    return best
+
+
+@pytest.mark.benchmark
+def test_numpy_scorer_benchmark(tmp_path, monkeypatch) -> None:
+    artifact_path = _trained(tmp_path, monkeypatch, "scorer-bench")
+    estimator, scorer = load_estimator(artifact_path), load_scorer(scorer_path(artifact_path))
+    row, batch = _random_rows(1)[0], _random_rows(200)
+
+    sklearn_row = _per_call_seconds(200, lambda: predict_home_win_probability(row, estimator))
+    numpy_row = _per_call_seconds(200, lambda: predict_home_win_probability(row, scorer))
+    sklearn_batch = _per_call_seconds(50, lambda: predict_home_win_probabilities(batch, estimator))
+    numpy_batch = _per_call_seconds(50, lambda: predict_home_win_probabilities(batch, scorer))
+
+    print(
+        f"per call: row sklearn={sklearn_row * 1e6:.1f}us numpy={numpy_row * 1e6:.1f}us; "
+        f"batch of {len(batch)} sklearn={sklearn_batch * 1e6:.1f}us numpy={numpy_batch * 1e6:.1f}us"
+    )
+    assert numpy_row < sklearn_row
+    assert numpy_batch < sklearn_batch
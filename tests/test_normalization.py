@@ -1,9 +1,9 @@
 from datetime import datetime
 
-from sqlalchemy import select
+from sqlalchemy import event
 
 from backend.app.models.all_models import EventNormalized, EventRaw, League, Team, TeamAlias
-from backend.app.services.normalization import normalize_event
+from backend.app.services.normalization import normalize_event, resolve_team, team_index
 
 
 async def test_deterministic_alias_mapping(session) -> None:
@@ -41,3 +41,31 @@ async def test_quarantine_on_unknown_team(session) -> None:
     await session.flush()
     await normalize_event(session, norm, raw.home_team, raw.away_team)
     assert norm.quarantine_reason == 'NO_ALIAS_MATCH'
+
+
+async def test_alias_index_resolves_without_queries_and_refreshes_on_change(session) -> None:
+    league = League(name='NBA')
+    lakers = Team(normalized_name='los angeles lakers')
+    session.add_all([league, lakers])
+    await session.flush()
+    raw = EventRaw(source='x', external_event_id='3', league='NBA', start_time=datetime.utcnow(), home_team='lal', away_team='los angeles lakers')
+    session.add(raw)
+    await session.flush()
+    norm = EventNormalized(event_raw_id=raw.id, league_id=league.id, start_time=raw.start_time)
+    session.add(norm)
+    await session.flush()
+
+    await team_index.ensure_loaded(session)
+    statements: list[str] = []
+    event.listen(session.bind.sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    hits, misses = team_index.hits, team_index.misses
+    await normalize_event(session, norm, raw.home_team, raw.away_team)
+    assert statements == []
+    assert norm.quarantine_reason == 'NO_ALIAS_MATCH'
+    assert (team_index.hits - hits, team_index.misses - misses) == (1, 1)
+
+    session.add(TeamAlias(alias='lal', team_id=lakers.id, source='test', confidence=0.99))
+    await session.flush()
+    assert not team_index.is_fresh()
+    resolution = await resolve_team(session, 'LAL')
+    assert resolution.team_id == lakers.id
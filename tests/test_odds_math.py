@@ -1,9 +1,13 @@
+import numpy as np
+
 from backend.app.services.odds_math import (
     american_to_decimal,
+    american_to_decimal_array,
     american_to_implied_prob,
     decimal_to_implied_prob,
     ev_percent,
     quarter_kelly,
+    quarter_kelly_array,
 )
 
 
@@ -19,3 +23,12 @@ def test_ev_and_kelly_exact() -> None:
     odds = 1.91
     assert round(ev_percent(p, odds), 4) == 0.0505
     assert round(quarter_kelly(p, odds), 4) == round((((p * odds) - 1) / (odds - 1)) * 0.25, 4)
+
+
+def test_array_helpers_match_scalar_math() -> None:
+    prices = np.array([+150, -110, -250, +100])
+    probs = np.array([0.45, 0.55, 0.6, 0.4])
+    decimals = american_to_decimal_array(prices)
+    assert decimals.tolist() == [american_to_decimal(int(p)) for p in prices]
+    assert quarter_kelly_array(probs, decimals).tolist() == [quarter_kelly(p, d) for p, d in zip(probs, decimals)]
+    assert np.isnan(american_to_decimal_array(np.array([np.nan]))[0])
@@ -0,0 +1,118 @@
+import time
+from datetime import timedelta
+
+from sqlalchemy import select
+
+from backend.app.models.all_models import EventNormalized
+from backend.app.services.pipeline import run_once, seed_provider_reference
+from backend.app.services.provider import (
+    CompositeOddsProvider,
+    DeterministicMockOddsProvider,
+    LatencyInjectingProvider,
+    MockOddsProvider,
+    SyntheticOddsProvider,
+    merge_events,
+)
+
+
+async def test_composite_provider_isolates_slow_and_flaky_feeds() -> None:
+    composite = CompositeOddsProvider(
+        {
+            "fast": LatencyInjectingProvider(DeterministicMockOddsProvider(), latency_seconds=0.01),
+            "flaky": LatencyInjectingProvider(MockOddsProvider(), latency_seconds=0.01, fail_first=1),
+            "hung": LatencyInjectingProvider(MockOddsProvider(), latency_seconds=5),
+        },
+        deadlines={"hung": 0.05},
+        max_retries=1,
+        backoff_seconds=0.01,
+    )
+    started = time.perf_counter()
+    payload = await composite.fetch_events_and_odds()
+    assert time.perf_counter() - started < 1
+
+    stats = composite.last_fetch_stats
+    assert stats["fast"]["attempts"] == 1 and stats["fast"]["failures"] == 0
+    assert stats["flaky"]["attempts"] == 2 and stats["flaky"]["events"] == 1
+    assert stats["hung"]["failures"] == 2 and stats["hung"]["error"] == "TimeoutError"
+    assert len(payload) == 1
+
+
+async def test_merge_deduplicates_events_and_keeps_latest_quote() -> None:
+    primary = await DeterministicMockOddsProvider().fetch_events_and_odds()
+    later = [line | {"price": line["price"] - 5, "timestamp": line["timestamp"] + timedelta(seconds=5)} for line in primary[0]["odds"][:2]]
+    secondary = [primary[0] | {"source": "other", "home_team": "Los Angeles Lakers ", "odds": later + [{"book": "book_z", "market": "moneyline", "side": "home", "price": -120, "timestamp": later[0]["timestamp"]}]}]
+
+    merged = merge_events([primary, secondary])
+    assert len(merged) == 1
+    assert merged[0]["source"] == "deterministic-mock"
+    quotes = {(line["book"], line["side"]): line["price"] for line in merged[0]["odds"]}
+    assert len(quotes) == 7
+    assert quotes[("book_a", "home")] == -115
+    assert quotes[("book_z", "home")] == -120
+
+
+async def test_synthetic_provider_is_seeded_and_cheap() -> None:
+    strip = lambda events: [(e["external_event_id"], e["home_team"], [(l["book"], l["side"], l["price"]) for l in e["odds"]]) for e in events]  # noqa: E731
+    first = await SyntheticOddsProvider(events=50, seed=3).fetch_events_and_odds()
+    again = await SyntheticOddsProvider(events=50, seed=3).fetch_events_and_odds()
+    assert strip(first) == strip(again)
+    assert strip(first) != strip(await SyntheticOddsProvider(events=50, seed=4).fetch_events_and_odds())
+
+    provider = SyntheticOddsProvider(events=2000, books=6, ticks_per_fetch=2, stale_rate=0.1, missing_side_rate=0.1)
+    started = time.perf_counter()
+    events = await provider.fetch_events_and_odds()
+    assert time.perf_counter() - started < 2.0
+    assert len({(e["league"], e["start_time"], e["home_team"], e["away_team"]) for e in events}) == 2000
+    lines = [line for event in events for line in event["odds"]]
+    assert sum(line["side"] == "away" for line in lines) < sum(line["side"] == "home" for line in lines)
+    moved = await provider.fetch_events_and_odds()
+    assert [l["price"] for l in moved[0]["odds"]] != [l["price"] for l in events[0]["odds"]]
+
+
+async def test_synthetic_slate_exercises_normalization_and_quarantine(session) -> None:
+    # Starts within the mapping time tolerance, so mapped events reach scoring.
+    provider = SyntheticOddsProvider(events=120, alias_rate=0.5, unknown_team_rate=0.1, seed=11, start_spread_minutes=10)
+    await seed_provider_reference(session, provider.reference_data())
+    result = await run_once(session, provider)
+
+    assert result["events_processed"] == 120
+    assert result["quarantine_count"] > 0
+    assert result["block_reasons"]["LOW_MAPPING_CONFIDENCE"] > 0
+    assert result["picks_emitted_this_run"] > 0
+    mapped = (await session.scalars(select(EventNormalized).where(EventNormalized.home_team_id.is_not(None)))).all()
+    assert len(mapped) > 60
+
+
+async def test_synthetic_slate_can_be_polled_repeatedly(session) -> None:
+    provider = SyntheticOddsProvider(events=40, seed=5)
+    await seed_provider_reference(session, provider.reference_data())
+    for _ in range(3):
+        result = await run_once(session, provider)
+        assert result["events_processed"] == 40
+
+    assert provider.fetches == 3
+    normalized = (await session.scalars(select(EventNormalized))).all()
+    assert len(normalized) == 40
+
+
+async def test_synthetic_starts_spread_over_hours_by_default() -> None:
+    starts = [event["start_time"] for event in await SyntheticOddsProvider(events=200, seed=2).fetch_events_and_odds()]
+    assert max(starts) - min(starts) > timedelta(hours=3)
+
+
+class _AliasedFeed:
+    """The deterministic game under alias team names, starting a few seconds later."""
+
+    async def fetch_events_and_odds(self) -> list[dict]:
+        event = (await DeterministicMockOddsProvider().fetch_events_and_odds())[0]
+        start = event["start_time"].replace(second=59) + timedelta(seconds=2)
+        return [{**event, "source": "aliased", "external_event_id": "alias-1", "start_time": start, "home_team": "LA Lakers", "away_team": "gs warriors"}]
+
+
+async def test_composite_merges_one_game_reported_under_alias_names(session) -> None:
+    composite = CompositeOddsProvider({"primary": DeterministicMockOddsProvider(), "aliased": _AliasedFeed()})
+    result = await run_once(session, composite)
+
+    assert result["events_processed"] == 1
+    assert result["picks_emitted_this_run"] == 1
+    assert len((await session.scalars(select(EventNormalized))).all()) == 1
@@ -0,0 +1,51 @@
+"""EXPLAIN QUERY PLAN regression checks for the hot read paths on SQLite.
+
+Each query must be answered through an index (SEARCH); any SCAN of a table or a whole
+index means a missing or unusable index.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import sqlite
+
+from backend.app.api.routes import latest_pipeline_run_query, picks_today_query
+from backend.app.models.all_models import ClosingLine
+from backend.app.services.closing import open_picks_without_close_query, window_lines_query
+from backend.app.services.clv import clv_segments_query
+from backend.app.services.features import snapshot_ids_by_hash_query
+from backend.app.services.lineage import lineage_export_query
+from backend.app.services.normalization import normalized_events_by_key_query, normalized_events_by_recon_query
+from backend.app.services.pipeline import open_pick_keys_query
+
+NOW = datetime(2026, 3, 1, 12, 0)
+
+HOT_QUERIES = {
+    "picks_today": picks_today_query(NOW, NOW + timedelta(days=1)),
+    "picks_today_all": picks_today_query(NOW, NOW + timedelta(days=1), limit=None),
+    "picks_today_filtered_page": picks_today_query(NOW, NOW + timedelta(days=1), after=(0.05, 10), tier="A", book="book_a", min_ev=0.01),
+    "clv_metrics": clv_segments_query("sqlite", include_simulated=False),
+    "closing_line_by_pick": select(ClosingLine).where(ClosingLine.pick_id == 1),
+    "feature_snapshot_by_hash": snapshot_ids_by_hash_query("v1", {(1, "a" * 64), (2, "b" * 64)}),
+    "normalized_events_by_key": normalized_events_by_key_query([("feed", "evt-1"), ("feed", "evt-2")]),
+    "normalized_events_by_recon": normalized_events_by_recon_query([(1, NOW, 1, 2), (1, NOW, 3, 4)]),
+    "latest_pipeline_run": latest_pipeline_run_query(),
+    "open_picks_without_close": open_picks_without_close_query(NOW),
+    "open_pick_keys": open_pick_keys_query([1, 2]),
+    "close_window_lines": window_lines_query(1, NOW - timedelta(minutes=10), NOW),
+    "lineage_export": lineage_export_query(NOW, NOW + timedelta(days=1), model_version="m"),
+}
+
+
+async def query_plan(session, stmt) -> list[str]:
+    compiled = stmt.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+    rows = (await session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))).all()
+    return [row[-1] for row in rows]
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+async def test_hot_query_uses_an_index(session, name) -> None:
+    plan = await query_plan(session, HOT_QUERIES[name])
+    scans = [step for step in plan if step.startswith("SCAN")]
+    assert not scans, f"{name} falls back to a full scan: {plan}"
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from sqlalchemy import event, func, select
+
+from backend.app.core.config import settings
+from backend.app.models.all_models import EventNormalized, OddsSnapshot, Settlement
+from backend.app.services.closing import capture_started_event_closes
+from backend.app.services.pipeline import run_once
+from backend.app.services.provider import DeterministicMockOddsProvider
+from backend.app.services.replay import ReplayConfig, load_replay_history, parameter_grid, replay, run_sweep
+
+
+async def test_replay_matches_live_pipeline_without_writes(session) -> None:
+    for _ in range(3):
+        await run_once(session, DeterministicMockOddsProvider())
+    start = await session.scalar(select(EventNormalized.start_time))
+    await capture_started_event_closes(session, start + timedelta(seconds=1))
+    await session.commit()
+    first_settlement = await session.scalar(select(Settlement).order_by(Settlement.id).limit(1))
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    event.listen(session.bind.sync_engine, "before_cursor_execute", record)
+    history = await load_replay_history(session)
+    report = replay(history, ReplayConfig.from_settings())
+    event.remove(session.bind.sync_engine, "before_cursor_execute", record)
+
+    assert all(s.lstrip().upper().startswith("SELECT") for s in statements)
+    assert report.events == 1
+    assert report.picks == 1
+    assert report.close_coverage == 1.0
+    assert report.clv_book["mean"] == first_settlement.clv_book
+    assert report.realized_roi is None
+
+    history.outcomes[("deterministic-mock", "evt-deterministic-1")] = False
+    assert replay(history, ReplayConfig.from_settings()).realized_roi == -1.0
+
+
+async def test_sweep_in_process_pool_matches_inline(session) -> None:
+    await run_once(session, DeterministicMockOddsProvider())
+    history = await load_replay_history(session)
+    configs = parameter_grid(edge_threshold=[0.0, 0.03, 0.5], consensus_min_books=[3, 4])
+
+    inline = run_sweep(history, configs, max_workers=1)
+    pooled = run_sweep(history, configs, max_workers=2)
+
+    assert [(r.picks, r.clv_book, r.expected_roi) for r in pooled] == [(r.picks, r.clv_book, r.expected_roi) for r in inline]
+    picks = {(r.config.edge_threshold, r.config.consensus_min_books): r.picks for r in inline}
+    assert picks[(0.03, 3)] == 1
+    assert picks[(0.5, 3)] == 0
+    assert picks[(0.03, 4)] == 0
+
+
+async def test_delta_mode_polls_without_writes_are_still_replayed(session, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "odds_delta_mode", True)
+    provider = DeterministicMockOddsProvider()
+    await run_once(session, provider)
+    written = await session.scalar(select(func.count()).select_from(OddsSnapshot))
+    await run_once(session, provider)
+    assert await session.scalar(select(func.count()).select_from(OddsSnapshot)) == written
+
+    history = await load_replay_history(session)
+    assert len(history.decision_polls) == 2
+    assert [len(poll.lines) for poll in history.decision_polls] == [6, 6]
+    assert replay(history, ReplayConfig.from_settings()).picks == 1
@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event, func, select
+
+from backend.app.core.config import settings
+from backend.app.models.all_models import ClosingLine, EventNormalized, Pick, PipelineRun
+from backend.app.services.closing import capture_started_event_closes
+from backend.app.services.clv import clv_segments_query, summarize_segments
+from backend.app.services.pipeline import run_once
+from backend.app.services.provider import DeterministicMockOddsProvider
+from backend.app.services.rollups import read_clv_gates, read_pipeline_rollup
+
+
+async def test_run_metrics_come_from_rollup_without_count_scans(session) -> None:
+    await run_once(session, DeterministicMockOddsProvider())
+
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    event.listen(session.bind.sync_engine, "before_cursor_execute", record)
+    await run_once(session, DeterministicMockOddsProvider())
+    event.remove(session.bind.sync_engine, "before_cursor_execute", record)
+    assert not [s for s in statements if "count(*)" in s.lower()]
+
+    run = await session.scalar(select(PipelineRun).order_by(PipelineRun.id.desc()).limit(1))
+    # The second poll reuses the normalized row and the open pick on it.
+    assert run.metadata_json["rollup_deltas"] == {"picks": 0, "closing_lines": 0, "events_normalized": 0}
+    assert run.close_line_coverage == 0.0
+
+    start = await session.scalar(select(EventNormalized.start_time))
+    assert await capture_started_event_closes(session, start + timedelta(seconds=1)) == 1
+    await session.commit()
+
+    rollup = await read_pipeline_rollup(session)
+    assert rollup.picks_total == await session.scalar(select(func.count()).select_from(Pick))
+    assert rollup.closing_lines_total == await session.scalar(select(func.count()).select_from(ClosingLine))
+    assert rollup.events_normalized_total == await session.scalar(select(func.count()).select_from(EventNormalized)) == 1
+    assert rollup.closing_lines_total == 1
+
+
+async def test_clv_rollup_matches_settlements_and_checkpoints(session, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "clv_checkpoint_every", 2)
+    for idx in range(5):
+        await run_once(session, DeterministicMockOddsProvider(f"evt-{idx}"))
+    start = await session.scalar(select(func.max(EventNormalized.start_time)))
+    await capture_started_event_closes(session, start + timedelta(seconds=1))
+    await session.commit()
+
+    expected = summarize_segments((await session.execute(clv_segments_query("sqlite", include_simulated=True))).all())
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    event.listen(session.bind.sync_engine, "before_cursor_execute", record)
+    gates = await read_clv_gates(session, include_simulated=True)
+    event.remove(session.bind.sync_engine, "before_cursor_execute", record)
+    assert not [s for s in statements if "settlements" in s]
+
+    assert gates["settled"] == expected["settled"] == 5
+    assert gates["clv_book"]["mean"] == pytest.approx(expected["clv_book"]["mean"])
+    assert [seg["time_to_game"] for seg in gates["segments"]] == [seg["time_to_game"] for seg in expected["segments"]]
+    assert [c["settled_total"] for c in gates["checkpoints"]] == [2, 4]
+    assert gates["checkpoints"][-1]["summary"]["settled"] == 4
+    assert not gates["gate_a"]["reached"]
+    assert (await read_clv_gates(session, include_simulated=False))["settled"] == 0
@@ -0,0 +1,162 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from backend.app.core.config import settings
+from backend.app.models.all_models import EventNormalized, Pick, PipelineRun, Settlement
+from backend.app.services.provider import DeterministicMockOddsProvider
+from backend.app.services.scheduler import FakeClock, StartTimeScheduler, _SelectedEventsProvider, pipeline_scheduler
+
+T0 = datetime(2026, 3, 1, 12, 0)
+NEAR = ("test", "near")
+FAR = ("test", "far")
+
+
+async def test_poll_cadence_tightens_toward_start_and_close_fires_at_start() -> None:
+    clock = FakeClock(T0)
+    starts = {NEAR: T0 + timedelta(minutes=30), FAR: T0 + timedelta(hours=5)}
+    polled: dict[tuple, list[datetime]] = {NEAR: [], FAR: []}
+    closed: list[tuple[tuple, datetime]] = []
+
+    async def on_poll(keys):
+        live = {key: start for key, start in starts.items() if start > clock.now()}
+        for key in keys if keys is not None else live:
+            polled[key].append(clock.now())
+        return list(live.items())
+
+    async def on_close(keys):
+        closed.extend((key, clock.now()) for key in keys)
+
+    scheduler = StartTimeScheduler(on_poll, on_close, clock=clock)
+    await scheduler.run(until=T0 + timedelta(hours=6))
+
+    assert closed == [(NEAR, starts[NEAR]), (FAR, starts[FAR])]
+    assert all(ts < starts[key] for key, times in polled.items() for ts in times)
+    gaps = lambda key, lo, hi: {(b - a).total_seconds() for a, b in zip(polled[key], polled[key][1:]) if lo <= b <= hi}
+    close_window_start = starts[NEAR] - timedelta(minutes=settings.close_capture_window_minutes)
+    assert gaps(NEAR, close_window_start + timedelta(seconds=1), starts[NEAR]) == {settings.scheduler_close_poll_seconds}
+    near_window_start = starts[FAR] - timedelta(minutes=settings.scheduler_near_window_minutes)
+    # Discovery polls refresh every event, so gaps may be shorter than the cadence but never longer.
+    assert max(gaps(FAR, T0 + timedelta(seconds=1), near_window_start)) == settings.scheduler_far_poll_seconds
+    assert max(gaps(FAR, near_window_start + timedelta(seconds=1), starts[FAR])) == settings.scheduler_near_poll_seconds
+    assert polled[NEAR][0] == polled[FAR][0] == T0
+
+
+async def test_start_time_change_moves_close_job() -> None:
+    clock = FakeClock(T0)
+    start = {"value": T0 + timedelta(minutes=20)}
+    closed: list[datetime] = []
+
+    async def on_poll(keys):
+        if clock.now() >= T0 + timedelta(minutes=5):
+            start["value"] = T0 + timedelta(minutes=40)
+        return [(NEAR, start["value"])]
+
+    async def on_close(keys):
+        closed.append(clock.now())
+
+    await StartTimeScheduler(on_poll, on_close, clock=clock).run(until=T0 + timedelta(hours=1))
+    assert closed == [T0 + timedelta(minutes=40)]
+
+
+async def test_failed_poll_and_close_are_retried_without_stopping_the_loop() -> None:
+    clock = FakeClock(T0)
+    start = T0 + timedelta(minutes=5)
+    failures = {"poll": 1, "close": 1}
+    polled: list[datetime] = []
+    closed: list[datetime] = []
+
+    async def on_poll(keys):
+        if failures["poll"] and keys is not None:
+            failures["poll"] -= 1
+            raise ConnectionError("feed down")
+        polled.append(clock.now())
+        return [(NEAR, start)]
+
+    async def on_close(keys):
+        if failures["close"]:
+            failures["close"] -= 1
+            raise ConnectionError("db down")
+        closed.append(clock.now())
+
+    scheduler = StartTimeScheduler(on_poll, on_close, clock=clock)
+    await scheduler.run(until=T0 + timedelta(hours=1))
+
+    assert closed == [start + timedelta(seconds=settings.scheduler_retry_seconds)]
+    assert polled[1] - polled[0] == timedelta(seconds=settings.scheduler_close_poll_seconds + settings.scheduler_retry_seconds)
+    assert not failures["poll"]
+
+
+async def test_polls_due_close_together_share_one_fetch() -> None:
+    clock = FakeClock(T0)
+    starts = {NEAR: T0 + timedelta(minutes=5), FAR: T0 + timedelta(minutes=5, seconds=3)}
+    batches: list[set[tuple] | None] = []
+
+    async def on_poll(keys):
+        batches.append(keys)
+        return list(starts.items())
+
+    async def on_close(keys):
+        pass
+
+    await StartTimeScheduler(on_poll, on_close, clock=clock).run(until=T0 + timedelta(minutes=10))
+    assert batches[0] is None
+    assert all(batch == {NEAR, FAR} for batch in batches[1:-1])
+
+
+class _SelectableProvider:
+    def __init__(self) -> None:
+        self.full_fetches = 0
+        self.requested: list[set[tuple]] = []
+
+    async def fetch_events_and_odds(self) -> list[dict]:
+        self.full_fetches += 1
+        return await DeterministicMockOddsProvider().fetch_events_and_odds()
+
+    async def fetch_selected_events_and_odds(self, event_keys: set[tuple]) -> list[dict]:
+        self.requested.append(event_keys)
+        return await DeterministicMockOddsProvider().fetch_events_and_odds()
+
+
+async def test_targeted_polls_pass_event_keys_to_providers_that_support_them() -> None:
+    provider = _SelectableProvider()
+    key = ("deterministic-mock", "evt-deterministic-1")
+    selected = _SelectedEventsProvider(provider, {key})
+    assert len(await selected.fetch_events_and_odds()) == 1
+    assert provider.requested == [{key}]
+    assert selected.seen[0][0] == key
+
+    await _SelectedEventsProvider(provider, None).fetch_events_and_odds()
+    assert provider.full_fetches == 1
+
+
+class _ScheduledStartProvider:
+    """The deterministic event at a fixed start time, counting fetches."""
+
+    def __init__(self, start: datetime) -> None:
+        self.start = start
+        self.fetches = 0
+
+    async def fetch_events_and_odds(self) -> list[dict]:
+        self.fetches += 1
+        event = (await DeterministicMockOddsProvider().fetch_events_and_odds())[0]
+        return [{**event, "start_time": self.start}]
+
+
+async def test_pipeline_scheduler_runs_pipeline_until_start(session) -> None:
+    maker = async_sessionmaker(session.bind, class_=AsyncSession, expire_on_commit=False)
+    now = datetime.utcnow()
+    clock = FakeClock(now)
+    provider = _ScheduledStartProvider(now + timedelta(minutes=2))
+    scheduler = pipeline_scheduler(provider, maker, clock=clock)
+    await scheduler.run(until=now + timedelta(minutes=5))
+
+    assert scheduler.closes == 1
+    assert provider.fetches == scheduler.polls == 1 + 120 // settings.scheduler_close_poll_seconds
+    async with maker() as session:
+        assert await session.scalar(select(func.count(PipelineRun.id))) == scheduler.polls
+        assert await session.scalar(select(func.count(EventNormalized.id))) == 1
+        # Every poll after the first finds the open pick; close capture settles that one pick.
+        assert await session.scalar(select(func.count(Pick.id))) == 1
+        assert await session.scalar(select(func.count(Settlement.id))) == 1
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+from backend.app.core.config import settings
+from backend.app.services.pipeline import run_once
+from backend.app.services.provider import DeterministicMockOddsProvider
+from backend.app.services.tick_store import TickStore, tick_store
+
+T0 = datetime(2026, 3, 1, 19, 0)
+KEY = ("feed", "evt-1")
+
+
+def _line(book: str, side: str, price: int, minutes: float, snapshot_id: int) -> dict:
+    return {"book": book, "market": "moneyline", "side": side, "price": price, "timestamp": T0 + timedelta(minutes=minutes), "snapshot_id": snapshot_id}
+
+
+def test_ring_wraps_and_bisects() -> None:
+    store = TickStore(capacity=4)
+    store.record(KEY, T0 + timedelta(hours=1), [_line("a", "home", -100 - i, i, i) for i in range(6)])
+    store.record(KEY, T0 + timedelta(hours=1), [_line("a", "home", -999, 1, 99), _line("a", "home", -120, 5, 50)])
+
+    window = store.window(KEY, "a", "home", T0, T0 + timedelta(hours=1))
+    assert [line["price"] for line in window] == [-102, -103, -104, -120]
+    assert store.stats()["dropped_out_of_order"] == 1
+    assert store.latest_as_of(KEY, "a", "home", T0 + timedelta(minutes=3, seconds=30))["snapshot_id"] == 3
+    assert store.latest_as_of(KEY, "a", "home", T0 + timedelta(minutes=1)) is None
+    assert store.latest_as_of(KEY, "b", "home", T0 + timedelta(minutes=9)) is None
+    assert [line["timestamp"] for line in store.window(KEY, "a", "home", T0 + timedelta(minutes=3), T0 + timedelta(minutes=4))] == [
+        T0 + timedelta(minutes=3), T0 + timedelta(minutes=4)
+    ]
+
+
+def test_eviction_after_start_plus_grace(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "tick_store_grace_seconds", 600)
+    store = TickStore()
+    store.record(KEY, T0, [_line("a", "home", -110, -1, 1)])
+    store.evict_started(T0 + timedelta(minutes=5))
+    assert store.stats()["events"] == 1
+    store.evict_started(T0 + timedelta(minutes=10))
+    assert store.stats()["events"] == 0
+
+
+async def test_pipeline_records_ticks_on_commit(session) -> None:
+    await run_once(session, DeterministicMockOddsProvider())
+    assert tick_store.stats()["rings"] == 6
+
+
+class _EarlyProvider:
+    """The deterministic event, starting hours after its quotes."""
+
+    async def fetch_events_and_odds(self) -> list[dict]:
+        event = (await DeterministicMockOddsProvider().fetch_events_and_odds())[0]
+        return [{**event, "start_time": datetime.utcnow() + timedelta(hours=3)}]
+
+
+async def test_pipeline_keeps_only_close_window_ticks(session) -> None:
+    await run_once(session, _EarlyProvider())
+    assert tick_store.stats()["events"] == 0
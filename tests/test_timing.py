@@ -0,0 +1,60 @@
+import asyncio
+from datetime import timedelta
+
+from sqlalchemy import select
+
+from backend.app.models.all_models import PipelineRun
+from backend.app.services.pipeline import run_once
+from backend.app.services.provider import DeterministicMockOddsProvider
+from backend.app.services.timing import StageTimer, percentile, stage_span
+
+
+class _ThreeEventProvider:
+    async def fetch_events_and_odds(self) -> list[dict]:
+        base = (await DeterministicMockOddsProvider().fetch_events_and_odds())[0]
+        return [{**base, "external_event_id": f"evt-{idx}", "start_time": base["start_time"] + timedelta(minutes=idx)} for idx in range(3)]
+
+
+async def test_stage_spans_reach_tasks_of_the_active_timer() -> None:
+    timer = StageTimer()
+
+    async def work() -> None:
+        with stage_span("inner"):
+            await asyncio.sleep(0)
+
+    with stage_span("ignored"):
+        pass
+    with timer.activate():
+        await asyncio.gather(work(), work())
+    assert timer.summary()["inner"]["spans"] == 2
+    with timer.stage("batch", 4):
+        pass
+    with timer.stage("empty", 0):
+        pass
+    batch = timer.summary()["batch"]
+    assert (batch["spans"], batch["items"]) == (1, 4)
+    assert batch["per_item_mean"] == batch["total"] / 4
+    assert "empty" not in timer.samples
+    assert "ignored" not in timer.samples
+    assert percentile([3.0, 1.0, 2.0, 4.0], 0.5) == 2.0
+    assert percentile([3.0, 1.0, 2.0, 4.0], 0.95) == 4.0
+
+
+async def test_run_records_per_stage_latencies(session) -> None:
+    await run_once(session, DeterministicMockOddsProvider())
+    run = await session.scalar(select(PipelineRun))
+    stages = run.metadata_json["stages"]
+    for stage in ("provider_fetch", "normalization", "snapshot_write", "consensus", "feature_build", "model_load", "inference", "pick_write"):
+        assert stages[stage]["spans"] >= 1
+        assert 0 <= stages[stage]["span_p50"] <= stages[stage]["span_p95"] <= stages[stage]["span_max"]
+    assert run.metadata_json["p95_latency"] <= run.latency_seconds
+
+
+async def test_batched_stages_report_spans_and_items(session) -> None:
+    await run_once(session, _ThreeEventProvider())
+    stages = (await session.scalar(select(PipelineRun))).metadata_json["stages"]
+    # Batched stages time the whole slate once; pick writes are timed per candidate.
+    for stage in ("normalization", "snapshot_write", "consensus", "feature_build", "inference"):
+        assert (stages[stage]["spans"], stages[stage]["items"]) == (1, 3)
+    assert (stages["pick_write"]["spans"], stages["pick_write"]["items"]) == (3, 3)
+    assert (stages["provider_fetch"]["spans"], stages["provider_fetch"]["items"]) == (1, 1)